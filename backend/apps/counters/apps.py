@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_delete
+
+
+class CountersConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.counters"
+
+    def ready(self):
+        from apps.counters import services
+
+        # Deletes cascade from users and projects, so they are tracked through
+        # signals rather than in the views.
+        post_delete.connect(services.on_like_deleted, sender="likes.Like")
+        post_delete.connect(services.on_match_deleted, sender="matches.Match")
+        post_delete.connect(services.on_project_deleted, sender="projects.Project")
+        post_delete.connect(services.on_user_deleted, sender=settings.AUTH_USER_MODEL)
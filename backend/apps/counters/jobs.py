@@ -0,0 +1,12 @@
+from django.conf import settings
+
+from apps.counters import services
+from apps.jobs.services import job
+
+
+@job(every=settings.COUNTER_COMPACT_INTERVAL)
+def compact_counters():
+    # Bounded batches keep each run short; the next run picks up the rest.
+    for _ in range(settings.COUNTER_COMPACT_MAX_BATCHES):
+        if not services.compact():
+            break
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.counters import services
+
+
+class Command(BaseCommand):
+    help = "Recompute like and match counters from the likes and matches tables"
+
+    def handle(self, *args, **options):
+        rebuilt = services.rebuild()
+        for kind, total in sorted(rebuilt.items()):
+            self.stdout.write(f"{kind}: {total} counters")
+        self.stdout.write(self.style.SUCCESS("Counters rebuilt"))
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="CounterShard",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(max_length=32)),
+                ("object_id", models.BigIntegerField()),
+                ("shard", models.PositiveSmallIntegerField()),
+                ("value", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "counter_shards",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="countershard",
+            constraint=models.UniqueConstraint(fields=("kind", "object_id", "shard"), name="counter_shards_unique"),
+        ),
+    ]
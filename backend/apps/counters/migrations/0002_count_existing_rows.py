@@ -0,0 +1,39 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def count_existing_rows(apps, schema_editor):
+    # Likes and matches that predate the counters start out counted, like
+    # `manage.py rebuild_counters` would count them.
+    CounterShard = apps.get_model("counters", "CounterShard")
+    Like = apps.get_model("likes", "Like")
+    Match = apps.get_model("matches", "Match")
+    db = schema_editor.connection.alias
+    sources = {
+        "project_likes": (Like.objects.filter(project__isnull=False), "project_id"),
+        "user_likes": (Like.objects.filter(liked_user__isnull=False), "liked_user_id"),
+        "user_matches": (Match.objects.filter(status="accepted"), "user_id"),
+    }
+    for kind, (queryset, field) in sources.items():
+        totals = queryset.using(db).order_by().values(field).annotate(total=Count("id")).values_list(field, "total")
+        CounterShard.objects.using(db).bulk_create(
+            (CounterShard(kind=kind, object_id=object_id, shard=0, value=total) for object_id, total in totals),
+            batch_size=1000,
+        )
+
+
+def delete_counters(apps, schema_editor):
+    apps.get_model("counters", "CounterShard").objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("counters", "0001_initial"),
+        ("likes", "0003_unique_likes_and_list_indexes"),
+        ("matches", "0004_unique_counterparts"),
+    ]
+
+    operations = [
+        migrations.RunPython(count_existing_rows, delete_counters),
+    ]
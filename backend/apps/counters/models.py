@@ -0,0 +1,27 @@
+from django.db import models
+
+
+class CounterShard(models.Model):
+    """One slice of a denormalized count; the count is the sum over all shards.
+
+    Increments land on a random shard, so concurrent likes of the same project
+    update different rows instead of queueing on a single row lock.
+    """
+
+    KIND_PROJECT_LIKES = "project_likes"
+    KIND_USER_LIKES = "user_likes"
+    KIND_USER_MATCHES = "user_matches"
+
+    kind = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    shard = models.PositiveSmallIntegerField()
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "counter_shards"
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id", "shard"], name="counter_shards_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id}#{self.shard}={self.value}"
@@ -0,0 +1,170 @@
+import random
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Count, Sum
+
+from apps.counters.models import CounterShard
+from apps.likes.models import Like
+from apps.matches.models import Match
+
+PROJECT_LIKES = CounterShard.KIND_PROJECT_LIKES
+USER_LIKES = CounterShard.KIND_USER_LIKES
+USER_MATCHES = CounterShard.KIND_USER_MATCHES
+
+_REBUILD_BATCH_SIZE = 1000
+
+
+def add(deltas, using=None, shard=None):
+    """Apply ``{(kind, object_id): delta}`` with a single upsert.
+
+    Call it inside the transaction that creates or deletes the counted rows
+    so the counters commit or roll back together with them. Deltas go to a
+    random shard unless ``shard`` is given.
+    """
+    rows = sorted(
+        (kind, object_id, random.randrange(settings.COUNTER_SHARDS) if shard is None else shard, delta)
+        for (kind, object_id), delta in deltas.items()
+        if delta
+    )
+    if not rows:
+        return
+    connection = connections[using or router.db_for_write(CounterShard)]
+    table = connection.ops.quote_name(CounterShard._meta.db_table)
+    values = ", ".join(["(%s, %s, %s, %s)"] * len(rows))
+    # Rows are sorted so concurrent batches lock shards in the same order.
+    sql = (
+        f"INSERT INTO {table} (kind, object_id, shard, value) VALUES {values} "
+        f"ON CONFLICT (kind, object_id, shard) DO UPDATE SET value = {table}.value + EXCLUDED.value"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [value for row in rows for value in row])
+
+
+def _totals(kinds, ids):
+    return (
+        CounterShard.objects.filter(kind__in=kinds, object_id__in=ids)
+        .values("kind", "object_id")
+        .annotate(total=Sum("value"))
+        .values_list("kind", "object_id", "total")
+    )
+
+
+def counts(kinds, ids):
+    """Return ``{(kind, object_id): total}``; missing pairs count as zero."""
+    if not ids:
+        return {}
+    return {(kind, object_id): total for kind, object_id, total in _totals(kinds, ids)}
+
+
+async def acounts(kinds, ids):
+    if not ids:
+        return {}
+    return {(kind, object_id): total async for kind, object_id, total in _totals(kinds, ids)}
+
+
+def _annotate(items, fields, totals):
+    for item in items:
+        for field, kind in fields.items():
+            item[field] = totals.get((kind, item["id"]), 0)
+    return items
+
+
+def annotate(items, **fields):
+    """Set ``item[field]`` to the ``kind`` counter for each ``field=kind``."""
+    return _annotate(items, fields, counts(list(fields.values()), [item["id"] for item in items]))
+
+
+async def aannotate(items, **fields):
+    return _annotate(items, fields, await acounts(list(fields.values()), [item["id"] for item in items]))
+
+
+def rebuild(using=None):
+    """Recompute every counter from the likes and matches tables.
+
+    Returns the number of counted objects per kind.
+    """
+    using = using or router.db_for_write(CounterShard)
+    connection = connections[using]
+    sources = {
+        PROJECT_LIKES: (Like.objects.filter(project__isnull=False), "project_id"),
+        USER_LIKES: (Like.objects.filter(liked_user__isnull=False), "liked_user_id"),
+        USER_MATCHES: (Match.objects.filter(status=Match.STATUS_ACCEPTED), "user_id"),
+    }
+    rebuilt = defaultdict(int)
+    with transaction.atomic(using=using):
+        if connection.vendor == "postgresql":
+            # Hold off like and match writes so the counts match one snapshot.
+            with connection.cursor() as cursor:
+                cursor.execute("LOCK TABLE likes, matches IN SHARE MODE")
+        CounterShard.objects.using(using).all().delete()
+        for kind, (queryset, field) in sources.items():
+            totals = (
+                queryset.using(using).order_by().values(field).annotate(total=Count("id")).values_list(field, "total")
+            )
+            batch = []
+            for object_id, total in totals.iterator(chunk_size=_REBUILD_BATCH_SIZE):
+                batch.append(CounterShard(kind=kind, object_id=object_id, shard=0, value=total))
+                rebuilt[kind] += 1
+                if len(batch) >= _REBUILD_BATCH_SIZE:
+                    CounterShard.objects.using(using).bulk_create(batch)
+                    batch = []
+            CounterShard.objects.using(using).bulk_create(batch)
+    return dict(rebuilt)
+
+
+def compact(limit=_REBUILD_BATCH_SIZE, using=None):
+    """Fold shards 1..N of up to ``limit`` counters into shard 0. Returns how many rows were folded.
+
+    Totals do not change; counters that went cold end up as a single row.
+    """
+    using = using or router.db_for_write(CounterShard)
+    sharded = (
+        CounterShard.objects.using(using)
+        .filter(shard__gt=0)
+        .order_by("kind", "object_id")
+        .values_list("kind", "object_id")
+        .distinct()[:limit]
+    )
+    return sum(_compact_counter(kind, object_id, using) for kind, object_id in list(sharded))
+
+
+def _compact_counter(kind, object_id, using):
+    # One counter per short transaction, its rows locked in shard order like
+    # add() does and without SKIP LOCKED, so shard 0 is never locked after the
+    # shards being folded into it.
+    with transaction.atomic(using=using):
+        rows = list(
+            CounterShard.objects.using(using)
+            .select_for_update()
+            .filter(kind=kind, object_id=object_id)
+            .order_by("shard")
+            .values_list("id", "shard", "value")
+        )
+        folded = [(row_id, value) for row_id, shard, value in rows if shard > 0]
+        if not folded:
+            return 0
+        CounterShard.objects.using(using).filter(id__in=[row_id for row_id, _ in folded]).delete()
+        add({(kind, object_id): sum(value for _, value in folded)}, using=using, shard=0)
+    return len(folded)
+
+
+def on_like_deleted(sender, instance, **kwargs):
+    if instance.project_id:
+        add({(PROJECT_LIKES, instance.project_id): -1})
+    elif instance.liked_user_id:
+        add({(USER_LIKES, instance.liked_user_id): -1})
+
+
+def on_match_deleted(sender, instance, **kwargs):
+    if instance.status == Match.STATUS_ACCEPTED:
+        add({(USER_MATCHES, instance.user_id): -1})
+
+
+def on_project_deleted(sender, instance, **kwargs):
+    CounterShard.objects.filter(kind=PROJECT_LIKES, object_id=instance.pk).delete()
+
+
+def on_user_deleted(sender, instance, **kwargs):
+    CounterShard.objects.filter(kind__in=[USER_LIKES, USER_MATCHES], object_id=instance.pk).delete()
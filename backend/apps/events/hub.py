@@ -0,0 +1,164 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from prometheus_client import Counter, Gauge
+
+from apps.events import services
+
+logger = logging.getLogger(__name__)
+
+STREAMS_OPEN = Gauge("events_streams_open", "Open /api/v1/events connections", multiprocess_mode="livesum")
+EVENTS_SENT = Counter("events_sent", "Events written to /api/v1/events connections", ["event"])
+STREAMS_DROPPED = Counter("events_streams_dropped", "Event streams closed because the client fell too far behind")
+
+
+def redis_client():
+    import redis.asyncio
+
+    return redis.asyncio.from_url(settings.CACHES["default"]["LOCATION"], decode_responses=True)
+
+
+class Subscription:
+    def __init__(self, user_id):
+        self.channel = services.channel(user_id)
+        self.queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        self.overflowed = False
+
+    def push(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # The stream ends and the client resumes from its Last-Event-ID.
+            self.overflowed = True
+
+
+class Hub:
+    """Shares one Redis pub/sub connection among all event streams of a process.
+
+    A user's channel is subscribed while at least one of their streams is
+    open, and a single reader task hands messages to each stream's queue.
+    """
+
+    def __init__(self):
+        self._loop = None
+
+    def _bind(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Redis connections belong to the event loop that opened them.
+            self._loop = loop
+            self.redis = redis_client()
+            self._pubsub = self.redis.pubsub()
+            self._subscriptions = defaultdict(set)
+            self._lock = asyncio.Lock()
+            self._reader = None
+
+    async def subscribe(self, user_id):
+        self._bind()
+        subscription = Subscription(user_id)
+        async with self._lock:
+            if not self._subscriptions[subscription.channel]:
+                await self._pubsub.subscribe(subscription.channel)
+            self._subscriptions[subscription.channel].add(subscription)
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read())
+        return subscription
+
+    async def unsubscribe(self, subscription):
+        async with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.channel]
+                await self._pubsub.unsubscribe(subscription.channel)
+
+    async def _read(self):
+        while self._subscriptions:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except Exception:
+                # The pub/sub connection resubscribes when it reconnects.
+                logger.warning("Event hub read failed", exc_info=True)
+                await asyncio.sleep(1)
+                continue
+            if message is None:
+                continue
+            for subscription in list(self._subscriptions.get(message["channel"], ())):
+                subscription.push(message["data"])
+
+    async def backlog(self, user_id, last_id):
+        """Events stored after ``last_id`` and whether some may have been lost.
+
+        Events are lost to the client when its last one was already trimmed
+        or expired from the user's stream; it then has to reload its lists.
+        """
+        self._bind()
+        key = services.user_stream(user_id)
+        last = services.parse_id(last_id)
+        first = await self.redis.xrange(key, count=1)
+        if last is None or not first or services.parse_id(first[0][0]) > last:
+            return await self.redis.xrange(key), True
+        return await self.redis.xrange(key, min=f"({last_id}"), False
+
+
+hub = Hub()
+
+
+def frame(name, data, entry_id=None):
+    lines = [f"id: {entry_id}"] if entry_id else []
+    lines += [f"event: {name}", f"data: {data}"]
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream(user_id, last_id, lifetime):
+    """Server-Sent Events for ``user_id``: what was missed since ``last_id``, then live events.
+
+    Ends after ``lifetime`` seconds; the client reconnects with the id of
+    the last event it received and continues from there.
+    """
+    # Subscribe before reading the backlog so nothing published in between is missed.
+    subscription = await hub.subscribe(user_id)
+    STREAMS_OPEN.inc()
+    try:
+        yield f"retry: {settings.EVENTS_RETRY_MS}\n\n"
+        last = None
+        if last_id is not None:
+            entries, reset = await hub.backlog(user_id, last_id)
+            if reset:
+                yield frame("reset", "{}")
+            for entry_id, fields in entries:
+                last = services.parse_id(entry_id)
+                EVENTS_SENT.labels(event=fields["event"]).inc()
+                yield frame(fields["event"], fields["data"], entry_id)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + lifetime
+        while not subscription.overflowed:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                message = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=min(settings.EVENTS_HEARTBEAT, remaining)
+                )
+            except asyncio.TimeoutError:
+                # Comment lines keep proxies from closing an idle connection.
+                yield ": ping\n\n"
+                continue
+            message = json.loads(message)
+            entry = services.parse_id(message["id"])
+            if last is not None and entry <= last:
+                continue
+            last = entry
+            EVENTS_SENT.labels(event=message["event"]).inc()
+            yield frame(message["event"], message["data"], message["id"])
+        if subscription.overflowed:
+            STREAMS_DROPPED.inc()
+    finally:
+        STREAMS_OPEN.dec()
+        await hub.unsubscribe(subscription)
@@ -0,0 +1,29 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from prometheus_client import start_http_server
+
+from apps.events import services
+from apps.outbox.services import redis_client
+
+
+class Command(BaseCommand):
+    help = "Copy outbox events into per-user streams for /api/v1/events"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--metrics-port",
+            type=int,
+            default=settings.EVENTS_METRICS_PORT,
+            help="Port to serve Prometheus metrics on; 0 disables",
+        )
+
+    def handle(self, *args, **options):
+        if options["metrics_port"]:
+            start_http_server(options["metrics_port"])
+        stopping = []
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: stopping.append(True))
+        self.stdout.write(f"Pushing events from stream '{settings.OUTBOX_STREAM}'")
+        services.run_fan_out(redis_client(), stop=lambda: bool(stopping))
@@ -0,0 +1,138 @@
+import json
+import logging
+import os
+import socket
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections
+from prometheus_client import Counter
+from redis.exceptions import ResponseError
+
+from apps.matches.models import Match
+from apps.matches.serializers import PROJECT_MATCH_ROWS, USER_MATCH_ROWS
+from apps.outbox import services as outbox
+from apps.outbox.models import OutboxEvent
+from apps.projects.models import Project
+from apps.users.serializers import PUBLIC_USER_ROWS
+from config.renderers import ORJSONRenderer
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+EVENTS_PUSHED = Counter("events_pushed", "Events copied to a user's event stream", ["event"])
+
+_renderer = ORJSONRenderer()
+_MATCH_COLUMNS = list(dict.fromkeys(USER_MATCH_ROWS.columns + PROJECT_MATCH_ROWS.columns))
+
+
+def user_stream(user_id):
+    return f"events:user:{user_id}"
+
+
+def channel(user_id):
+    return f"events:live:{user_id}"
+
+
+def parse_id(entry_id):
+    """``"<ms>-<seq>"`` stream id as a comparable tuple, or None if malformed."""
+    ms, _, seq = str(entry_id).partition("-")
+    try:
+        return int(ms), int(seq or 0)
+    except ValueError:
+        return None
+
+
+def _public_user(user_id):
+    row = User.objects.filter(pk=user_id).values(*PUBLIC_USER_ROWS.columns).first()
+    return row and PUBLIC_USER_ROWS.to_dict(row)
+
+
+def _match(match_id):
+    row = Match.objects.filter(pk=match_id).values(*_MATCH_COLUMNS).first()
+    if row is None:
+        return None
+    return USER_MATCH_ROWS.to_dict(row) if row["liked_user__id"] else PROJECT_MATCH_ROWS.to_dict(row)
+
+
+def notifications(event):
+    """Yield ``(user_id, name, data)`` for every user an outbox event concerns.
+
+    - ``like``: someone liked the user or one of their projects.
+    - ``match``: one of the user's matches was created or changed; ``data`` is
+      the match as ``GET /api/v1/matches/`` lists it.
+    - ``match_status``: the other side changed the status of a match with the user.
+    """
+    topic, payload = event["topic"], event["payload"]
+    if topic == OutboxEvent.TOPIC_LIKE_CREATED:
+        if "project_id" in payload:
+            recipient = Project.objects.filter(pk=payload["project_id"]).values_list("owner_id", flat=True).first()
+        else:
+            recipient = payload["liked_user_id"]
+        if recipient is not None:
+            yield recipient, "like", {
+                "user": _public_user(payload["user_id"]),
+                "project_id": payload.get("project_id"),
+                "mutual": payload.get("mutual", False),
+            }
+    elif topic in (OutboxEvent.TOPIC_MATCH_CREATED, OutboxEvent.TOPIC_MATCH_STATUS_CHANGED):
+        match = _match(payload["match_id"])
+        if match is not None:
+            yield payload["user_id"], "match", match
+        if topic == OutboxEvent.TOPIC_MATCH_STATUS_CHANGED and payload.get("liked_user_id"):
+            yield payload["liked_user_id"], "match_status", {
+                "match_id": payload["match_id"],
+                "user": _public_user(payload["user_id"]),
+                "status": payload["status"],
+                "previous_status": payload["previous_status"],
+            }
+
+
+def deliver(redis, user_id, entry_id, name, data):
+    """Append an event to the user's stream and announce it to their open connections.
+
+    The entry reuses the outbox stream id, so a redelivered event is
+    recognised and skipped. Returns the id the event was stored under, or
+    None for a duplicate.
+    """
+    key = user_stream(user_id)
+    fields = {"event": name, "data": _renderer.render(data).decode()}
+    try:
+        stored_id = redis.xadd(key, fields, id=entry_id, maxlen=settings.EVENTS_STREAM_MAXLEN, approximate=True)
+    except ResponseError:
+        # Not newer than the user's last event: either a redelivery, or an
+        # event retried after a later one went through, which gets a fresh id.
+        if redis.xrange(key, entry_id, entry_id):
+            return None
+        stored_id = redis.xadd(key, fields, maxlen=settings.EVENTS_STREAM_MAXLEN, approximate=True)
+    stored_id = stored_id.decode() if isinstance(stored_id, bytes) else stored_id
+    pipe = redis.pipeline(transaction=False)
+    pipe.expire(key, settings.EVENTS_RETENTION)
+    pipe.publish(channel(user_id), json.dumps({"id": stored_id, **fields}))
+    pipe.execute()
+    EVENTS_PUSHED.labels(event=name).inc()
+    return stored_id
+
+
+def fan_out(redis, event):
+    for user_id, name, data in notifications(event):
+        deliver(redis, user_id, event["stream_id"], name, data)
+
+
+def consumer_name():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def run_fan_out(redis, consumer=None, stop=None):
+    """Copy outbox events into per-user streams until ``stop()`` returns true."""
+    consumer = consumer or consumer_name()
+    while not (stop and stop()):
+        close_old_connections()
+        try:
+            outbox.consume(
+                redis, settings.EVENTS_CONSUMER_GROUP, consumer, lambda event: fan_out(redis, event), block_ms=1000
+            )
+        except Exception:
+            logger.warning("Event fan-out iteration failed", exc_info=True)
+            time.sleep(1)
@@ -0,0 +1,47 @@
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.events.hub import stream
+from config.async_views import AsyncAPIView
+from config.renderers import EventStreamRenderer, ORJSONRenderer
+
+
+def _release_connections():
+    # A stream stays open for minutes; it must not pin the database
+    # connection its authentication used.
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+class EventStreamView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [ORJSONRenderer, EventStreamRenderer]
+
+    async def get(self, request):
+        if not isinstance(request._request, ASGIRequest):
+            # WSGI would buffer the endless response instead of streaming it.
+            return Response(
+                {"detail": "The event stream is only served by ASGI workers"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        lifetime = settings.EVENTS_MAX_AGE
+        expires = getattr(request.auth, "payload", {}).get("exp")
+        if expires is not None:
+            # End the stream when the token does; reconnecting needs a valid one.
+            lifetime = min(lifetime, expires - time.time())
+        last_id = request.headers.get("Last-Event-ID") or request.query_params.get("last_event_id")
+        await sync_to_async(_release_connections)()
+
+        response = StreamingHttpResponse(stream(request.user.pk, last_id, lifetime), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
@@ -0,0 +1,14 @@
+import logging
+
+from django.conf import settings
+
+from apps.jobs import services
+
+logger = logging.getLogger(__name__)
+
+
+@services.job(every=settings.JOB_CLEANUP_INTERVAL)
+def cleanup_jobs():
+    deleted = services.cleanup()
+    if deleted:
+        logger.info("Finished jobs deleted: count=%s", deleted)
@@ -0,0 +1,35 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from prometheus_client import start_http_server
+
+from apps.jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queues", default=",".join(settings.JOB_QUEUES), help="Comma-separated queues to take jobs from"
+        )
+        parser.add_argument("--concurrency", type=int, default=settings.JOB_CONCURRENCY, help="Worker threads")
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is due")
+        parser.add_argument(
+            "--metrics-port",
+            type=int,
+            default=settings.JOB_METRICS_PORT,
+            help="Port to serve Prometheus metrics on; 0 disables",
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(filter(None, options["queues"].split(",")), concurrency=options["concurrency"])
+        if options["burst"]:
+            worker.run(burst=True)
+            return
+        if options["metrics_port"]:
+            start_http_server(options["metrics_port"])
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, worker.stop)
+        worker.run()
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.9 on 2026-10-18 18:07
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("queue", models.CharField(default="default", max_length=64)),
+                ("name", models.CharField(max_length=200)),
+                ("kwargs", models.JSONField(default=dict)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("succeeded", "Succeeded"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=16,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("max_attempts", models.PositiveIntegerField(default=5)),
+                ("run_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("dedupe_key", models.CharField(blank=True, max_length=200, null=True)),
+                ("locked_by", models.CharField(blank=True, default="", max_length=200)),
+                ("locked_at", models.DateTimeField(blank=True, null=True)),
+                ("last_error", models.TextField(blank=True, default="")),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "jobs",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", "pending")), fields=["queue", "run_at"], name="jobs_due"
+                    ),
+                    models.Index(fields=["status", "finished_at"], name="jobs_finished"),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="job",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status__in", ["pending", "running"])),
+                fields=("dedupe_key",),
+                name="jobs_active_dedupe_key",
+            ),
+        ),
+    ]
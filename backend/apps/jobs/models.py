@@ -0,0 +1,54 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A unit of deferred work, run by ``manage.py run_jobs``.
+
+    Workers claim due pending jobs with ``SELECT ... FOR UPDATE SKIP LOCKED``,
+    so the table is the whole queue and no broker is needed.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    queue = models.CharField(max_length=64, default="default")
+    name = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    # At most one pending or running job per key, e.g. for periodic jobs.
+    dedupe_key = models.CharField(max_length=200, null=True, blank=True)
+    locked_by = models.CharField(max_length=200, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "jobs"
+        indexes = [
+            models.Index(fields=["queue", "run_at"], name="jobs_due", condition=Q(status="pending")),
+            models.Index(fields=["status", "finished_at"], name="jobs_finished"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dedupe_key"],
+                condition=Q(status__in=["pending", "running"]),
+                name="jobs_active_dedupe_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name}#{self.id} ({self.status})"
@@ -0,0 +1,229 @@
+import logging
+import random
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+from prometheus_client import Counter, Gauge, Histogram
+
+from apps.jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+JOBS_ENQUEUED = Counter("jobs_enqueued", "Jobs added to a queue", ["queue"])
+JOBS_PROCESSED = Counter("jobs_processed", "Job runs by outcome", ["queue", "outcome"])
+JOB_DURATION = Histogram(
+    "job_duration_seconds",
+    "Job run time",
+    ["queue"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+JOBS_DUE = Gauge("jobs_due", "Pending jobs whose run time has come", ["queue"], multiprocess_mode="livemax")
+JOB_QUEUE_LATENCY = Gauge(
+    "job_queue_latency_seconds", "How long the oldest due job has been waiting", ["queue"], multiprocess_mode="livemax"
+)
+
+_registry = {}
+
+
+class JobFunction:
+    def __init__(self, func, queue, max_attempts, every):
+        self.func = func
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.queue = queue
+        self.max_attempts = max_attempts
+        self.every = every
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def delay(self, **kwargs):
+        """Run the job as soon as a worker is free."""
+        return enqueue(self.name, kwargs, queue=self.queue, max_attempts=self.max_attempts)
+
+    def schedule(self, when, **kwargs):
+        """Run the job at ``when``, a datetime or a number of seconds from now."""
+        run_at = when if isinstance(when, datetime) else timezone.now() + timedelta(seconds=when)
+        return enqueue(self.name, kwargs, queue=self.queue, run_at=run_at, max_attempts=self.max_attempts)
+
+
+def job(queue="default", max_attempts=None, every=None):
+    """Register a function as a job; call ``.delay(**kwargs)`` to queue it.
+
+    Keyword arguments must be JSON-serializable. With ``every`` (seconds)
+    the job is periodic: workers keep exactly one run of it scheduled.
+    Jobs live in ``jobs.py`` modules of installed apps, which workers import
+    on start.
+    """
+
+    def register(func):
+        registered = JobFunction(func, queue, max_attempts or settings.JOB_MAX_ATTEMPTS, every)
+        _registry[registered.name] = registered
+        return registered
+
+    return register
+
+
+def discover():
+    autodiscover_modules("jobs")
+    return _registry
+
+
+def enqueue(name, kwargs=None, queue="default", run_at=None, max_attempts=None, dedupe_key=None):
+    """Queue a job. Inside a transaction it only becomes visible on commit.
+
+    Returns the job, or None when ``dedupe_key`` already belongs to a pending
+    or running job.
+    """
+    entry = Job(
+        queue=queue,
+        name=name,
+        kwargs=kwargs or {},
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        dedupe_key=dedupe_key,
+    )
+    if dedupe_key is None:
+        entry.save()
+    else:
+        try:
+            with transaction.atomic():
+                entry.save()
+        except IntegrityError:
+            return None
+    JOBS_ENQUEUED.labels(queue=queue).inc()
+    return entry
+
+
+def backoff(attempts):
+    """Seconds before retry number ``attempts``: exponential, capped, with jitter."""
+    delay = min(settings.JOB_BACKOFF_MAX, settings.JOB_BACKOFF_BASE * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def claim(queues, worker_id):
+    """Lock the next due job of ``queues`` for ``worker_id``, or return None."""
+    now = timezone.now()
+    with transaction.atomic():
+        entry = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.STATUS_PENDING, queue__in=queues, run_at__lte=now)
+            .order_by("run_at", "id")
+            .first()
+        )
+        if entry is None:
+            return None
+        # The status check keeps two workers from taking the same job on
+        # databases without row locks.
+        claimed = Job.objects.filter(pk=entry.pk, status=Job.STATUS_PENDING).update(
+            status=Job.STATUS_RUNNING, locked_by=worker_id, locked_at=now, attempts=F("attempts") + 1
+        )
+    if not claimed:
+        return None
+    entry.status, entry.locked_by, entry.locked_at = Job.STATUS_RUNNING, worker_id, now
+    entry.attempts += 1
+    return entry
+
+
+def run(entry):
+    """Run a claimed job and record the outcome: succeeded, retried or failed."""
+    registered = _registry.get(entry.name)
+    started = time.perf_counter()
+    try:
+        if registered is None:
+            raise LookupError(f"No job registered as {entry.name!r}")
+        registered.func(**entry.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if registered is not None and entry.attempts < entry.max_attempts:
+            outcome = "retried"
+            Job.objects.filter(pk=entry.pk).update(
+                status=Job.STATUS_PENDING,
+                run_at=now + timedelta(seconds=backoff(entry.attempts)),
+                last_error=error,
+                locked_by="",
+                locked_at=None,
+            )
+        else:
+            outcome = "failed"
+            Job.objects.filter(pk=entry.pk).update(
+                status=Job.STATUS_FAILED, finished_at=now, last_error=error, locked_by="", locked_at=None
+            )
+        logger.warning(
+            "Job %s: id=%s name=%s attempt=%s/%s", outcome, entry.id, entry.name, entry.attempts, entry.max_attempts
+        )
+    else:
+        outcome = "succeeded"
+        with transaction.atomic():
+            Job.objects.filter(pk=entry.pk).update(
+                status=Job.STATUS_SUCCEEDED, finished_at=timezone.now(), locked_by="", locked_at=None
+            )
+            if registered.every:
+                _schedule_next(registered, entry.run_at + timedelta(seconds=registered.every))
+    JOB_DURATION.labels(queue=entry.queue).observe(time.perf_counter() - started)
+    JOBS_PROCESSED.labels(queue=entry.queue, outcome=outcome).inc()
+    return outcome
+
+
+def _schedule_next(registered, run_at):
+    # A worker that was down for a while runs a periodic job once, not once per missed interval.
+    return enqueue(
+        registered.name,
+        queue=registered.queue,
+        run_at=max(run_at, timezone.now()),
+        max_attempts=registered.max_attempts,
+        dedupe_key=f"periodic:{registered.name}",
+    )
+
+
+def schedule_periodic(queues):
+    """Make sure every periodic job of ``queues`` has a run scheduled."""
+    for registered in _registry.values():
+        if registered.every and registered.queue in queues:
+            _schedule_next(registered, timezone.now())
+
+
+def requeue_stale():
+    """Return jobs whose worker died mid-run to the queue. Returns how many."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_TIMEOUT)
+    stale = Job.objects.filter(status=Job.STATUS_RUNNING, locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.STATUS_FAILED,
+        finished_at=timezone.now(),
+        last_error="Worker timed out",
+        locked_by="",
+        locked_at=None,
+    )
+    requeued = stale.update(status=Job.STATUS_PENDING, last_error="Worker timed out", locked_by="", locked_at=None)
+    if failed or requeued:
+        logger.warning("Stale jobs recovered: requeued=%s failed=%s", requeued, failed)
+    return requeued + failed
+
+
+def update_metrics(queues):
+    now = timezone.now()
+    due = {
+        row["queue"]: row
+        for row in Job.objects.filter(status=Job.STATUS_PENDING, queue__in=queues, run_at__lte=now)
+        .values("queue")
+        .annotate(count=Count("id"), oldest=Min("run_at"))
+    }
+    for queue in queues:
+        row = due.get(queue)
+        JOBS_DUE.labels(queue=queue).set(row["count"] if row else 0)
+        JOB_QUEUE_LATENCY.labels(queue=queue).set((now - row["oldest"]).total_seconds() if row else 0)
+
+
+def cleanup(older_than=None):
+    """Delete finished jobs older than ``JOB_RETENTION`` seconds. Returns how many."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_RETENTION if older_than is None else older_than)
+    deleted, _ = Job.objects.filter(
+        status__in=[Job.STATUS_SUCCEEDED, Job.STATUS_FAILED], finished_at__lt=cutoff
+    ).delete()
+    return deleted
@@ -0,0 +1,91 @@
+import logging
+import os
+import socket
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from apps.jobs import services
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """Runs jobs from ``queues`` on ``concurrency`` threads.
+
+    The main thread does the housekeeping every ``JOB_HOUSEKEEPING_INTERVAL``
+    seconds: it requeues jobs of workers that died, keeps periodic jobs
+    scheduled and refreshes the queue gauges. Scale out with more worker
+    processes; they coordinate through row locks only.
+    """
+
+    def __init__(self, queues, concurrency=None, poll_interval=None):
+        self.queues = list(queues)
+        self.concurrency = concurrency or settings.JOB_CONCURRENCY
+        self.poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = threading.Event()
+
+    def run(self, burst=False):
+        """Process jobs until ``stop()``; with ``burst``, on this thread until no job is due."""
+        services.discover()
+        if burst:
+            self.housekeeping()
+            self._work(f"{self.name}:0", burst=True)
+            return
+        self.housekeeping()
+        threads = [
+            threading.Thread(target=self._thread, args=(f"{self.name}:{i}",), name=f"job-worker-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        logger.info("Job worker started: queues=%s concurrency=%s", ",".join(self.queues), self.concurrency)
+        while not self.stopping.wait(settings.JOB_HOUSEKEEPING_INTERVAL):
+            close_old_connections()
+            self.housekeeping()
+        for thread in threads:
+            # Running jobs finish; none are claimed after stop().
+            thread.join()
+        logger.info("Job worker stopped")
+
+    def stop(self, *args):
+        self.stopping.set()
+
+    def housekeeping(self):
+        try:
+            services.requeue_stale()
+            services.schedule_periodic(self.queues)
+            services.update_metrics(self.queues)
+        except Exception:
+            logger.warning("Job housekeeping failed", exc_info=True)
+
+    def _thread(self, worker_id):
+        try:
+            self._work(worker_id)
+        finally:
+            connections.close_all()
+
+    def _work(self, worker_id, burst=False):
+        while not self.stopping.is_set():
+            if not burst:
+                close_old_connections()
+            try:
+                entry = services.claim(self.queues, worker_id)
+            except Exception:
+                logger.warning("Could not claim a job", exc_info=True)
+                entry = None
+            if entry is None:
+                if burst:
+                    return
+                self.stopping.wait(self.poll_interval)
+                continue
+            try:
+                services.run(entry)
+            except Exception:
+                # Recording the outcome failed (the database went away); the
+                # job stays running until requeue_stale() hands it out again.
+                logger.warning("Could not record the outcome of job id=%s", entry.id, exc_info=True)
+                if not burst:
+                    self.stopping.wait(self.poll_interval)
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:56
+
+from django.db import migrations, models
+import django_prometheus.models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Like",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("is_mutual", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "likes",
+            },
+            bases=(django_prometheus.models.ExportModelOperationsMixin("like"), models.Model),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("projects", "0001_initial"),
+        ("likes", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="like",
+            name="liked_user",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="likes_received",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="like",
+            name="project",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="likes",
+                to="projects.project",
+            ),
+        ),
+        migrations.AddField(
+            model_name="like",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, related_name="likes_given", to=settings.AUTH_USER_MODEL
+            ),
+        ),
+    ]
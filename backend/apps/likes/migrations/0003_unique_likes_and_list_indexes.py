@@ -0,0 +1,50 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:56
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def delete_duplicate_likes(apps, schema_editor):
+    # Likes created before the unique constraints existed could be duplicated
+    # by concurrent requests; keep the oldest of each pair.
+    Like = apps.get_model("likes", "Like")
+    db = schema_editor.connection.alias
+    for target in ("liked_user", "project"):
+        likes = Like.objects.using(db).filter(**{f"{target}__isnull": False})
+        keep = likes.order_by().values("user", target).annotate(first=Min("id")).values("first")
+        likes.exclude(id__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("likes", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_likes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(fields=["user", "-created_at", "-id"], name="likes_user_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(fields=["liked_user", "-created_at", "-id"], name="likes_liked_user_created_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="like",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("liked_user__isnull", False)),
+                fields=("user", "liked_user"),
+                name="likes_unique_user_liked_user",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="like",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("project__isnull", False)),
+                fields=("user", "project"),
+                name="likes_unique_user_project",
+            ),
+        ),
+    ]
@@ -28,6 +28,22 @@ class Like(ExportModelOperationsMixin("like"), models.Model):
 
     class Meta:
         db_table = "likes"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "liked_user"],
+                condition=models.Q(liked_user__isnull=False),
+                name="likes_unique_user_liked_user",
+            ),
+            models.UniqueConstraint(
+                fields=["user", "project"],
+                condition=models.Q(project__isnull=False),
+                name="likes_unique_user_project",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["user", "-created_at", "-id"], name="likes_user_created_idx"),
+            models.Index(fields=["liked_user", "-created_at", "-id"], name="likes_liked_user_created_idx"),
+        ]
 
     def __str__(self):
         return f"Like by user {self.user_id}"
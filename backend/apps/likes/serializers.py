@@ -0,0 +1,35 @@
+from rest_framework import serializers
+
+from apps.users.serializers import USER_ROWS
+from config.rows import RowSerializer
+
+MAX_BATCH_SIZE = 100
+
+
+class LikeBatchSerializer(serializers.Serializer):
+    users = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        default=list,
+        max_length=MAX_BATCH_SIZE,
+    )
+    projects = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        default=list,
+        max_length=MAX_BATCH_SIZE,
+    )
+
+    def validate(self, attrs):
+        attrs["users"] = list(dict.fromkeys(attrs["users"]))
+        attrs["projects"] = list(dict.fromkeys(attrs["projects"]))
+        if not attrs["users"] and not attrs["projects"]:
+            raise serializers.ValidationError("Provide at least one user or project to like")
+        if len(attrs["users"]) + len(attrs["projects"]) > MAX_BATCH_SIZE:
+            raise serializers.ValidationError(f"A batch may contain at most {MAX_BATCH_SIZE} likes")
+        return attrs
+
+
+LIKE_FIELDS = ["id", "is_mutual", "created_at"]
+LIKED_USER_ROWS = RowSerializer(LIKE_FIELDS, nested=[("user", "liked_user", USER_ROWS)])
+LIKED_BY_ROWS = RowSerializer(LIKE_FIELDS, nested=[("user", "user", USER_ROWS)])
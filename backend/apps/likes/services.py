@@ -0,0 +1,131 @@
+from django.db import connections, router, transaction
+from django.db.models import Q
+
+from apps.counters import services as counters
+from apps.likes.models import Like
+from apps.matches.models import Match
+from apps.outbox import services as outbox
+from apps.outbox.models import OutboxEvent
+
+
+def lock_pairs(user_id, other_ids, using=None):
+    """Serialize writers on the unordered pairs (user_id, other) for the current transaction.
+
+    On PostgreSQL this takes transaction-scoped advisory locks in a fixed
+    order, so reciprocal likes of the same pair queue behind each other while
+    unrelated pairs never contend. SQLite has no row locks, so the database
+    write lock is taken up front, as BEGIN IMMEDIATE would.
+    """
+    using = using or router.db_for_write(Like)
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            keys = sorted({tuple(sorted((user_id % 2**31, other % 2**31))) for other in other_ids})
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(k.low, k.high) FROM ("
+                "SELECT low, high FROM unnest(%s::int[], %s::int[]) AS u(low, high) ORDER BY low, high"
+                ") AS k",
+                [[low for low, _ in keys], [high for _, high in keys]],
+            )
+        elif connection.vendor == "sqlite":
+            cursor.execute("UPDATE likes SET id = id WHERE 0 = 1")
+
+
+def _pairs_filter(user_id, other_ids):
+    return Q(user_id=user_id, liked_user_id__in=other_ids) | Q(user_id__in=other_ids, liked_user_id=user_id)
+
+
+def like_users(user_id, target_ids):
+    """Record ``user_id`` liking every user in ``target_ids`` and resolve mutual matches.
+
+    The caller is responsible for checking that the targets exist and are not
+    ``user_id`` itself. Returns ``{target_id: (created, became_mutual)}``.
+    """
+    target_ids = sorted(set(target_ids))
+    if not target_ids:
+        return {}
+
+    with transaction.atomic():
+        lock_pairs(user_id, target_ids)
+        given, received = {}, {}
+        rows = Like.objects.filter(_pairs_filter(user_id, target_ids)).values_list(
+            "user_id", "liked_user_id", "is_mutual"
+        )
+        for liker, liked, is_mutual in rows:
+            if liker == user_id:
+                given[liked] = is_mutual
+            else:
+                received[liker] = is_mutual
+
+        Like.objects.bulk_create(
+            [Like(user_id=user_id, liked_user_id=target) for target in target_ids if target not in given],
+            ignore_conflicts=True,
+        )
+
+        deltas = {(counters.USER_LIKES, target): 1 for target in target_ids if target not in given}
+
+        mutual = [t for t in target_ids if t in received and not (given.get(t) and received[t])]
+        if mutual:
+            Like.objects.filter(_pairs_filter(user_id, mutual)).update(is_mutual=True)
+            existing = set(Match.objects.filter(_pairs_filter(user_id, mutual)).values_list("user_id", "liked_user_id"))
+            matches = Match.objects.bulk_create(
+                [
+                    Match(user_id=a, liked_user_id=b, status=Match.STATUS_ACCEPTED)
+                    for target in mutual
+                    for a, b in ((user_id, target), (target, user_id))
+                    if (a, b) not in existing
+                ]
+            )
+            for match in matches:
+                key = (counters.USER_MATCHES, match.user_id)
+                deltas[key] = deltas.get(key, 0) + 1
+        else:
+            matches = []
+        counters.add(deltas)
+        outbox.emit_many(
+            [
+                (
+                    OutboxEvent.TOPIC_LIKE_CREATED,
+                    {"user_id": user_id, "liked_user_id": target, "mutual": target in mutual},
+                )
+                for target in target_ids
+                if target not in given
+            ]
+            + [(OutboxEvent.TOPIC_MATCH_CREATED, outbox.match_payload(match)) for match in matches]
+        )
+    return {target: (target not in given, target in mutual) for target in target_ids}
+
+
+def like_user(user_id, target_id):
+    """Record ``user_id`` liking ``target_id``. Returns ``(created, became_mutual)``."""
+    return like_users(user_id, [target_id])[target_id]
+
+
+def like_projects(user_id, project_ids):
+    """Record ``user_id`` liking every project in ``project_ids``.
+
+    Returns ``{project_id: created}``.
+    """
+    project_ids = sorted(set(project_ids))
+    if not project_ids:
+        return {}
+    with transaction.atomic():
+        # Self-likes are rejected, so the (user_id, user_id) pair is free to
+        # serialize this user's project likes without touching user pairs.
+        lock_pairs(user_id, [user_id])
+        existing = set(
+            Like.objects.filter(user_id=user_id, project_id__in=project_ids).values_list("project_id", flat=True)
+        )
+        Like.objects.bulk_create(
+            [Like(user_id=user_id, project_id=project) for project in project_ids if project not in existing],
+            ignore_conflicts=True,
+        )
+        counters.add({(counters.PROJECT_LIKES, project): 1 for project in project_ids if project not in existing})
+        outbox.emit_many(
+            [
+                (OutboxEvent.TOPIC_LIKE_CREATED, {"user_id": user_id, "project_id": project})
+                for project in project_ids
+                if project not in existing
+            ]
+        )
+    return {project: project not in existing for project in project_ids}
@@ -1,13 +1,25 @@
 from django.urls import path
 
-from apps.likes.views import LikeMatchesView, LikeProjectView, LikeUserView, UserLikedByView, UserLikesView
+from apps.likes.views import (
+    AsyncLikeMatchesView,
+    AsyncUserLikedByView,
+    AsyncUserLikesView,
+    LikeBatchView,
+    LikeMatchesView,
+    LikeProjectView,
+    LikeUserView,
+    UserLikedByView,
+    UserLikesView,
+)
+from config.async_views import pick_view
 
 urlpatterns = [
     # Static paths MUST come before parametric to avoid Django treating
     # "likes" and "liked-by" as integers.
-    path("likes/user/likes", UserLikesView.as_view()),
-    path("likes/user/liked-by", UserLikedByView.as_view()),
+    path("likes/user/likes", pick_view(UserLikesView, AsyncUserLikesView).as_view()),
+    path("likes/user/liked-by", pick_view(UserLikedByView, AsyncUserLikedByView).as_view()),
     path("likes/user/<int:user_id>", LikeUserView.as_view()),
     path("likes/project/<int:project_id>", LikeProjectView.as_view()),
-    path("likes/matches", LikeMatchesView.as_view()),
+    path("likes/matches", pick_view(LikeMatchesView, AsyncLikeMatchesView).as_view()),
+    path("likes/batch", LikeBatchView.as_view()),
 ]
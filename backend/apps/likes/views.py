@@ -1,6 +1,7 @@
 import logging
 
 from django.contrib.auth import get_user_model
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
@@ -8,148 +9,163 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.likes.models import Like
-from apps.matches.models import Match
+from apps.likes.serializers import LIKED_BY_ROWS, LIKED_USER_ROWS, LikeBatchSerializer
+from apps.likes.services import like_projects, like_user, like_users
 from apps.projects.models import Project
 from apps.users.serializers import UserSerializer
+from config.async_views import AsyncAPIView
+from config.idempotency import idempotent
+from config.pagination import CursorPaginator
+from config.throttling import WriteThrottle
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
-_USER_FIELDS = [
-    "id",
-    "email",
-    "username",
-    "full_name",
-    "bio",
-    "skills",
-    "experience",
-    "is_active",
-    "created_at",
-    "updated_at",
-]
-
-
-def _user_dict(user):
-    return {f: getattr(user, f) for f in _USER_FIELDS}
-
 
 class LikeUserView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = [WriteThrottle]
 
+    @idempotent
     def post(self, request, user_id):
-        target = get_object_or_404(User, pk=user_id)
+        if not User.objects.filter(pk=user_id).exists():
+            raise Http404
 
         if request.user.id == user_id:
             return Response({"detail": "Cannot like yourself"}, status=status.HTTP_400_BAD_REQUEST)
 
-        like, created = Like.objects.get_or_create(
-            user=request.user,
-            liked_user=target,
-            defaults={"is_mutual": False},
-        )
+        created, became_mutual = like_user(request.user.id, user_id)
         if created:
             logger.info("User liked: from=%s to=%s", request.user.id, user_id)
-
-        reverse = Like.objects.filter(
-            user=target,
-            liked_user=request.user,
-        ).first()
-        if reverse and not like.is_mutual:
-            like.is_mutual = True
-            like.save(update_fields=["is_mutual"])
-            reverse.is_mutual = True
-            reverse.save(update_fields=["is_mutual"])
-            Match.objects.get_or_create(
-                user=request.user,
-                liked_user=target,
-                defaults={"status": Match.STATUS_ACCEPTED},
-            )
-            Match.objects.get_or_create(
-                user=target,
-                liked_user=request.user,
-                defaults={"status": Match.STATUS_ACCEPTED},
-            )
+        if became_mutual:
             logger.info("Mutual match created: user=%s user=%s", request.user.id, user_id)
 
         return Response({"message": "Like created successfully"})
 
 
-class UserLikesView(APIView):
+class LikesListView(APIView):
+    """Base for the paginated like lists; subclasses set ``rows`` and ``likes()``."""
+
     permission_classes = [IsAuthenticated]
+    rows = None
+
+    def likes(self, request):
+        raise NotImplementedError
 
     def get(self, request):
-        likes = Like.objects.filter(
+        paginator = CursorPaginator()
+        page = paginator.paginate(self.likes(request), request)
+        return Response(self.rows.many(page), headers=paginator.get_headers())
+
+
+class UserLikesView(LikesListView):
+    rows = LIKED_USER_ROWS
+
+    def likes(self, request):
+        return Like.objects.filter(
             user=request.user,
             liked_user__isnull=False,
-        ).select_related("liked_user")
-
-        result = []
-        for like in likes:
-            result.append(
-                {
-                    "id": like.id,
-                    "is_mutual": like.is_mutual,
-                    "created_at": like.created_at,
-                    "user": _user_dict(like.liked_user),
-                }
-            )
-        return Response(result)
-
-
-class UserLikedByView(APIView):
-    permission_classes = [IsAuthenticated]
+        ).values(*LIKED_USER_ROWS.columns)
 
-    def get(self, request):
-        likes = Like.objects.filter(
-            liked_user=request.user,
-        ).select_related("user")
 
-        result = []
-        for like in likes:
-            result.append(
-                {
-                    "id": like.id,
-                    "is_mutual": like.is_mutual,
-                    "created_at": like.created_at,
-                    "user": _user_dict(like.user),
-                }
-            )
-        return Response(result)
+class UserLikedByView(LikesListView):
+    rows = LIKED_BY_ROWS
+
+    def likes(self, request):
+        return Like.objects.filter(
+            liked_user=request.user,
+        ).values(*LIKED_BY_ROWS.columns)
 
 
 class LikeProjectView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = [WriteThrottle]
 
+    @idempotent
     def post(self, request, project_id):
         project = get_object_or_404(Project, pk=project_id)
-        like, created = Like.objects.get_or_create(
-            user=request.user,
-            project=project,
-            defaults={"is_mutual": False},
-        )
+        created = like_projects(request.user.id, [project.pk])[project.pk]
         if created:
             logger.info("Project liked: user=%s project=%s", request.user.id, project_id)
-        return Response({"message": "Project liked successfully", "like_id": like.id})
+        like_id = Like.objects.filter(user=request.user, project=project).values_list("id", flat=True).get()
+        return Response({"message": "Project liked successfully", "like_id": like_id})
 
 
-class LikeMatchesView(APIView):
+class LikeBatchView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = [WriteThrottle]
 
-    def get(self, request):
-        likes = Like.objects.filter(
+    def post(self, request):
+        serializer = LikeBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user_ids = serializer.validated_data["users"]
+        project_ids = serializer.validated_data["projects"]
+
+        known_users = set(User.objects.filter(pk__in=user_ids).values_list("pk", flat=True)) if user_ids else set()
+        known_projects = (
+            set(Project.objects.filter(pk__in=project_ids).values_list("pk", flat=True)) if project_ids else set()
+        )
+        liked_users = like_users(request.user.id, [u for u in known_users if u != request.user.id])
+        liked_projects = like_projects(request.user.id, known_projects)
+
+        results = []
+        for user_id in user_ids:
+            item = {"type": "user", "id": user_id}
+            if user_id == request.user.id:
+                item["status"] = "invalid"
+            elif user_id not in liked_users:
+                item["status"] = "not_found"
+            else:
+                created, became_mutual = liked_users[user_id]
+                item["status"] = "created" if created else "exists"
+                item["match"] = became_mutual
+            results.append(item)
+        for project_id in project_ids:
+            item = {"type": "project", "id": project_id}
+            if project_id not in liked_projects:
+                item["status"] = "not_found"
+            else:
+                item["status"] = "created" if liked_projects[project_id] else "exists"
+            results.append(item)
+
+        logger.info(
+            "Batch like: user=%s users=%s projects=%s matches=%s",
+            request.user.id,
+            sum(1 for created, _ in liked_users.values() if created),
+            sum(1 for created in liked_projects.values() if created),
+            sum(1 for _, became_mutual in liked_users.values() if became_mutual),
+        )
+        return Response({"results": results})
+
+
+class LikeMatchesView(LikesListView):
+    rows = LIKED_USER_ROWS
+
+    def likes(self, request):
+        return Like.objects.filter(
             user=request.user,
             is_mutual=True,
             liked_user__isnull=False,
-        ).select_related("liked_user")
-
-        result = []
-        for like in likes:
-            result.append(
-                {
-                    "id": like.id,
-                    "is_mutual": like.is_mutual,
-                    "created_at": like.created_at,
-                    "user": _user_dict(like.liked_user),
-                }
-            )
-        return Response(result)
+        ).values(*LIKED_USER_ROWS.columns)
+
+
+# Async variants for ASGI workers (ASYNC_VIEWS).
+
+
+class AsyncLikesListView(AsyncAPIView):
+    async def get(self, request):
+        paginator = CursorPaginator()
+        page = await paginator.apaginate(self.likes(request), request)
+        return Response(self.rows.many(page), headers=paginator.get_headers())
+
+
+class AsyncUserLikesView(AsyncLikesListView, UserLikesView):
+    pass
+
+
+class AsyncUserLikedByView(AsyncLikesListView, UserLikedByView):
+    pass
+
+
+class AsyncLikeMatchesView(AsyncLikesListView, LikeMatchesView):
+    pass
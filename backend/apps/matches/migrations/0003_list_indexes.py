@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matches", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="match",
+            index=models.Index(fields=["user", "-created_at", "-id"], name="matches_user_created_idx"),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.9 on 2026-10-18 18:48
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def delete_duplicate_matches(apps, schema_editor):
+    # Keep the newest match per counterpart, the one the match list showed.
+    Match = apps.get_model("matches", "Match")
+    db = schema_editor.connection.alias
+    for target in ("liked_user", "project"):
+        matches = Match.objects.using(db).filter(**{f"{target}__isnull": False})
+        keep = matches.order_by().values("user", target).annotate(last=Max("id")).values("last")
+        matches.exclude(id__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matches", "0003_list_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_matches, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="match",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("liked_user__isnull", False)),
+                fields=("user", "liked_user"),
+                name="matches_unique_user_liked_user",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="match",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("project__isnull", False)),
+                fields=("user", "project"),
+                name="matches_unique_user_project",
+            ),
+        ),
+    ]
@@ -38,6 +38,21 @@ class Match(ExportModelOperationsMixin("match"), models.Model):
 
     class Meta:
         db_table = "matches"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "liked_user"],
+                condition=models.Q(liked_user__isnull=False),
+                name="matches_unique_user_liked_user",
+            ),
+            models.UniqueConstraint(
+                fields=["user", "project"],
+                condition=models.Q(project__isnull=False),
+                name="matches_unique_user_project",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["user", "-created_at", "-id"], name="matches_user_created_idx"),
+        ]
 
     def __str__(self):
         return f"Match {self.id} ({self.status})"
@@ -0,0 +1,11 @@
+from apps.projects.serializers import ProjectSerializer
+from apps.users.serializers import PUBLIC_USER_ROWS
+from config.rows import RowSerializer
+
+MATCH_FIELDS = ["id", "status", "created_at"]
+
+# Matches return the stored requirements string rather than the parsed list.
+MATCH_PROJECT_ROWS = RowSerializer(ProjectSerializer.Meta.fields)
+
+USER_MATCH_ROWS = RowSerializer(MATCH_FIELDS, nested=[("user", "liked_user", PUBLIC_USER_ROWS)])
+PROJECT_MATCH_ROWS = RowSerializer(MATCH_FIELDS, nested=[("project", "project", MATCH_PROJECT_ROWS)])
@@ -1,10 +1,18 @@
 from django.urls import path
 
-from apps.matches.views import CreateMatchView, MatchListView, PotentialMatchesView, UpdateMatchStatusView
+from apps.matches.views import (
+    AsyncMatchListView,
+    AsyncPotentialMatchesView,
+    CreateMatchView,
+    MatchListView,
+    PotentialMatchesView,
+    UpdateMatchStatusView,
+)
+from config.async_views import pick_view
 
 urlpatterns = [
-    path("matches/", MatchListView.as_view()),
-    path("matches/potential", PotentialMatchesView.as_view()),
+    path("matches/", pick_view(MatchListView, AsyncMatchListView).as_view()),
+    path("matches/potential", pick_view(PotentialMatchesView, AsyncPotentialMatchesView).as_view()),
     path("matches/<int:match_id>/status", UpdateMatchStatusView.as_view()),
     path("matches/<int:user_id>", CreateMatchView.as_view()),
 ]
@@ -1,153 +1,171 @@
 import logging
 
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, OuterRef
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.counters import services as counters
 from apps.likes.models import Like
+from apps.likes.services import lock_pairs
 from apps.matches.models import Match
+from apps.matches.serializers import PROJECT_MATCH_ROWS, USER_MATCH_ROWS
+from apps.outbox import services as outbox
+from apps.outbox.models import OutboxEvent
+from apps.users.serializers import PUBLIC_USER_ROWS
+from config.async_views import AsyncAPIView
+from config.idempotency import idempotent
+from config.pagination import CursorPaginator
+from config.throttling import WriteThrottle
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
-_USER_FIELDS = [
-    "id",
-    "username",
-    "full_name",
-    "bio",
-    "skills",
-    "experience",
-    "is_active",
-    "created_at",
-    "updated_at",
-]
-
-
-def _user_dict(user):
-    return {f: getattr(user, f) for f in _USER_FIELDS}
-
-
-def _project_dict(project):
-    return {
-        "id": project.id,
-        "title": project.title,
-        "description": project.description,
-        "requirements": project.requirements,
-        "budget": project.budget,
-        "duration": project.duration,
-        "status": project.status,
-        "owner_id": project.owner_id,
-        "created_at": project.created_at,
-        "updated_at": project.updated_at,
-    }
+
+def _match_rows(request):
+    """The user's matches as rows, or a 400 response for a bad status filter.
+
+    There is one match per counterpart (see the Match constraints), so the
+    list pages straight over the (user, created_at, id) index.
+    """
+    matches = Match.objects.filter(user=request.user)
+    match_status = request.query_params.get("status")
+    if match_status is not None:
+        valid = [value for value, _ in Match.STATUS_CHOICES]
+        if match_status not in valid:
+            return None, Response(
+                {"detail": f"Status must be one of: {valid}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        matches = matches.filter(status=match_status)
+    columns = dict.fromkeys(USER_MATCH_ROWS.columns + PROJECT_MATCH_ROWS.columns)
+    return matches.values(*columns), None
+
+
+def _match_page(page):
+    return [USER_MATCH_ROWS.to_dict(row) if row["liked_user__id"] else PROJECT_MATCH_ROWS.to_dict(row) for row in page]
+
+
+def _potential_users(request):
+    # NOT EXISTS anti-joins keep the exclusion in the database instead of
+    # shipping every liked/matched id back as an IN list.
+    liked = Like.objects.filter(user=request.user, liked_user=OuterRef("pk"))
+    matched = Match.objects.filter(user=request.user, liked_user=OuterRef("pk"))
+    return (
+        User.objects.exclude(pk=request.user.pk)
+        .filter(~Exists(liked), ~Exists(matched))
+        .values(*PUBLIC_USER_ROWS.columns)
+    )
 
 
 class MatchListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        matches = Match.objects.filter(user=request.user).select_related("liked_user", "project")
-        seen_users = set()
-        seen_projects = set()
-        result = []
-
-        for match in matches:
-            if match.liked_user_id and match.liked_user_id not in seen_users:
-                seen_users.add(match.liked_user_id)
-                result.append(
-                    {
-                        "id": match.id,
-                        "status": match.status,
-                        "created_at": match.created_at,
-                        "user": _user_dict(match.liked_user),
-                    }
-                )
-            elif match.project_id and match.project_id not in seen_projects:
-                seen_projects.add(match.project_id)
-                result.append(
-                    {
-                        "id": match.id,
-                        "status": match.status,
-                        "created_at": match.created_at,
-                        "project": _project_dict(match.project),
-                    }
-                )
-
-        return Response(result)
+        rows, error = _match_rows(request)
+        if error is not None:
+            return error
+        paginator = CursorPaginator()
+        page = paginator.paginate(rows, request)
+        return Response(_match_page(page), headers=paginator.get_headers())
 
 
 class PotentialMatchesView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        existing_match_ids = set(
-            Match.objects.filter(user=request.user).exclude(liked_user=None).values_list("liked_user_id", flat=True)
-        )
-        existing_like_ids = set(
-            Like.objects.filter(user=request.user).exclude(liked_user=None).values_list("liked_user_id", flat=True)
-        )
-        excluded_ids = existing_match_ids | existing_like_ids
-
-        users = User.objects.exclude(id=request.user.id).exclude(id__in=excluded_ids)
-        result = [_user_dict(u) for u in users]
-        return Response(result)
+        paginator = CursorPaginator()
+        page = paginator.paginate(_potential_users(request), request)
+        return Response(PUBLIC_USER_ROWS.many(page), headers=paginator.get_headers())
 
 
 class CreateMatchView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = [WriteThrottle]
 
+    @idempotent
     def post(self, request, user_id):
         target = get_object_or_404(User, pk=user_id)
 
-        match = Match.objects.create(
-            user=request.user,
-            liked_user=target,
-            status=Match.STATUS_PENDING,
-        )
-        logger.info("Match created: id=%s from=%s to=%s", match.id, request.user.id, user_id)
-
-        reverse_like = Like.objects.filter(
-            user=target,
-            liked_user=request.user,
-        ).first()
-        if reverse_like and not reverse_like.is_mutual:
-            own_like = Like.objects.filter(
+        with transaction.atomic():
+            # Same lock as like_users(), so a mutual like cannot add its own
+            # match for this pair in between.
+            lock_pairs(request.user.id, [target.id])
+            match, created = Match.objects.get_or_create(
                 user=request.user,
                 liked_user=target,
+                defaults={"status": Match.STATUS_PENDING},
+            )
+            if not created:
+                return Response(USER_MATCH_ROWS.from_instance(match))
+
+            reverse_like = Like.objects.filter(
+                user=target,
+                liked_user=request.user,
             ).first()
-            if own_like:
-                own_like.is_mutual = True
-                own_like.save(update_fields=["is_mutual"])
-            reverse_like.is_mutual = True
-            reverse_like.save(update_fields=["is_mutual"])
-
-        return Response(
-            {
-                "id": match.id,
-                "status": match.status,
-                "created_at": match.created_at,
-                "user": _user_dict(target),
-            },
-            status=status.HTTP_201_CREATED,
-        )
+            if reverse_like and not reverse_like.is_mutual:
+                own_like = Like.objects.filter(
+                    user=request.user,
+                    liked_user=target,
+                ).first()
+                if own_like:
+                    own_like.is_mutual = True
+                    own_like.save(update_fields=["is_mutual"])
+                reverse_like.is_mutual = True
+                reverse_like.save(update_fields=["is_mutual"])
+            outbox.emit(OutboxEvent.TOPIC_MATCH_CREATED, outbox.match_payload(match))
+        logger.info("Match created: id=%s from=%s to=%s", match.id, request.user.id, user_id)
+
+        return Response(USER_MATCH_ROWS.from_instance(match), status=status.HTTP_201_CREATED)
 
 
 class UpdateMatchStatusView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = [WriteThrottle]
 
     def put(self, request, match_id):
-        match = get_object_or_404(Match, pk=match_id, user=request.user)
         new_status = request.data.get("status")
         valid = [Match.STATUS_PENDING, Match.STATUS_ACCEPTED, Match.STATUS_REJECTED]
-        if new_status not in valid:
-            return Response(
-                {"detail": f"Status must be one of: {valid}"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        match.status = new_status
-        match.save(update_fields=["status", "updated_at"])
+        with transaction.atomic():
+            match = get_object_or_404(Match.objects.select_for_update(), pk=match_id, user=request.user)
+            if new_status not in valid:
+                return Response(
+                    {"detail": f"Status must be one of: {valid}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            previous_status = match.status
+            was_accepted = previous_status == Match.STATUS_ACCEPTED
+            match.status = new_status
+            match.save(update_fields=["status", "updated_at"])
+            counters.add({(counters.USER_MATCHES, match.user_id): (new_status == Match.STATUS_ACCEPTED) - was_accepted})
+            if previous_status != new_status:
+                outbox.emit(
+                    OutboxEvent.TOPIC_MATCH_STATUS_CHANGED,
+                    outbox.match_payload(match, previous_status=previous_status),
+                )
         logger.info("Match status updated: id=%s status=%s user=%s", match_id, new_status, request.user.id)
         return Response({"id": match.id, "status": match.status})
+
+
+# Async variants for ASGI workers (ASYNC_VIEWS).
+
+
+class AsyncMatchListView(AsyncAPIView, MatchListView):
+    async def get(self, request):
+        rows, error = _match_rows(request)
+        if error is not None:
+            return error
+        paginator = CursorPaginator()
+        page = await paginator.apaginate(rows, request)
+        return Response(_match_page(page), headers=paginator.get_headers())
+
+
+class AsyncPotentialMatchesView(AsyncAPIView, PotentialMatchesView):
+    async def get(self, request):
+        paginator = CursorPaginator()
+        page = await paginator.apaginate(_potential_users(request), request)
+        return Response(PUBLIC_USER_ROWS.many(page), headers=paginator.get_headers())
@@ -0,0 +1,38 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from prometheus_client import start_http_server
+
+from apps.outbox import services
+
+
+class Command(BaseCommand):
+    help = "Publish outbox events to the Redis Stream"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Publish the current backlog and exit")
+        parser.add_argument(
+            "--metrics-port",
+            type=int,
+            default=settings.OUTBOX_RELAY_METRICS_PORT,
+            help="Port to serve Prometheus metrics on; 0 disables",
+        )
+
+    def handle(self, *args, **options):
+        redis = services.redis_client()
+        if options["once"]:
+            total = 0
+            while sent := services.relay_batch(redis):
+                total += sent
+            services.update_lag(redis)
+            self.stdout.write(self.style.SUCCESS(f"Published {total} events"))
+            return
+
+        if options["metrics_port"]:
+            start_http_server(options["metrics_port"])
+        stopping = []
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: stopping.append(True))
+        self.stdout.write(f"Relaying outbox to stream '{settings.OUTBOX_STREAM}'")
+        services.run_relay(redis, stop=lambda: bool(stopping))
@@ -0,0 +1,25 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxEvent(models.Model):
+    """A domain event waiting to be published to the Redis Stream.
+
+    Rows are written in the same transaction as the change they describe and
+    deleted by the relay once published, so the table only holds the backlog.
+    """
+
+    TOPIC_LIKE_CREATED = "like.created"
+    TOPIC_MATCH_CREATED = "match.created"
+    TOPIC_MATCH_STATUS_CHANGED = "match.status_changed"
+
+    id = models.BigAutoField(primary_key=True)
+    topic = models.CharField(max_length=64)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "outbox_events"
+
+    def __str__(self):
+        return f"{self.topic}#{self.id}"
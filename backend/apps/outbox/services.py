@@ -0,0 +1,188 @@
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from prometheus_client import Counter, Gauge
+
+from apps.outbox.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+EVENTS_PUBLISHED = Counter("outbox_events_published", "Outbox events published to the Redis Stream", ["topic"])
+OUTBOX_PENDING = Gauge("outbox_pending_events", "Outbox events not yet published", multiprocess_mode="livemax")
+OUTBOX_OLDEST = Gauge(
+    "outbox_oldest_pending_seconds", "Age of the oldest unpublished outbox event", multiprocess_mode="livemax"
+)
+STREAM_GROUP_LAG = Gauge(
+    "stream_consumer_group_lag",
+    "Stream entries not yet delivered to a consumer group",
+    ["group"],
+    multiprocess_mode="livemax",
+)
+STREAM_GROUP_PENDING = Gauge(
+    "stream_consumer_group_pending",
+    "Entries delivered to a consumer group but not acknowledged",
+    ["group"],
+    multiprocess_mode="livemax",
+)
+
+
+def match_payload(match, **extra):
+    return {
+        "match_id": match.pk,
+        "user_id": match.user_id,
+        "liked_user_id": match.liked_user_id,
+        "status": match.status,
+        **extra,
+    }
+
+
+def emit_many(events, using=None):
+    """Queue ``[(topic, payload), ...]`` for publishing with a single insert.
+
+    Call it inside the transaction that makes the change, so the events
+    commit or roll back together with it.
+    """
+    if events:
+        OutboxEvent.objects.using(using).bulk_create(
+            [OutboxEvent(topic=topic, payload=payload) for topic, payload in events]
+        )
+
+
+def emit(topic, payload, using=None):
+    emit_many([(topic, payload)], using=using)
+
+
+def redis_client():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default")
+
+
+def relay_batch(redis, batch_size=None):
+    """Publish the oldest unpublished events to the stream. Returns how many were sent.
+
+    Events are deleted only after Redis accepted them and in the same
+    transaction that locked them, so a crash in between publishes them again
+    (at-least-once). ``SKIP LOCKED`` lets several relays share the backlog.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    with transaction.atomic():
+        events = list(OutboxEvent.objects.select_for_update(skip_locked=True).order_by("id")[:batch_size])
+        if not events:
+            return 0
+        pipe = redis.pipeline(transaction=False)
+        for event in events:
+            pipe.xadd(
+                settings.OUTBOX_STREAM,
+                {
+                    "id": event.id,
+                    "topic": event.topic,
+                    "payload": json.dumps(event.payload, cls=DjangoJSONEncoder),
+                    "created_at": event.created_at.isoformat(),
+                },
+                maxlen=settings.OUTBOX_STREAM_MAXLEN,
+                approximate=True,
+            )
+        pipe.execute()
+        OutboxEvent.objects.filter(id__in=[event.id for event in events]).delete()
+    for event in events:
+        EVENTS_PUBLISHED.labels(topic=event.topic).inc()
+    return len(events)
+
+
+def update_lag(redis):
+    """Refresh the backlog and consumer group lag gauges."""
+    oldest = OutboxEvent.objects.order_by("id").values_list("created_at", flat=True).first()
+    OUTBOX_PENDING.set(OutboxEvent.objects.count())
+    OUTBOX_OLDEST.set((timezone.now() - oldest).total_seconds() if oldest else 0)
+    try:
+        groups = redis.xinfo_groups(settings.OUTBOX_STREAM)
+    except Exception:
+        # The stream does not exist until the first event is published.
+        groups = []
+    for group in groups:
+        name = group["name"].decode() if isinstance(group["name"], bytes) else group["name"]
+        # "lag" is reported by Redis 7+; it is None while Redis cannot tell.
+        if group.get("lag") is not None:
+            STREAM_GROUP_LAG.labels(group=name).set(group["lag"])
+        STREAM_GROUP_PENDING.labels(group=name).set(group["pending"])
+
+
+def ensure_group(redis, group):
+    try:
+        redis.xgroup_create(settings.OUTBOX_STREAM, group, id="0", mkstream=True)
+    except Exception as exc:
+        if "BUSYGROUP" not in str(exc):
+            raise
+
+
+def _decode(fields):
+    fields = {
+        (key.decode() if isinstance(key, bytes) else key): (value.decode() if isinstance(value, bytes) else value)
+        for key, value in fields.items()
+    }
+    return {
+        "id": int(fields["id"]),
+        "topic": fields["topic"],
+        "payload": json.loads(fields["payload"]),
+        "created_at": fields["created_at"],
+    }
+
+
+def consume(redis, group, consumer, handler, count=100, block_ms=5000):
+    """Hand one batch of stream events for ``group`` to ``handler`` and acknowledge them.
+
+    The group's offset lives in Redis, so a restarted consumer resumes where
+    the group left off. Entries another consumer received but did not
+    acknowledge within ``OUTBOX_CLAIM_IDLE`` seconds are claimed and
+    retried; an entry is only acknowledged after ``handler(event)``
+    returned, so handlers must tolerate duplicates. Returns the number of
+    events handled.
+    """
+    ensure_group(redis, group)
+    _, claimed, *_ = redis.xautoclaim(
+        settings.OUTBOX_STREAM, group, consumer, min_idle_time=int(settings.OUTBOX_CLAIM_IDLE * 1000), count=count
+    )
+    entries = list(claimed)
+    if not entries:
+        for _, messages in (
+            redis.xreadgroup(group, consumer, {settings.OUTBOX_STREAM: ">"}, count=count, block=block_ms) or []
+        ):
+            entries.extend(messages)
+    handled = 0
+    for entry_id, fields in entries:
+        if not fields:
+            # Trimmed from the stream before it could be retried.
+            redis.xack(settings.OUTBOX_STREAM, group, entry_id)
+            continue
+        event = _decode(fields)
+        # The stream entry id orders events across the whole stream.
+        event["stream_id"] = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+        handler(event)
+        redis.xack(settings.OUTBOX_STREAM, group, entry_id)
+        handled += 1
+    return handled
+
+
+def run_relay(redis, interval=None, stop=None):
+    """Publish continuously until ``stop()`` returns true."""
+    interval = settings.OUTBOX_POLL_INTERVAL if interval is None else interval
+    last_lag_update = 0.0
+    while not (stop and stop()):
+        close_old_connections()
+        try:
+            sent = relay_batch(redis)
+            if time.monotonic() - last_lag_update >= settings.OUTBOX_LAG_INTERVAL:
+                update_lag(redis)
+                last_lag_update = time.monotonic()
+        except Exception:
+            logger.warning("Outbox relay iteration failed", exc_info=True)
+            sent = 0
+        # A full batch means there is more backlog; keep going without sleeping.
+        if sent < settings.OUTBOX_BATCH_SIZE:
+            time.sleep(interval)
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
 
 
 class ProjectsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.projects"
+
+    def ready(self):
+        from apps.projects import cache
+
+        post_save.connect(cache.on_project_saved, sender="projects.Project")
+        post_delete.connect(cache.on_project_deleted, sender="projects.Project")
+        post_save.connect(cache.on_owner_saved, sender=settings.AUTH_USER_MODEL)
+        post_delete.connect(cache.on_owner_deleted, sender=settings.AUTH_USER_MODEL)
@@ -0,0 +1,118 @@
+import hashlib
+import logging
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from prometheus_client import Counter
+
+from apps.projects.models import Project
+from apps.users.serializers import USER_ROWS
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "projects:version"
+
+CACHE_REQUESTS = Counter("project_cache_requests", "Project response cache lookups", ["endpoint", "result"])
+CACHE_INVALIDATIONS = Counter("project_cache_invalidations", "Project response cache invalidations", ["reason"])
+
+# Every cached project response embeds the owner, so one namespace version
+# covers list and detail pages; bumping it orphans every entry at once and the
+# orphans age out through their TTL.
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seeded from the clock so an evicted version never repeats an old one.
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _versioned(key):
+    try:
+        return f"{key}:v{_version()}"
+    except Exception:
+        logger.warning("Project cache unavailable", exc_info=True)
+        return None
+
+
+def list_key(request):
+    # A cached page carries a Link header built from the absolute request URI,
+    # so the key covers all of it; sorting the parameters keeps their order
+    # from splitting the cache.
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    parts = [request.scheme, request.get_host(), request.path, query]
+    digest = hashlib.sha1("\x1f".join(parts).encode("utf-8"), usedforsecurity=False).hexdigest()
+    return _versioned(f"projects:list:{digest}")
+
+
+def detail_key(project_id):
+    return _versioned(f"projects:item:{project_id}")
+
+
+def lookup(key, endpoint):
+    value = None
+    if key is not None:
+        try:
+            value = cache.get(key)
+        except Exception:
+            logger.warning("Project cache unavailable", exc_info=True)
+            key = None
+    if key is None:
+        CACHE_REQUESTS.labels(endpoint=endpoint, result="error").inc()
+        return None
+    CACHE_REQUESTS.labels(endpoint=endpoint, result="miss" if value is None else "hit").inc()
+    return value
+
+
+def store(key, value):
+    if key is None:
+        return
+    try:
+        cache.set(key, value, timeout=settings.PROJECT_CACHE_TIMEOUT)
+    except Exception:
+        logger.warning("Project cache unavailable", exc_info=True)
+
+
+def invalidate(reason):
+    def bump():
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        except Exception:
+            logger.warning("Project cache invalidation failed: reason=%s", reason, exc_info=True)
+            return
+        CACHE_INVALIDATIONS.labels(reason=reason).inc()
+
+    # Bump now so this process stops serving the old version, and again after
+    # commit so a concurrent reader cannot re-cache rows from before the write.
+    bump()
+    if not transaction.get_autocommit():
+        transaction.on_commit(bump)
+
+
+def on_project_saved(sender, **kwargs):
+    invalidate("project_saved")
+
+
+def on_project_deleted(sender, **kwargs):
+    invalidate("project_deleted")
+
+
+def on_owner_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    # A new user owns no projects yet, and a save that writes none of the
+    # owner columns embedded in project responses (the last_login update on
+    # every login, say) leaves the cached pages as they were.
+    if created or (update_fields is not None and set(USER_ROWS.fields).isdisjoint(update_fields)):
+        return
+    if Project.objects.filter(owner_id=instance.pk).exists():
+        invalidate("owner_saved")
+
+
+def on_owner_deleted(sender, **kwargs):
+    invalidate("owner_deleted")
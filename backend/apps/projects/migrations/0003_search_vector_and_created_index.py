@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:56
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(fields=["-created_at", "-id"], name="projects_created_id_idx"),
+        ),
+    ]
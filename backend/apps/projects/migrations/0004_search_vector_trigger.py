@@ -0,0 +1,68 @@
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class PostgreSQLOnly(migrations.RunSQL):
+    """The tsvector trigger and GIN index need PostgreSQL; the SQLite test database skips them."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0003_search_vector_and_created_index"),
+    ]
+
+    # The tsvector column is maintained by a trigger rather than in Python so
+    # that bulk_create/update/COPY writes keep it current as well.
+    operations = [
+        PostgreSQLOnly(
+            sql=[
+                """
+                CREATE FUNCTION projects_search_vector_update() RETURNS trigger AS $$
+                BEGIN
+                    NEW.search_vector :=
+                        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+                        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B') ||
+                        setweight(to_tsvector('english', coalesce(NEW.requirements, '')), 'C');
+                    RETURN NEW;
+                END
+                $$ LANGUAGE plpgsql
+                """,
+                """
+                CREATE TRIGGER projects_search_vector_trigger
+                BEFORE INSERT OR UPDATE OF title, description, requirements ON projects
+                FOR EACH ROW EXECUTE FUNCTION projects_search_vector_update()
+                """,
+                "UPDATE projects SET title = title",
+            ],
+            reverse_sql=[
+                "DROP TRIGGER projects_search_vector_trigger ON projects",
+                "DROP FUNCTION projects_search_vector_update()",
+                "UPDATE projects SET search_vector = NULL",
+            ],
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                PostgreSQLOnly(
+                    sql="CREATE INDEX projects_search_vector_gin ON projects USING gin (search_vector)",
+                    reverse_sql="DROP INDEX projects_search_vector_gin",
+                ),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="project",
+                    index=django.contrib.postgres.indexes.GinIndex(
+                        fields=["search_vector"], name="projects_search_vector_gin"
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django_prometheus.models import ExportModelOperationsMixin
 
@@ -26,9 +28,15 @@ class Project(ExportModelOperationsMixin("project"), models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by a database trigger, see migration 0004_search_vector_trigger.
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         db_table = "projects"
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="projects_created_id_idx"),
+            GinIndex(fields=["search_vector"], name="projects_search_vector_gin"),
+        ]
 
     def __str__(self):
         return self.title
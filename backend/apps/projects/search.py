@@ -0,0 +1,45 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+
+SEARCH_CONFIG = "english"
+SEARCH_MODES = ("websearch", "phrase", "prefix", "plain")
+
+DEFAULT_ORDERING = ("-created_at", "-id")
+RANKED_ORDERING = ("-rank", "-created_at", "-id")
+
+
+def prefix_tsquery(text):
+    terms = re.findall(r"\w+", text)
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def build_search_query(text, mode="websearch"):
+    if mode == "prefix":
+        raw = prefix_tsquery(text)
+        if not raw:
+            return None
+        return SearchQuery(raw, search_type="raw", config=SEARCH_CONFIG)
+    return SearchQuery(text, search_type=mode, config=SEARCH_CONFIG)
+
+
+def search_projects(queryset, text, mode="websearch"):
+    """Filter ``queryset`` by ``text`` and return it with the ordering to paginate on.
+
+    PostgreSQL uses the GIN-indexed tsvector and ranks by ``ts_rank``; other
+    backends (the SQLite test settings) fall back to a case-insensitive
+    substring match in creation order.
+    """
+    if connections[queryset.db].vendor != "postgresql":
+        return queryset.filter(Q(title__icontains=text) | Q(description__icontains=text)), DEFAULT_ORDERING
+
+    query = build_search_query(text, mode)
+    if query is None:
+        return queryset.none(), DEFAULT_ORDERING
+    # ts_rank returns a real; casting to double keeps the value exact when it
+    # round-trips through a pagination cursor.
+    rank = Cast(SearchRank(F("search_vector"), query), FloatField())
+    return queryset.annotate(rank=rank).filter(search_vector=query), RANKED_ORDERING
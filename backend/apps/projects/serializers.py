@@ -3,7 +3,8 @@ import json
 from rest_framework import serializers
 
 from apps.projects.models import Project
-from apps.users.serializers import UserSerializer
+from apps.users.serializers import USER_ROWS, UserSerializer
+from config.rows import RowSerializer
 
 
 class RequirementsField(serializers.Field):
@@ -55,3 +56,10 @@ class ProjectWithOwnerSerializer(ProjectSerializer):
 
     class Meta(ProjectSerializer.Meta):
         fields = ProjectSerializer.Meta.fields + ["owner"]
+
+
+PROJECT_WITH_OWNER_ROWS = RowSerializer(
+    ProjectSerializer.Meta.fields,
+    converters={"requirements": RequirementsField().to_representation},
+    nested=[("owner", "owner", USER_ROWS)],
+)
@@ -1,8 +1,14 @@
 from django.urls import path
 
-from apps.projects.views import ProjectDetailView, ProjectListCreateView
+from apps.projects.views import (
+    AsyncProjectDetailView,
+    AsyncProjectListCreateView,
+    ProjectDetailView,
+    ProjectListCreateView,
+)
+from config.async_views import pick_view
 
 urlpatterns = [
-    path("projects/", ProjectListCreateView.as_view()),
-    path("projects/<int:project_id>", ProjectDetailView.as_view()),
+    path("projects/", pick_view(ProjectListCreateView, AsyncProjectListCreateView).as_view()),
+    path("projects/<int:project_id>", pick_view(ProjectDetailView, AsyncProjectDetailView).as_view()),
 ]
@@ -1,18 +1,46 @@
 import logging
 
-from django.db.models import Q
+from asgiref.sync import sync_to_async
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.counters import services as counters
+from apps.projects import cache
 from apps.projects.models import Project
-from apps.projects.serializers import ProjectSerializer, ProjectWithOwnerSerializer
+from apps.projects.search import DEFAULT_ORDERING, SEARCH_MODES, search_projects
+from apps.projects.serializers import PROJECT_WITH_OWNER_ROWS, ProjectSerializer
+from config.async_views import AsyncAPIView
+from config.conditional import conditional_headers, not_modified
+from config.pagination import CursorPaginator
 
 logger = logging.getLogger(__name__)
 
 
+def _list_rows(request):
+    """The ``.values()`` queryset and paginator for a list request, or an error response."""
+    qs = Project.objects.all()
+    ordering = DEFAULT_ORDERING
+    search = request.query_params.get("search")
+    if search:
+        mode = request.query_params.get("search_mode", "websearch")
+        if mode not in SEARCH_MODES:
+            return None, Response(
+                {"detail": f"search_mode must be one of: {list(SEARCH_MODES)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        qs, ordering = search_projects(qs, search, mode)
+    # The paginator reads the cursor position from the row, so ordering
+    # annotations such as ``rank`` have to be selected alongside the fields.
+    columns = PROJECT_WITH_OWNER_ROWS.columns
+    columns = columns + [f.lstrip("-") for f in ordering if f.lstrip("-") not in columns]
+    # 100 rows per page, as the list returned before it had cursors.
+    return (qs.values(*columns), CursorPaginator(ordering=ordering, page_size=100, max_page_size=500)), None
+
+
 class ProjectListCreateView(APIView):
     def get_permissions(self):
         if self.request.method == "GET":
@@ -20,14 +48,22 @@ class ProjectListCreateView(APIView):
         return [IsAuthenticated()]
 
     def get(self, request):
-        qs = Project.objects.select_related("owner").all().order_by("-created_at")
-        search = request.query_params.get("search")
-        if search:
-            qs = qs.filter(Q(title__icontains=search) | Q(description__icontains=search))
-        skip = int(request.query_params.get("skip", 0))
-        limit = int(request.query_params.get("limit", 100))
-        qs = qs[skip : skip + limit]
-        return Response(ProjectWithOwnerSerializer(qs, many=True).data)
+        key = cache.list_key(request)
+        cached = cache.lookup(key, "list")
+        if cached is not None:
+            data, headers = cached
+            return not_modified(request, headers) or Response(data, headers=headers)
+
+        query, error = _list_rows(request)
+        if error is not None:
+            return error
+        rows, paginator = query
+        data = counters.annotate(
+            PROJECT_WITH_OWNER_ROWS.many(paginator.paginate(rows, request)), likes_count=counters.PROJECT_LIKES
+        )
+        headers = {**paginator.get_headers(), **conditional_headers(data)}
+        cache.store(key, (data, headers))
+        return not_modified(request, headers) or Response(data, headers=headers)
 
     def post(self, request):
         serializer = ProjectSerializer(data=request.data)
@@ -39,6 +75,16 @@ class ProjectListCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def _detail(row):
+    if row is None:
+        raise Http404
+    return PROJECT_WITH_OWNER_ROWS.to_dict(row)
+
+
+def _detail_entry(data):
+    return data, conditional_headers(data)
+
+
 class ProjectDetailView(APIView):
     def get_permissions(self):
         if self.request.method == "GET":
@@ -46,8 +92,15 @@ class ProjectDetailView(APIView):
         return [IsAuthenticated()]
 
     def get(self, request, project_id):
-        project = get_object_or_404(Project.objects.select_related("owner"), pk=project_id)
-        return Response(ProjectWithOwnerSerializer(project).data)
+        key = cache.detail_key(project_id)
+        cached = cache.lookup(key, "detail")
+        if cached is None:
+            row = Project.objects.values(*PROJECT_WITH_OWNER_ROWS.columns).filter(pk=project_id).first()
+            [data] = counters.annotate([_detail(row)], likes_count=counters.PROJECT_LIKES)
+            cached = _detail_entry(data)
+            cache.store(key, cached)
+        data, headers = cached
+        return not_modified(request, headers) or Response(data, headers=headers)
 
     def put(self, request, project_id):
         project = get_object_or_404(Project, pk=project_id)
@@ -69,3 +122,38 @@ class ProjectDetailView(APIView):
         project.delete()
         logger.info("Project deleted: id=%s user=%s", project_id, request.user.id)
         return Response({"message": "Project deleted successfully"})
+
+
+# Async variants for ASGI workers (ASYNC_VIEWS); writes stay on the sync handlers.
+
+
+class AsyncProjectListCreateView(AsyncAPIView, ProjectListCreateView):
+    async def get(self, request):
+        key = await sync_to_async(cache.list_key)(request)
+        cached = await sync_to_async(cache.lookup)(key, "list")
+        if cached is not None:
+            data, headers = cached
+            return not_modified(request, headers) or Response(data, headers=headers)
+
+        query, error = _list_rows(request)
+        if error is not None:
+            return error
+        rows, paginator = query
+        page = await paginator.apaginate(rows, request)
+        data = await counters.aannotate(PROJECT_WITH_OWNER_ROWS.many(page), likes_count=counters.PROJECT_LIKES)
+        headers = {**paginator.get_headers(), **conditional_headers(data)}
+        await sync_to_async(cache.store)(key, (data, headers))
+        return not_modified(request, headers) or Response(data, headers=headers)
+
+
+class AsyncProjectDetailView(AsyncAPIView, ProjectDetailView):
+    async def get(self, request, project_id):
+        key = await sync_to_async(cache.detail_key)(project_id)
+        cached = await sync_to_async(cache.lookup)(key, "detail")
+        if cached is None:
+            row = await Project.objects.values(*PROJECT_WITH_OWNER_ROWS.columns).filter(pk=project_id).afirst()
+            [data] = await counters.aannotate([_detail(row)], likes_count=counters.PROJECT_LIKES)
+            cached = _detail_entry(data)
+            await sync_to_async(cache.store)(key, cached)
+        data, headers = cached
+        return not_modified(request, headers) or Response(data, headers=headers)
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
 
 
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.users"
+
+    def ready(self):
+        from apps.users import cache
+
+        post_save.connect(cache.on_user_saved, sender=settings.AUTH_USER_MODEL)
+        post_delete.connect(cache.on_user_deleted, sender=settings.AUTH_USER_MODEL)
@@ -0,0 +1,134 @@
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from prometheus_client import Counter
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from apps.users.serializers import UserSerializer
+
+logger = logging.getLogger(__name__)
+
+AUTH_CACHE_REQUESTS = Counter("auth_user_cache_requests", "Authenticated user cache lookups", ["result"])
+AUTH_CACHE_INVALIDATIONS = Counter("auth_user_cache_invalidations", "Authenticated user cache invalidations")
+
+# Per-process copy in front of Redis. Other workers cannot be told to drop an
+# entry, so AUTH_USER_LOCAL_CACHE_TIMEOUT bounds how long a change made
+# elsewhere (such as a deactivation) can go unnoticed here.
+_local = {}
+_LOCAL_MAX_ENTRIES = 10000
+
+# Columns the API reads from request.user: what UserSerializer returns and the
+# flags that authentication and permission checks look at. The rest, the
+# password hash in particular, is never cached and loads from the database on
+# access. Token revocation only needs the digest simplejwt puts in the token.
+# Model field order, as Model.from_db() expects.
+_FIELDS = [
+    field.attname
+    for field in get_user_model()._meta.concrete_fields
+    if field.attname in {*UserSerializer.Meta.fields, "is_staff", "is_superuser"}
+]
+_PASSWORD_DIGEST = "password_digest"
+
+
+def _key(user_id):
+    return f"auth:user:v2:{user_id}"
+
+
+def _to_row(user):
+    row = {name: getattr(user, name) for name in _FIELDS}
+    row[_PASSWORD_DIGEST] = get_md5_hash_password(user.password)
+    return row
+
+
+def _from_row(row):
+    User = get_user_model()
+    user = User.from_db(DEFAULT_DB_ALIAS, _FIELDS, [row[name] for name in _FIELDS])
+    user.password_digest = row[_PASSWORD_DIGEST]
+    return user
+
+
+def _load(user_id):
+    User = get_user_model()
+    # Read from the primary: the token may belong to a user created moments ago.
+    user = User.objects.using(DEFAULT_DB_ALIAS).filter(pk=user_id).only(*_FIELDS, "password").first()
+    return None if user is None else _to_row(user)
+
+
+def get_user(user_id):
+    """Return the user with ``user_id``, or ``None`` if it does not exist.
+
+    Every call returns a fresh instance, so callers may modify and save it;
+    columns that are not cached are deferred. ``password_digest`` is set for
+    the token revocation check.
+    """
+    local_timeout = settings.AUTH_USER_LOCAL_CACHE_TIMEOUT
+    timeout = settings.AUTH_USER_CACHE_TIMEOUT
+    now = time.monotonic()
+
+    entry = _local.get(user_id)
+    if entry is not None and entry[0] > now:
+        AUTH_CACHE_REQUESTS.labels(result="local").inc()
+        return _from_row(entry[1])
+
+    row = None
+    result = "miss"
+    if timeout > 0:
+        try:
+            row = cache.get(_key(user_id))
+        except Exception:
+            logger.warning("User cache unavailable", exc_info=True)
+            result = "error"
+    if row is not None:
+        result = "redis"
+    else:
+        row = _load(user_id)
+        if row is None:
+            AUTH_CACHE_REQUESTS.labels(result=result).inc()
+            return None
+        if timeout > 0 and result != "error":
+            try:
+                cache.set(_key(user_id), row, timeout=timeout)
+            except Exception:
+                logger.warning("User cache unavailable", exc_info=True)
+    AUTH_CACHE_REQUESTS.labels(result=result).inc()
+
+    if local_timeout > 0:
+        if len(_local) >= _LOCAL_MAX_ENTRIES:
+            _local.clear()
+        _local[user_id] = (now + local_timeout, row)
+    return _from_row(row)
+
+
+def invalidate(user_id):
+    def drop():
+        _local.pop(user_id, None)
+        try:
+            cache.delete(_key(user_id))
+        except Exception:
+            logger.warning("User cache invalidation failed: user=%s", user_id, exc_info=True)
+            return
+        AUTH_CACHE_INVALIDATIONS.inc()
+
+    # Drop now, and again after commit so a concurrent request cannot re-cache
+    # the row as it was before this transaction.
+    drop()
+    if not transaction.get_autocommit():
+        transaction.on_commit(drop)
+
+
+def clear_local():
+    _local.clear()
+
+
+def on_user_saved(sender, instance, created=False, **kwargs):
+    # Nothing can be cached for a user that did not exist yet.
+    if not created:
+        invalidate(instance.pk)
+
+
+def on_user_deleted(sender, instance, **kwargs):
+    invalidate(instance.pk)
@@ -0,0 +1,390 @@
+import functools
+import io
+import itertools
+import math
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max
+
+from apps.counters import services as counters
+from apps.likes.models import Like
+from apps.matches.models import Match
+from apps.projects.models import Project
+from apps.users.models import User
+
+SKILLS = [
+    "Python",
+    "Django",
+    "FastAPI",
+    "PostgreSQL",
+    "Redis",
+    "Docker",
+    "Kubernetes",
+    "React",
+    "Vue.js",
+    "TypeScript",
+    "Go",
+    "Rust",
+    "Swift",
+    "Kotlin",
+    "Flutter",
+    "Figma",
+    "Terraform",
+    "Kafka",
+    "ML",
+    "Pandas",
+]
+ADJECTIVES = ["Open", "Smart", "Tiny", "Green", "Rapid", "Shared", "Private", "Social", "Local", "Remote"]
+NOUNS = ["Tracker", "Marketplace", "Planner", "Assistant", "Dashboard", "Platform", "Bot", "Journal", "Map", "Feed"]
+DOMAINS = ["fitness", "finance", "travel", "education", "health", "music", "food", "pets", "climate", "hiring"]
+BUDGETS = [None, "500", "1000", "3000", "5000", "10000", "equity"]
+DURATIONS = [None, "2 weeks", "1 month", "3 months", "6 months", "ongoing"]
+PROJECT_STATUSES = [Project.STATUS_OPEN] * 6 + [Project.STATUS_IN_PROGRESS] * 3 + [Project.STATUS_COMPLETED]
+
+
+class _PowerLaw:
+    """Zipf-like draws from ``range(size)`` in constant memory.
+
+    Ranks come from inverting the continuous power-law CDF and map to values
+    through a random affine permutation, so no per-value weight list is built.
+    """
+
+    def __init__(self, rng, size, exponent):
+        self.size = size
+        self.exponent = exponent
+        self.step = rng.randrange(1, size + 1)
+        while math.gcd(self.step, size) != 1:
+            self.step = rng.randrange(1, size + 1)
+        self.offset = rng.randrange(size)
+        self.low = self._cdf(0)
+        self.span = self._cdf(size) - self.low
+
+    def _cdf(self, rank):
+        if self.exponent == 1:
+            return math.log1p(rank)
+        return (rank + 1) ** (1 - self.exponent)
+
+    def _rank(self, u):
+        value = self.low + u * self.span
+        rank = math.expm1(value) if self.exponent == 1 else value ** (1 / (1 - self.exponent)) - 1
+        return min(int(rank), self.size - 1)
+
+    def sample(self, rng):
+        return (self.step * self._rank(rng.random()) + self.offset) % self.size
+
+    def share(self, value):
+        """The probability ``sample`` returns ``value``."""
+        rank = (value - self.offset) * pow(self.step, -1, self.size) % self.size
+        return (self._cdf(rank + 1) - self._cdf(rank)) / self.span
+
+
+def _fraction(key, salt):
+    # A cheap, seed-dependent hash so timestamps need not be stored per row.
+    return ((key * 2654435761 + salt * 40503) % 4294967296) / 4294967296
+
+
+class _Writer:
+    """Streams rows into a table: ``COPY`` on PostgreSQL, ``executemany`` elsewhere.
+
+    Rows carry explicit primary keys and timestamps, which ``bulk_create``
+    would overwrite for ``auto_now`` fields.
+    """
+
+    def __init__(self, connection, batch_size):
+        self.connection = connection
+        self.batch_size = batch_size
+
+    def write(self, model, names, rows):
+        fields = [model._meta.get_field(name) for name in names]
+        table = self.connection.ops.quote_name(model._meta.db_table)
+        columns = ", ".join(self.connection.ops.quote_name(field.column) for field in fields)
+        written = 0
+        with self.connection.cursor() as cursor:
+            while True:
+                batch = list(itertools.islice(rows, self.batch_size))
+                if not batch:
+                    return written
+                if self.connection.vendor == "postgresql":
+                    buffer = io.StringIO("".join("\t".join(map(self._copy_value, row)) + "\n" for row in batch))
+                    cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN", buffer)
+                else:
+                    placeholders = ", ".join(["%s"] * len(fields))
+                    cursor.executemany(
+                        f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                        [[self._adapt(value) for value in row] for row in batch],
+                    )
+                written += len(batch)
+
+    def _adapt(self, value):
+        if isinstance(value, datetime):
+            return self.connection.ops.adapt_datetimefield_value(value)
+        return value
+
+    @staticmethod
+    def _copy_value(value):
+        if value is None:
+            return "\\N"
+        if isinstance(value, bool):
+            return "t" if value else "f"
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class Command(BaseCommand):
+    help = "Generate a large synthetic dataset of users, projects, likes and matches for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--projects", type=int, default=None, help="Defaults to a fifth of --users")
+        parser.add_argument("--likes-per-user", type=float, default=20, help="Average user likes given per user")
+        parser.add_argument("--project-likes-per-user", type=float, default=5)
+        parser.add_argument("--popularity-exponent", type=float, default=0.8, help="Zipf exponent of being liked")
+        parser.add_argument("--activity-exponent", type=float, default=0.6, help="Zipf exponent of liking")
+        parser.add_argument("--reciprocity", type=float, default=0.15, help="Chance a user like is returned")
+        parser.add_argument("--pending-match-rate", type=float, default=0.05, help="One-sided likes with a match")
+        parser.add_argument("--days", type=int, default=365, help="Spread of created_at timestamps")
+        parser.add_argument("--until", default="2025-01-01", help="Newest timestamp, ISO date")
+        parser.add_argument("--password", default="password123")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options["users"] < 2:
+            raise CommandError("--users must be at least 2")
+        self.options = options
+        self.rng = random.Random(options["seed"])
+        self.until = datetime.fromisoformat(options["until"]).replace(tzinfo=timezone.utc)
+        self.since = self.until - timedelta(days=options["days"])
+        self.connection = connections[options["database"]]
+        self.writer = _Writer(self.connection, options["batch_size"])
+        self.user_count = options["users"]
+        self.project_count = options["projects"] if options["projects"] is not None else self.user_count // 5
+
+        with transaction.atomic(using=options["database"]):
+            self.first_user = self._next_id(User)
+            self.first_project = self._next_id(Project)
+            self.like_ids = itertools.count(self._next_id(Like))
+            self.match_ids = itertools.count(self._next_id(Match))
+            self._step("users", self._users)
+            self._step("projects", self._projects)
+            self._step("user likes and matches", self._user_likes)
+            self._step("project likes", self._project_likes)
+            self._reset_sequences()
+        self._step("counters", lambda: sum(counters.rebuild(using=options["database"]).values()))
+        self.stdout.write(self.style.SUCCESS(f"Generated dataset with seed {options['seed']}."))
+
+    def _step(self, label, func):
+        started = time.monotonic()
+        written = func()
+        self.stdout.write(f"{label}: {written} rows in {time.monotonic() - started:.1f}s")
+
+    def _next_id(self, model):
+        return (model.objects.using(self.options["database"]).aggregate(last=Max("id"))["last"] or 0) + 1
+
+    def _reset_sequences(self):
+        with self.connection.cursor() as cursor:
+            for sql in self.connection.ops.sequence_reset_sql(no_style(), [User, Project, Like, Match]):
+                cursor.execute(sql)
+
+    def _user_created(self, index):
+        # Users sign up in id order, evenly over the period.
+        return self.since + (self.until - self.since) * (index / self.user_count)
+
+    def _between(self, start, key, salt):
+        return start + (self.until - start) * _fraction(key, self.options["seed"] + salt)
+
+    def _users(self):
+        # Hashing once keeps the command from spending hours in PBKDF2.
+        password = make_password(self.options["password"], salt=f"dataset{self.options['seed']}")
+        rng = self.rng
+
+        def rows():
+            for index in range(self.user_count):
+                pk = self.first_user + index
+                created = self._user_created(index)
+                skills = ", ".join(rng.sample(SKILLS, rng.randint(2, 6)))
+                years = rng.randint(0, 15)
+                bio = None if rng.random() < 0.2 else f"Developer interested in {rng.choice(DOMAINS)} products."
+                yield (
+                    pk,
+                    password,
+                    None,
+                    False,
+                    f"load{pk}@example.com",
+                    f"load{pk}",
+                    f"Load User {pk}",
+                    bio,
+                    skills,
+                    f"{years} years of experience",
+                    True,
+                    False,
+                    created,
+                    created,
+                )
+
+        names = [
+            "id",
+            "password",
+            "last_login",
+            "is_superuser",
+            "email",
+            "username",
+            "full_name",
+            "bio",
+            "skills",
+            "experience",
+            "is_active",
+            "is_staff",
+            "created_at",
+            "updated_at",
+        ]
+        return self.writer.write(User, names, rows())
+
+    def _projects(self):
+        rng = self.rng
+        owners = _PowerLaw(rng, self.user_count, self.options["activity_exponent"])
+
+        def rows():
+            for index in range(self.project_count):
+                owner = owners.sample(rng)
+                created = self._between(self._user_created(owner), index, 1)
+                domain = rng.choice(DOMAINS)
+                title = f"{rng.choice(ADJECTIVES)} {domain} {rng.choice(NOUNS)}"
+                requirements = ", ".join(rng.sample(SKILLS, rng.randint(1, 5)))
+                yield (
+                    self.first_project + index,
+                    title,
+                    f"A {domain} product looking for collaborators. " * 3,
+                    requirements,
+                    rng.choice(BUDGETS),
+                    rng.choice(DURATIONS),
+                    rng.choice(PROJECT_STATUSES),
+                    self.first_user + owner,
+                    created,
+                    created,
+                )
+
+        names = [
+            "id",
+            "title",
+            "description",
+            "requirements",
+            "budget",
+            "duration",
+            "status",
+            "owner",
+            "created_at",
+            "updated_at",
+        ]
+        return self.writer.write(Project, names, rows())
+
+    def _liker_rng(self, liker, salt):
+        # Seeded by the liker alone, so its draws can be replayed from any chunk.
+        return random.Random((self.options["seed"] * 4 + salt) * self.user_count + liker)
+
+    @staticmethod
+    def _like_count(rng, likers, total, liker):
+        """How many of ``total`` likes ``liker`` gives: its share under the ``likers`` power law."""
+        expected = total * likers.share(liker)
+        return int(expected) + (rng.random() < expected % 1)
+
+    def _user_likes(self):
+        """Write user-to-user likes and their matches, liker by liker, one chunk of rows at a time.
+
+        Each liker's own likes are drawn from a generator seeded by that liker,
+        so whether a like is returned is decided by replaying the other user's
+        draw instead of keeping every like in memory. A like that is not
+        returned on its own is returned with ``--reciprocity`` chance and
+        written in the same chunk.
+        """
+        n = self.user_count
+        likers = _PowerLaw(self.rng, n, self.options["activity_exponent"])
+        targets = _PowerLaw(self.rng, n, self.options["popularity_exponent"])
+        total = int(n * self.options["likes_per_user"])
+
+        @functools.lru_cache(maxsize=self.options["batch_size"])
+        def liked_by(liker):
+            rng = self._liker_rng(liker, 0)
+            drawn = (targets.sample(rng) for _ in range(self._like_count(rng, likers, total, liker)))
+            return dict.fromkeys(liked for liked in drawn if liked != liker)
+
+        def rows(liker):
+            rng = self._liker_rng(liker, 2)
+            for liked in liked_by(liker):
+                returned = liker in liked_by(liked)
+                replied = not returned and rng.random() < self.options["reciprocity"]
+                created = self._like_time(liker, liked)
+                if returned or replied:
+                    # Matches are created when the second like arrives.
+                    matched = max(created, self._like_time(liked, liker))
+                    yield (liker, liked, True, created), (liker, liked, Match.STATUS_ACCEPTED, matched)
+                    if replied:
+                        reply = (liked, liker, True, self._like_time(liked, liker))
+                        yield reply, (liked, liker, Match.STATUS_ACCEPTED, matched)
+                elif rng.random() < self.options["pending_match_rate"]:
+                    yield (liker, liked, False, created), (liker, liked, Match.STATUS_PENDING, created)
+                else:
+                    yield (liker, liked, False, created), None
+
+        written = 0
+        liker = 0
+        while liker < n:
+            likes, matches = [], []
+            while liker < n and len(likes) < self.options["batch_size"]:
+                for like, match in rows(liker):
+                    likes.append(like)
+                    if match:
+                        matches.append(match)
+                liker += 1
+            written += self._write_likes(likes) + self._write_matches(matches)
+        return written
+
+    def _write_likes(self, likes):
+        rows = (
+            (next(self.like_ids), self.first_user + liker, self.first_user + liked, None, mutual, created)
+            for liker, liked, mutual, created in likes
+        )
+        return self.writer.write(Like, ["id", "user", "liked_user", "project", "is_mutual", "created_at"], rows)
+
+    def _write_matches(self, matches):
+        rows = (
+            (next(self.match_ids), self.first_user + user, self.first_user + liked, None, status, created, created)
+            for user, liked, status, created in matches
+        )
+        names = ["id", "user", "liked_user", "project", "status", "created_at", "updated_at"]
+        return self.writer.write(Match, names, rows)
+
+    def _like_time(self, liker, liked):
+        return self._between(self._user_created(max(liker, liked)), liker * self.user_count + liked, 2)
+
+    def _project_likes(self):
+        if not self.project_count:
+            return 0
+        likers = _PowerLaw(self.rng, self.user_count, self.options["activity_exponent"])
+        projects = _PowerLaw(self.rng, self.project_count, self.options["popularity_exponent"])
+        total = int(self.user_count * self.options["project_likes_per_user"])
+
+        def rows():
+            for liker in range(self.user_count):
+                rng = self._liker_rng(liker, 1)
+                count = self._like_count(rng, likers, total, liker)
+                for project in dict.fromkeys(projects.sample(rng) for _ in range(count)):
+                    created = self._between(self._user_created(liker), liker * self.project_count + project, 3)
+                    yield (
+                        next(self.like_ids),
+                        self.first_user + liker,
+                        None,
+                        self.first_project + project,
+                        False,
+                        created,
+                    )
+
+        return self.writer.write(Like, ["id", "user", "liked_user", "project", "is_mutual", "created_at"], rows())
@@ -24,6 +24,9 @@ class User(ExportModelOperationsMixin("user"), AbstractBaseUser, PermissionsMixi
 
     class Meta:
         db_table = "users"
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="users_created_id_idx"),
+        ]
 
     def __str__(self):
         return self.email
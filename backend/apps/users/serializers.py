@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from config.rows import RowSerializer
+
 User = get_user_model()
 
 
@@ -22,6 +24,12 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
 
+USER_ROWS = RowSerializer(UserSerializer.Meta.fields)
+
+# Other users' emails are never exposed by the matching endpoints.
+PUBLIC_USER_ROWS = RowSerializer([f for f in UserSerializer.Meta.fields if f != "email"])
+
+
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=6)
 
@@ -1,10 +1,11 @@
 from django.urls import path
 
-from apps.users.views import LoginView, MeView, RegisterView, UserListView
+from apps.users.views import AsyncMeView, LoginView, MeView, RegisterView, UserListView
+from config.async_views import pick_view
 
 urlpatterns = [
     path("auth/register", RegisterView.as_view()),
     path("auth/login", LoginView.as_view()),
-    path("auth/me", MeView.as_view()),
+    path("auth/me", pick_view(MeView, AsyncMeView).as_view()),
     path("users/", UserListView.as_view()),
 ]
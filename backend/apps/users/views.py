@@ -1,14 +1,19 @@
 import logging
 
 from django.contrib.auth import get_user_model
-from django.db import connection
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from apps.users.serializers import LoginSerializer, RegisterSerializer, UserSerializer
+from apps.counters import services as counters
+from apps.users.serializers import USER_ROWS, LoginSerializer, RegisterSerializer, UserSerializer
+from config import health, warmup
+from config.async_views import AsyncAPIView
+from config.conditional import conditional_headers, not_modified
+from config.pagination import CursorPaginator
+from config.throttling import LoginThrottle
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -41,6 +46,7 @@ class RegisterView(APIView):
 
 class LoginView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [LoginThrottle]
 
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
@@ -73,19 +79,39 @@ class LoginView(APIView):
         )
 
 
+def _me(request, totals):
+    user = request.user
+    likes = totals.get((counters.USER_LIKES, user.pk), 0)
+    matches = totals.get((counters.USER_MATCHES, user.pk), 0)
+    # Everything in the body follows from these, so a revalidation is
+    # answered without serializing the user.
+    headers = conditional_headers([user.pk, user.updated_at, likes, matches], private=True)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
+    data = UserSerializer(user).data
+    data["likes_count"] = likes
+    data["matches_count"] = matches
+    return Response({"user": data}, headers=headers)
+
+
 class MeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        return Response({"user": UserSerializer(request.user).data})
+        return _me(request, counters.counts([counters.USER_LIKES, counters.USER_MATCHES], [request.user.pk]))
 
 
 class UserListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        users = User.objects.all()
-        return Response(UserSerializer(users, many=True).data)
+        paginator = CursorPaginator()
+        page = paginator.paginate(User.objects.values(*USER_ROWS.columns), request)
+        users = counters.annotate(
+            USER_ROWS.many(page), likes_count=counters.USER_LIKES, matches_count=counters.USER_MATCHES
+        )
+        return Response(users, headers=paginator.get_headers())
 
 
 class RootView(APIView):
@@ -96,18 +122,58 @@ class RootView(APIView):
 
 
 class HealthView(APIView):
+    """Latest dependency snapshot taken by the background prober."""
+
     permission_classes = [AllowAny]
+    authentication_classes = []
 
     def get(self, request):
-        try:
-            connection.ensure_connection()
-            db_status = "connected"
-        except Exception:
-            db_status = "disconnected"
-        return Response(
-            {
-                "status": "healthy" if db_status == "connected" else "unhealthy",
-                "database": db_status,
-                "api": "running",
-            }
-        )
+        return self.respond(health.monitor.snapshot())
+
+    @staticmethod
+    def respond(snapshot):
+        code = status.HTTP_503_SERVICE_UNAVAILABLE if snapshot["status"] == "unhealthy" else status.HTTP_200_OK
+        return Response(snapshot, status=code)
+
+
+class DeepHealthView(APIView):
+    """Probes every dependency now instead of serving the cached snapshot.
+
+    Each call opens connections to every dependency, so it is limited to
+    staff and to monitoring that holds ``HEALTH_TOKEN``.
+    """
+
+    permission_classes = [health.CanProbe]
+
+    def get(self, request):
+        return HealthView.respond(health.monitor.refresh())
+
+
+class LivenessView(APIView):
+    """The process is up and serving requests; says nothing about dependencies."""
+
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        return Response({"status": "alive"})
+
+
+class ReadinessView(APIView):
+    """Green once this worker has finished warming up and can take traffic."""
+
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        if warmup.warm_up():
+            return Response({"status": "ready"})
+        return Response({"status": "starting"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+# Async variant for ASGI workers (ASYNC_VIEWS).
+
+
+class AsyncMeView(AsyncAPIView, MeView):
+    async def get(self, request):
+        return _me(request, await counters.acounts([counters.USER_LIKES, counters.USER_MATCHES], [request.user.pk]))
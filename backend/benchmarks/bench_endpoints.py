@@ -0,0 +1,241 @@
+"""Latency, query count, rows fetched and response size of the hot API endpoints.
+
+Seeds a fresh test database per dataset size with ``generate_dataset`` and
+calls each endpoint in-process as the most active generated user. Results are
+written as JSON; with ``--baseline`` the run fails (exit code 1) when an
+endpoint got slower, ran more queries or fetched more rows than allowed.
+Run from ``backend/``::
+
+    python -m benchmarks.bench_endpoints --sizes 1000 10000 --output bench.json
+    python -m benchmarks.bench_endpoints --sizes 1000 10000 --baseline bench.json
+
+SQLite is used unless ``DJANGO_SETTINGS_MODULE`` points at PostgreSQL
+settings, e.g. ``config.settings``.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from io import StringIO
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings_test")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache import cache  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.backends.utils import CursorWrapper  # noqa: E402
+from django.db.models import Count  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+from apps.users.models import User  # noqa: E402
+
+
+class RowCounter:
+    """Counts rows handed out by database cursors while active."""
+
+    def __init__(self):
+        self.rows = 0
+        self._originals = {}
+
+    def __enter__(self):
+        for name in ("fetchone", "fetchmany", "fetchall"):
+            self._originals[name] = getattr(CursorWrapper, name, None)
+            setattr(CursorWrapper, name, self._wrap(name))
+        return self
+
+    def __exit__(self, *exc_info):
+        for name, original in self._originals.items():
+            if original is None:
+                delattr(CursorWrapper, name)
+            else:
+                setattr(CursorWrapper, name, original)
+
+    def _wrap(self, name):
+        counter = self
+
+        def fetch(cursor, *args):
+            result = getattr(cursor.cursor, name)(*args)
+            if name == "fetchone":
+                counter.rows += result is not None
+            else:
+                counter.rows += len(result)
+            return result
+
+        return fetch
+
+
+class Endpoint:
+    def __init__(self, name, method, path, before=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.before = before
+
+    def call(self, client):
+        path = self.path() if callable(self.path) else self.path
+        response = getattr(client, self.method)(path)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{self.name}: {self.method.upper()} {path} returned {response.status_code}")
+        return response
+
+
+def endpoints(user):
+    # Fresh like targets so every LikeUserView call takes the insert path.
+    targets = iter(
+        User.objects.exclude(pk=user.pk)
+        .exclude(likes_received__user=user)
+        .order_by("id")
+        .values_list("id", flat=True)
+        .iterator()
+    )
+    return [
+        Endpoint("project_list", "get", "/api/v1/projects/", before=cache.clear),
+        Endpoint("match_list", "get", "/api/v1/matches/"),
+        Endpoint("potential_matches", "get", "/api/v1/matches/potential"),
+        Endpoint("like_user", "post", lambda: f"/api/v1/likes/user/{next(targets)}"),
+    ]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def measure(endpoint, client, repeat, warmup):
+    before = endpoint.before or (lambda: None)
+    for _ in range(warmup):
+        before()
+        endpoint.call(client)
+    timings = []
+    for _ in range(repeat):
+        before()
+        started = time.perf_counter()
+        endpoint.call(client)
+        timings.append(time.perf_counter() - started)
+    # Counting queries and rows slows the request down, so it gets its own call.
+    before()
+    with CaptureQueriesContext(connection) as queries, RowCounter() as rows:
+        response = endpoint.call(client)
+    return {
+        "median_ms": round(statistics.median(timings) * 1e3, 3),
+        "p95_ms": round(percentile(timings, 0.95) * 1e3, 3),
+        "queries": len(queries.captured_queries),
+        "rows": rows.rows,
+        "bytes": len(response.content),
+    }
+
+
+def run_size(size, args):
+    call_command("flush", interactive=False, verbosity=0)
+    cache.clear()
+    started = time.monotonic()
+    call_command("generate_dataset", users=size, seed=args.seed, stdout=StringIO())
+    print(f"seeded {size} users in {time.monotonic() - started:.1f}s")
+
+    # The most active user has the fullest pages.
+    user = User.objects.annotate(given=Count("likes_given")).order_by("-given", "id").first()
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+
+    results = {}
+    for endpoint in endpoints(user):
+        results[endpoint.name] = result = measure(endpoint, client, args.repeat, args.warmup)
+        print(
+            f"{size:>8} {endpoint.name:<18} {result['median_ms']:9.2f} {result['p95_ms']:9.2f}"
+            f" {result['queries']:8d} {result['rows']:8d} {result['bytes']:9d}"
+        )
+    return results
+
+
+def compare(current, baseline, args):
+    """Return a description of every regression of ``current`` against ``baseline``."""
+    failures = []
+    for size, endpoints_ in current["results"].items():
+        for name, result in endpoints_.items():
+            old = baseline.get("results", {}).get(size, {}).get(name)
+            if old is None:
+                continue
+            for metric, allowed in (("median_ms", args.max_slowdown), ("p95_ms", args.max_p95_slowdown)):
+                if result[metric] > old[metric] * (1 + allowed):
+                    failures.append(
+                        f"{name}@{size}: {metric} {old[metric]} -> {result[metric]} (+{allowed:.0%} allowed)"
+                    )
+            if result["queries"] > old["queries"] + args.max_extra_queries:
+                failures.append(f"{name}@{size}: queries {old['queries']} -> {result['queries']}")
+            if result["rows"] > old["rows"] * (1 + args.max_extra_rows):
+                failures.append(f"{name}@{size}: rows {old['rows']} -> {result['rows']}")
+    return failures
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Generated users per dataset")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_endpoints.json")
+    parser.add_argument("--baseline", help="Earlier --output to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=0.25, help="Allowed median increase, as a fraction")
+    parser.add_argument("--max-p95-slowdown", type=float, default=0.5, help="Allowed p95 increase, as a fraction")
+    parser.add_argument("--max-extra-queries", type=int, default=0)
+    parser.add_argument("--max-extra-rows", type=float, default=0.1, help="Allowed rows increase, as a fraction")
+    args = parser.parse_args()
+
+    # Request logs would drown the table; they are not part of what is measured.
+    logging.disable(logging.INFO)
+    setup_test_environment()
+    old_config = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    print(f"{'users':>8} {'endpoint':<18} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'rows':>8} {'bytes':>9}")
+    try:
+        results = {str(size): run_size(size, args) for size in args.sizes}
+    finally:
+        connection.creation.destroy_test_db(old_config, verbosity=0)
+
+    current = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "revision": git_revision(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = compare(current, json.load(f), args)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            return 1
+        print(f"no regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
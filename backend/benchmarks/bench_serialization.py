@@ -0,0 +1,90 @@
+"""CPU cost of serializing a page of projects: DRF serializers vs row serializers.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_serialization [--rows 100] [--repeat 200]
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings_test")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from apps.projects.models import Project  # noqa: E402
+from apps.projects.serializers import PROJECT_WITH_OWNER_ROWS, ProjectWithOwnerSerializer  # noqa: E402
+from apps.users.models import User  # noqa: E402
+from config.renderers import ORJSONRenderer  # noqa: E402
+
+
+def create_rows(count):
+    owners = [
+        User.objects.create_user(email=f"owner{i}@example.com", username=f"owner{i}", password="x", bio="Bio " * 20)
+        for i in range(10)
+    ]
+    Project.objects.bulk_create(
+        Project(
+            title=f"Project {i}",
+            description="Description " * 30,
+            requirements='["python", "django", "postgres"]',
+            budget="1000",
+            duration="3 months",
+            owner=owners[i % len(owners)],
+        )
+        for i in range(count)
+    )
+
+
+def measure(label, fn, repeat):
+    fn()
+    started = time.process_time()
+    for _ in range(repeat):
+        body = fn()
+    elapsed = (time.process_time() - started) / repeat
+    print(f"{label:<40} {elapsed * 1e3:8.3f} ms/page  {len(body)} bytes")
+    return elapsed, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_config = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        create_rows(args.rows)
+        # Both paths load the page from the database once up front so only
+        # serialization and rendering are timed.
+        instances = list(Project.objects.select_related("owner").order_by("-created_at", "-id")[: args.rows])
+        rows = list(
+            Project.objects.values(*PROJECT_WITH_OWNER_ROWS.columns).order_by("-created_at", "-id")[: args.rows]
+        )
+
+        drf, drf_body = measure(
+            "ModelSerializer + JSONRenderer",
+            lambda: JSONRenderer().render(ProjectWithOwnerSerializer(instances, many=True).data),
+            args.repeat,
+        )
+        fast, fast_body = measure(
+            "RowSerializer + ORJSONRenderer",
+            lambda: ORJSONRenderer().render(PROJECT_WITH_OWNER_ROWS.many(rows)),
+            args.repeat,
+        )
+        print(f"identical output: {drf_body == fast_body}")
+        print(f"CPU saved per {args.rows} rows: {(drf - fast) * 1e3:.3f} ms ({drf / fast:.1f}x faster)")
+    finally:
+        connection.creation.destroy_test_db(old_config, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Throughput and latency of the WSGI (sync workers) and ASGI (uvicorn workers) modes.
+
+Starts gunicorn the way ``init.sh`` does for each mode, drives it with a fixed
+number of concurrent clients and reports requests/s and latency percentiles.
+A mode is ``<server>+<views>``: ``wsgi+sync`` is the default deployment and
+the baseline, ``+async`` routes the read endpoints to their async views
+(``ASYNC_VIEWS=1``). Run from ``backend/`` against a migrated, seeded database::
+
+    python -m benchmarks.bench_server --path "/api/v1/projects/?limit=20" --concurrency 64
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+SERVER_COMMANDS = {
+    "wsgi": ["gunicorn", "config.wsgi:application"],
+    "asgi": ["gunicorn", "config.asgi:application", "--worker-class", "uvicorn.workers.UvicornWorker"],
+}
+MODES = [f"{server}+{views}" for server in SERVER_COMMANDS for views in ("sync", "async")]
+
+
+def start_server(mode, port, workers):
+    server_mode, views = mode.split("+")
+    command = SERVER_COMMANDS[server_mode] + ["--bind", f"127.0.0.1:{port}", "--workers", str(workers)]
+    command += ["--timeout", "120"]
+    env = {**os.environ, "SERVER_MODE": server_mode, "ASYNC_VIEWS": "1" if views == "async" else "0"}
+    server = subprocess.Popen(
+        command,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"{mode} server exited with code {server.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    stop_server(server)
+    raise RuntimeError(f"{mode} server did not start listening on port {port}")
+
+
+def stop_server(server):
+    os.killpg(server.pid, signal.SIGTERM)
+    try:
+        server.wait(10)
+    except subprocess.TimeoutExpired:
+        os.killpg(server.pid, signal.SIGKILL)
+        server.wait()
+
+
+async def fetch(port, request):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(request)
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    return int(response.split(b" ", 2)[1])
+
+
+async def client(port, request, stop_at, latencies, errors):
+    while time.monotonic() < stop_at:
+        started = time.perf_counter()
+        try:
+            status = await fetch(port, request)
+        except (OSError, IndexError, ValueError):
+            errors.append(None)
+            continue
+        if 200 <= status < 400:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors.append(status)
+
+
+async def load(port, request, concurrency, duration):
+    latencies, errors = [], []
+    stop_at = time.monotonic() + duration
+    await asyncio.gather(*(client(port, request, stop_at, latencies, errors) for _ in range(concurrency)))
+    return latencies, errors
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else float("nan")
+
+
+def build_request(path, token):
+    lines = [f"GET {path} HTTP/1.1", "Host: localhost", "Connection: close"]
+    if token:
+        lines.append(f"Authorization: Bearer {token}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--path", default="/api/v1/projects/?limit=20")
+    parser.add_argument("--token", default=os.environ.get("BENCH_TOKEN"), help="JWT for authenticated endpoints")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    request = build_request(args.path, args.token)
+    print(f"{args.path}: {args.workers} workers, {args.concurrency} clients, {args.duration:g}s")
+    print(f"{'mode':<10} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for mode in args.modes:
+        server = start_server(mode, args.port, args.workers)
+        try:
+            asyncio.run(load(args.port, request, args.concurrency, args.warmup))
+            latencies, errors = asyncio.run(load(args.port, request, args.concurrency, args.duration))
+        finally:
+            stop_server(server)
+        print(
+            f"{mode:<10} {len(latencies) / args.duration:9.1f} {percentile(latencies, 0.50) * 1e3:9.1f}"
+            f" {percentile(latencies, 0.99) * 1e3:9.1f} {len(errors):7d}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """APIView whose handlers are ``async def`` and run natively under ASGI.
+
+    DRF's dispatch is synchronous, so this mirrors it with an async version.
+    Authentication, permission and throttle checks may touch the database or
+    Redis and run through ``sync_to_async``, as do any handlers still written
+    as plain ``def`` (typically writes); ``async def`` handlers are awaited on
+    the event loop. Under WSGI, Django drives the view with ``async_to_sync``,
+    which is slower than a plain APIView, so read endpoints keep a sync view
+    and are switched with :func:`pick_view`.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def pick_view(sync_view, async_view):
+    """The view class a URL conf should route to under the current ``ASYNC_VIEWS`` setting."""
+    return async_view if settings.ASYNC_VIEWS else sync_view
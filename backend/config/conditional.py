@@ -0,0 +1,36 @@
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import get_conditional_response
+
+
+def conditional_headers(fingerprint, private=False):
+    """Validator headers for a representation identified by ``fingerprint``.
+
+    ``fingerprint`` is any JSON-serializable value that changes whenever the
+    response body would; the body itself works, as does a short tuple of
+    versions when that is cheaper to produce. ``no-cache`` makes clients
+    revalidate on every use instead of guessing a freshness lifetime.
+
+    There is no Last-Modified: no timestamp moves when a like count changes
+    or a row leaves a list, so If-Modified-Since would answer 304 for a
+    changed body.
+    """
+    raw = json.dumps(fingerprint, cls=DjangoJSONEncoder, separators=(",", ":")).encode("utf-8")
+    headers = {
+        "ETag": f'"{hashlib.sha1(raw, usedforsecurity=False).hexdigest()}"',
+        "Cache-Control": "private, no-cache" if private else "no-cache",
+    }
+    if private:
+        headers["Vary"] = "Authorization"
+    return headers
+
+
+def not_modified(request, headers):
+    """Return a 304 response carrying ``headers`` if the client's copy is current, else None."""
+    response = get_conditional_response(request, etag=headers.get("ETag"))
+    if response is not None:
+        for name, value in headers.items():
+            response[name] = value
+    return response
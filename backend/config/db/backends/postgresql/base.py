@@ -0,0 +1,35 @@
+import functools
+
+from django_prometheus.db.backends.postgresql import base
+
+from config.db.pool import PoolExhausted, get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend that borrows connections from a per-process pool.
+
+    Django still opens and closes its connection around each request
+    (``CONN_MAX_AGE = 0``), but opening takes an idle pooled connection and
+    closing hands it back, so the TCP and authentication handshake is paid
+    once per pooled connection instead of once per request. Pool settings
+    come from the ``POOL`` key of the database settings.
+    """
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict.get("POOL", {}))
+
+    def get_new_connection(self, conn_params):
+        connect = functools.partial(super().get_new_connection, conn_params)
+        try:
+            return self.pool.acquire(connect)
+        except PoolExhausted as exc:
+            raise self.Database.OperationalError(str(exc)) from exc
+
+    def _close(self):
+        if self.connection is not None:
+            # Closed inside atomic(), the connection stays referenced until the
+            # block exits, so it is closed for real rather than handed out again.
+            discard = self.in_atomic_block or (self.errors_occurred and not self.is_usable())
+            with self.wrap_database_errors:
+                self.pool.release(self.connection, discard=discard)
@@ -0,0 +1,135 @@
+import contextvars
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from prometheus_client import Histogram
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233)
+
+REQUEST_QUERIES = Histogram("db_request_queries", "SQL queries run per request", ["view"], buckets=QUERY_BUCKETS)
+REQUEST_DB_SECONDS = Histogram(
+    "db_request_seconds",
+    "Time spent in SQL queries per request",
+    ["view"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+REQUEST_DUPLICATE_QUERIES = Histogram(
+    "db_request_duplicate_queries",
+    "Queries per request whose SQL text already ran earlier in the same request",
+    ["view"],
+    buckets=QUERY_BUCKETS,
+)
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.duplicates = 0
+        self._seen = set()
+
+    def add(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        # Parameters are ignored so that N+1 loops show up as duplicates.
+        if sql in self._seen:
+            self.duplicates += 1
+        else:
+            self._seen.add(sql)
+
+
+_stats = contextvars.ContextVar("db_query_stats", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    stats = _stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add(sql, time.perf_counter() - started)
+
+
+def install(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# Covers connections opened in threads the middleware never runs in, such as
+# the ones sync_to_async uses for async views.
+connection_created.connect(install)
+
+
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    # The URL name when the pattern has one, else the view's dotted path.
+    return match.view_name if match is not None else "<unresolved>"
+
+
+class QueryBudgetMiddleware:
+    """Counts the SQL each request runs and reports it per view.
+
+    Exports query count, DB time and duplicate queries as histograms, adds a
+    ``Server-Timing: db`` header and logs requests that run more than
+    ``SQL_QUERY_BUDGET`` queries.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        for connection in connections.all(initialized_only=True):
+            install(connection)
+        stats = QueryStats()
+        token = _stats.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _stats.reset(token)
+        return self._report(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = QueryStats()
+        token = _stats.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _stats.reset(token)
+        return self._report(request, response, stats)
+
+    def _report(self, request, response, stats):
+        view = _view_name(request)
+        REQUEST_QUERIES.labels(view=view).observe(stats.count)
+        REQUEST_DB_SECONDS.labels(view=view).observe(stats.duration)
+        REQUEST_DUPLICATE_QUERIES.labels(view=view).observe(stats.duplicates)
+        timing = f'db;dur={stats.duration * 1e3:.1f};desc="{stats.count} queries"'
+        response["Server-Timing"] = (
+            f"{response['Server-Timing']}, {timing}" if response.has_header("Server-Timing") else timing
+        )
+        if stats.count > settings.SQL_QUERY_BUDGET:
+            logger.warning(
+                "SQL query budget exceeded: view=%s path=%s queries=%s duplicates=%s db_ms=%.1f budget=%s",
+                view,
+                request.path,
+                stats.count,
+                stats.duplicates,
+                stats.duration * 1e3,
+                settings.SQL_QUERY_BUDGET,
+            )
+        return response
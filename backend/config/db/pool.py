@@ -0,0 +1,207 @@
+import logging
+import os
+import threading
+import time
+import weakref
+
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    ["alias"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+POOL_EXHAUSTED = Counter("db_pool_exhausted", "Connection requests that timed out on a full pool", ["alias"])
+POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Open pooled database connections", ["alias", "state"], multiprocess_mode="livesum"
+)
+POOL_OPENED = Counter("db_pool_connections_opened", "Database connections opened by the pool", ["alias"])
+POOL_CLOSED = Counter("db_pool_connections_closed", "Pooled database connections closed", ["alias", "reason"])
+
+DEFAULTS = {
+    "MAX_SIZE": 10,
+    "TIMEOUT": 5.0,
+    "MAX_IDLE": 300.0,
+    "MAX_LIFETIME": 1800.0,
+    "CHECK_INTERVAL": 5.0,
+}
+
+
+class PoolExhausted(Exception):
+    pass
+
+
+class ConnectionPool:
+    """A bounded, thread-safe pool of DB-API connections for one database alias.
+
+    ``acquire`` hands out the most recently returned idle connection, opening
+    a new one while fewer than ``max_size`` exist and otherwise waiting up to
+    ``timeout`` seconds. A connection that sat idle for more than
+    ``check_interval`` seconds is pinged before use. Connections past
+    ``max_idle`` or ``max_lifetime`` are closed instead of reused.
+    """
+
+    def __init__(self, alias, max_size=10, timeout=5.0, max_idle=300.0, max_lifetime=1800.0, check_interval=5.0):
+        self.alias = alias
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_interval = check_interval
+        self._cond = threading.Condition(threading.RLock())
+        self._idle = []
+        self._size = 0
+        self._opened_at = {}
+        self._finalizers = {}
+
+    def acquire(self, connect):
+        """Return a connection, calling ``connect()`` if a new one has to be opened."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            conn, returned_at = self._checkout(deadline)
+            if conn is None:
+                conn = self._open(connect)
+            elif time.monotonic() - returned_at > self.check_interval and not self._ping(conn):
+                self._discard(conn, "unhealthy")
+                continue
+            POOL_WAIT.labels(alias=self.alias).observe(time.monotonic() - started)
+            return conn
+
+    def release(self, conn, discard=False):
+        """Return ``conn`` to the pool, or close it if it is unusable."""
+        if discard or getattr(conn, "closed", False):
+            self._discard(conn, "broken")
+            return
+        if time.monotonic() - self._opened_at.get(id(conn), 0) > self.max_lifetime:
+            self._discard(conn, "expired")
+            return
+        try:
+            # Never hand out a connection with an open transaction.
+            conn.rollback()
+        except Exception:
+            self._discard(conn, "broken")
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._update_gauges()
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn, "pool_closed")
+
+    def _checkout(self, deadline):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._idle:
+                    conn, returned_at = self._idle.pop()
+                    if now - returned_at > self.max_idle or now - self._opened_at[id(conn)] > self.max_lifetime:
+                        self._discard(conn, "expired")
+                        continue
+                    self._update_gauges()
+                    return conn, returned_at
+                if self._size < self.max_size:
+                    # Reserve the slot now; the connection is opened outside the lock.
+                    self._size += 1
+                    self._update_gauges()
+                    return None, None
+                remaining = deadline - now
+                if remaining <= 0:
+                    POOL_EXHAUSTED.labels(alias=self.alias).inc()
+                    raise PoolExhausted(
+                        f"No database connection available for {self.alias!r} within {self.timeout}s "
+                        f"(pool size {self.max_size})"
+                    )
+                self._cond.wait(remaining)
+
+    def _open(self, connect):
+        try:
+            conn = connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._update_gauges()
+                self._cond.notify()
+            raise
+        key = id(conn)
+        # A connection dropped without being released (its thread died, say)
+        # gives its slot back when it is garbage collected.
+        self._finalizers[key] = weakref.finalize(conn, self._forget, key, "lost")
+        self._opened_at[key] = time.monotonic()
+        POOL_OPENED.labels(alias=self.alias).inc()
+        return conn
+
+    def _ping(self, conn):
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            finally:
+                cursor.close()
+            conn.rollback()
+            return True
+        except Exception:
+            logger.warning("Pooled connection failed its health check: alias=%s", self.alias, exc_info=True)
+            return False
+
+    def _discard(self, conn, reason):
+        key = id(conn)
+        finalizer = self._finalizers.get(key)
+        if finalizer is not None:
+            finalizer.detach()
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._forget(key, reason)
+
+    def _forget(self, key, reason):
+        with self._cond:
+            self._finalizers.pop(key, None)
+            if self._opened_at.pop(key, None) is None:
+                return
+            self._size -= 1
+            self._update_gauges()
+            self._cond.notify()
+        POOL_CLOSED.labels(alias=self.alias, reason=reason).inc()
+
+    def _update_gauges(self):
+        POOL_CONNECTIONS.labels(alias=self.alias, state="idle").set(len(self._idle))
+        POOL_CONNECTIONS.labels(alias=self.alias, state="in_use").set(self._size - len(self._idle))
+
+
+_pools = {}
+_pools_pid = None
+_pools_lock = threading.Lock()
+# Pools inherited through fork() are kept referenced: garbage collecting them
+# would close sockets that still belong to the parent process.
+_inherited = []
+
+
+def get_pool(alias, options):
+    """Return the process-wide pool for ``alias``, creating it on first use."""
+    global _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _inherited.append(_pools.copy())
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(alias)
+        if pool is None:
+            settings = {**DEFAULTS, **options}
+            pool = _pools[alias] = ConnectionPool(
+                alias,
+                max_size=int(settings["MAX_SIZE"]),
+                timeout=float(settings["TIMEOUT"]),
+                max_idle=float(settings["MAX_IDLE"]),
+                max_lifetime=float(settings["MAX_LIFETIME"]),
+                check_interval=float(settings["CHECK_INTERVAL"]),
+            )
+        return pool
@@ -0,0 +1,222 @@
+import contextvars
+import logging
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import LazyObject, empty
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+READS_ROUTED = Counter("db_reads_routed", "Read-only requests by the database they read from", ["alias"])
+REPLICA_LAG = Gauge("db_replica_lag_seconds", "Last measured replica lag", ["alias"], multiprocess_mode="livemax")
+REPLICA_UNHEALTHY = Counter(
+    "db_replica_unhealthy", "Replica checks that took a replica out of rotation", ["alias", "reason"]
+)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+class _ReadState:
+    def __init__(self, request):
+        self.request = request
+        self.user_checked = False
+        self.primary = False
+        self.replica = None
+
+
+# Set by ReplicaRoutingMiddleware for read-only requests; None everywhere else
+# (write requests, management commands, background threads) means primary.
+_read_state = contextvars.ContextVar("db_read_state", default=None)
+
+
+def _pin_key(user_id):
+    return f"db:primary:{user_id}"
+
+
+def _resolved_user(request):
+    # DRF replaces the lazy session user with the token's user once the view
+    # has authenticated; never evaluate the lazy object from inside a query.
+    user = getattr(request, "user", None)
+    if user is None or (isinstance(user, LazyObject) and user._wrapped is empty):
+        return None
+    return user
+
+
+def pin_to_primary(user_id):
+    """Send ``user_id``'s reads to the primary for the read-your-writes window."""
+    try:
+        cache.set(_pin_key(user_id), 1, timeout=settings.REPLICA_READ_YOUR_WRITES_WINDOW)
+    except Exception:
+        logger.warning("Could not pin user to primary: user=%s", user_id, exc_info=True)
+
+
+def _is_pinned(user_id):
+    try:
+        return cache.get(_pin_key(user_id)) is not None
+    except Exception:
+        logger.warning("Replica pin lookup failed, reading from primary: user=%s", user_id, exc_info=True)
+        return True
+
+
+def measure_lag(alias):
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+class ReplicaMonitor:
+    """Tracks which replicas are fit to serve reads.
+
+    Each replica's lag is measured at most once per
+    ``REPLICA_LAG_CHECK_INTERVAL`` per process, by whichever request first
+    finds the last measurement stale; concurrent requests keep using the
+    previous result meanwhile. A replica that lags by more than
+    ``REPLICA_MAX_LAG`` or fails the check is left out until the next check.
+    """
+
+    def __init__(self):
+        self._status = {}
+        self._checking = set()
+        self._lock = threading.Lock()
+
+    def healthy(self):
+        now = time.monotonic()
+        result = []
+        for alias in settings.REPLICA_DATABASES:
+            checked_at, healthy = self._status.get(alias, (None, False))
+            if checked_at is None or now - checked_at >= settings.REPLICA_LAG_CHECK_INTERVAL:
+                with self._lock:
+                    claimed = alias not in self._checking
+                    self._checking.add(alias)
+                if claimed:
+                    try:
+                        healthy = self._check(alias)
+                        self._status[alias] = (now, healthy)
+                    finally:
+                        self._checking.discard(alias)
+            if healthy:
+                result.append(alias)
+        return result
+
+    def reset(self):
+        self._status.clear()
+
+    def _check(self, alias):
+        try:
+            lag = measure_lag(alias)
+        except Exception:
+            logger.warning("Replica check failed: alias=%s", alias, exc_info=True)
+            REPLICA_UNHEALTHY.labels(alias=alias, reason="unavailable").inc()
+            return False
+        REPLICA_LAG.labels(alias=alias).set(lag)
+        if lag > settings.REPLICA_MAX_LAG:
+            logger.warning("Replica lagging: alias=%s lag=%.1fs", alias, lag)
+            REPLICA_UNHEALTHY.labels(alias=alias, reason="lag").inc()
+            return False
+        return True
+
+
+monitor = ReplicaMonitor()
+
+
+class ReplicaRouter:
+    """Sends reads made by read-only requests to a replica.
+
+    A request reads from a single replica for its whole duration. It falls
+    back to the primary when no replica is healthy, when the authenticated
+    user wrote something within the read-your-writes window, or once the
+    request itself writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _read_state.get()
+        if state is None or not settings.REPLICA_DATABASES:
+            return None
+        if state.primary:
+            return DEFAULT_DB_ALIAS
+        if not state.user_checked:
+            user = _resolved_user(state.request)
+            if user is not None:
+                state.user_checked = True
+                if user.is_authenticated and _is_pinned(user.pk):
+                    state.primary = True
+                    READS_ROUTED.labels(alias=DEFAULT_DB_ALIAS).inc()
+                    return DEFAULT_DB_ALIAS
+        if state.replica is None:
+            healthy = monitor.healthy()
+            state.replica = random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+            READS_ROUTED.labels(alias=state.replica).inc()
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _read_state.get()
+        if state is not None:
+            state.primary = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema from the primary.
+        return False if db in settings.REPLICA_DATABASES else None
+
+
+class ReplicaRoutingMiddleware:
+    """Marks read-only requests for the router and pins users after writes."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _read_state.set(_ReadState(request) if request.method in SAFE_METHODS else None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_state.reset(token)
+        user_id = self._writer_id(request)
+        if user_id is not None:
+            pin_to_primary(user_id)
+        return response
+
+    async def __acall__(self, request):
+        token = _read_state.set(_ReadState(request) if request.method in SAFE_METHODS else None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_state.reset(token)
+        user_id = self._writer_id(request)
+        if user_id is not None:
+            await sync_to_async(pin_to_primary)(user_id)
+        return response
+
+    def _writer_id(self, request):
+        if request.method in SAFE_METHODS or not settings.REPLICA_DATABASES:
+            return None
+        user = _resolved_user(request)
+        return user.pk if user is not None and user.is_authenticated else None
@@ -0,0 +1,199 @@
+import functools
+import hmac
+import logging
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from prometheus_client import Gauge
+from rest_framework.permissions import BasePermission
+
+logger = logging.getLogger(__name__)
+
+DEPENDENCY_UP = Gauge(
+    "health_dependency_up",
+    "Whether the last probe of a dependency succeeded",
+    ["dependency"],
+    multiprocess_mode="livemin",
+)
+DEPENDENCY_LATENCY = Gauge(
+    "health_dependency_latency_seconds",
+    "Duration of the last probe of a dependency",
+    ["dependency"],
+    multiprocess_mode="livemax",
+)
+
+CACHE_PROBE_KEY = "health:probe"
+
+
+def check_database():
+    connection = connections[DEFAULT_DB_ALIAS]
+    # connect_timeout in the database OPTIONS bounds opening the connection.
+    with transaction.atomic(using=DEFAULT_DB_ALIAS), connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # Transaction-local, so the connection goes back to the pool without it.
+            cursor.execute(
+                "SELECT set_config('statement_timeout', %s, true)", [str(int(settings.HEALTH_CHECK_TIMEOUT * 1000))]
+            )
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+
+
+@functools.lru_cache(maxsize=1)
+def _redis(location, timeout):
+    import redis
+
+    return redis.Redis.from_url(location, socket_timeout=timeout, socket_connect_timeout=timeout)
+
+
+def check_cache():
+    value = str(time.time())
+    config = settings.CACHES["default"]
+    if config["BACKEND"].startswith("django_redis."):
+        # A client of its own with socket timeouts: the shared connection pool
+        # has none, because the outbox and event consumers block on it.
+        client = _redis(config["LOCATION"], settings.HEALTH_CHECK_TIMEOUT)
+        client.set(CACHE_PROBE_KEY, value, ex=60)
+        stored = client.get(CACHE_PROBE_KEY)
+        stored = stored and stored.decode()
+    else:
+        cache.set(CACHE_PROBE_KEY, value, timeout=60)
+        stored = cache.get(CACHE_PROBE_KEY)
+    if stored != value:
+        raise RuntimeError("cache did not return the probe value")
+
+
+def check_log_sink():
+    with socket.create_connection((settings.LOGSTASH_HOST, settings.LOGSTASH_PORT), settings.HEALTH_CHECK_TIMEOUT):
+        pass
+
+
+# The database is required to serve anything; the others only degrade the service.
+CHECKS = {
+    "database": (check_database, True),
+    "cache": (check_cache, False),
+    "log_sink": (check_log_sink, False),
+}
+
+
+def probe(checks=None):
+    """Run every dependency check now and return a health snapshot."""
+    results = {}
+    status = "healthy"
+    for name, (check, required) in (checks or CHECKS).items():
+        started = time.perf_counter()
+        try:
+            check()
+        except Exception:
+            # The reason stays in the logs: exception text can carry hosts and credentials.
+            logger.warning("Health check failed: dependency=%s", name, exc_info=True)
+            up = False
+        else:
+            up = True
+        latency = time.perf_counter() - started
+        DEPENDENCY_UP.labels(dependency=name).set(int(up))
+        DEPENDENCY_LATENCY.labels(dependency=name).set(latency)
+        results[name] = {"status": "up" if up else "down", "latency_ms": round(latency * 1e3, 2)}
+        if not up:
+            if required:
+                status = "unhealthy"
+            elif status == "healthy":
+                status = "degraded"
+    return {
+        "status": status,
+        "database": "connected" if results.get("database", {}).get("status") == "up" else "disconnected",
+        "api": "running",
+        "checks": results,
+        "checked_at": time.time(),
+    }
+
+
+def stale(snapshot):
+    """``snapshot`` (None if there is none yet) as served once the prober stopped keeping it fresh."""
+    base = snapshot or {"database": "disconnected", "api": "running", "checks": {}, "checked_at": None}
+    return {**base, "status": "unhealthy", "stale": True}
+
+
+class CanProbe(BasePermission):
+    """Staff users, or callers sending ``HEALTH_TOKEN`` in the ``X-Health-Token`` header."""
+
+    def has_permission(self, request, view):
+        token = settings.HEALTH_TOKEN
+        supplied = request.headers.get("X-Health-Token")
+        if token and supplied and hmac.compare_digest(token.encode(), supplied.encode()):
+            return True
+        return bool(request.user and request.user.is_staff)
+
+
+class HealthMonitor:
+    """Keeps a health snapshot fresh from a background thread.
+
+    Every ``HEALTH_CHECK_INTERVAL`` seconds the thread probes the database,
+    the cache and the log sink, so serving a health check is a dictionary
+    lookup. Requests never probe: a snapshot older than three intervals,
+    which means the thread died or a probe hangs, is served marked stale and
+    unhealthy. With an interval of 0 there is no thread and the snapshot is
+    only taken on first use or by ``refresh``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        # Called again in a forked child: the parent's thread does not survive the fork.
+        self._pid = os.getpid()
+        self._snapshot = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._probed = threading.Event()
+
+    def start(self):
+        if self._pid != os.getpid():
+            self._reset()
+        if self._thread is None and settings.HEALTH_CHECK_INTERVAL > 0:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="health-prober", daemon=True)
+                    self._thread.start()
+
+    def snapshot(self):
+        self.start()
+        interval = settings.HEALTH_CHECK_INTERVAL
+        if interval <= 0:
+            return self._snapshot or self.refresh()
+        if self._snapshot is None:
+            # Just started: give the first probe as long as one check may take.
+            self._probed.wait(settings.HEALTH_CHECK_TIMEOUT)
+        snapshot = self._snapshot
+        age = None if snapshot is None else time.time() - snapshot["checked_at"]
+        if age is None or age > 3 * interval:
+            logger.warning("Health snapshot is stale: age=%s", "none" if age is None else f"{age:.1f}s")
+            return stale(snapshot)
+        return snapshot
+
+    def refresh(self):
+        self._snapshot = snapshot = probe()
+        self._probed.set()
+        return snapshot
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                logger.warning("Health probe failed", exc_info=True)
+            finally:
+                # The thread's connections would otherwise stay checked out between probes.
+                connections.close_all()
+            self._stop.wait(settings.HEALTH_CHECK_INTERVAL)
+
+
+monitor = HealthMonitor()
@@ -0,0 +1,130 @@
+import functools
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from prometheus_client import Counter
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_REQUESTS = Counter(
+    "idempotent_requests", "Requests carrying an Idempotency-Key, by outcome", ["view", "outcome"]
+)
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL = 0.05
+
+
+def _digest(value):
+    return hashlib.sha1(value, usedforsecurity=False).hexdigest()
+
+
+def _cache_key(request, key):
+    # Keys are only unique per client, so they are scoped to the user and endpoint.
+    return f"idempotency:{request.user.pk}:{request.method}:{request.path}:{_digest(key.encode('utf-8'))}"
+
+
+def _replay(stored):
+    response = Response(stored["data"], status=stored["status"])
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _store(cache_key, response, fingerprint):
+    stored = {"status": response.status_code, "data": response.data, "fingerprint": fingerprint}
+    try:
+        cache.set(cache_key, stored, timeout=settings.IDEMPOTENCY_TTL)
+    except Exception:
+        logger.warning("Could not store idempotent response: key=%s", cache_key, exc_info=True)
+        return False
+    return True
+
+
+def _wait(cache_key):
+    """Poll for the stored response of a request with the same key, for up to ``IDEMPOTENCY_WAIT`` seconds."""
+    stored = None
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT
+    while stored is None and time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        stored = cache.get(cache_key)
+    return stored
+
+
+def idempotent(handler):
+    """Make a view handler safe to retry with an ``Idempotency-Key`` header.
+
+    The first response to a key, unless it is a 5xx, is kept in the cache for
+    ``IDEMPOTENCY_TTL`` seconds and replayed for later requests with the same
+    key without running the handler again. A request arriving while another
+    one with its key is still running waits up to ``IDEMPOTENCY_WAIT`` seconds
+    for that result, then gets a 409. Reusing a key for a different request
+    body is a 422. Requests without the header, or while the cache is
+    unavailable, run normally.
+    """
+    view_name = handler.__qualname__.split(".")[0]
+
+    @functools.wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return handler(self, request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"detail": f"{HEADER} must be 1-{MAX_KEY_LENGTH} characters"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        cache_key = _cache_key(request, key)
+        lock_key = f"{cache_key}:lock"
+        fingerprint = _digest(request.body)
+        try:
+            stored = cache.get(cache_key)
+            locked = stored is None and cache.add(lock_key, 1, timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+            if stored is None and not locked:
+                # Another request with this key is running; wait for its result.
+                stored = _wait(cache_key)
+        except Exception:
+            logger.warning("Idempotency cache unavailable, running request: view=%s", view_name, exc_info=True)
+            IDEMPOTENT_REQUESTS.labels(view=view_name, outcome="error").inc()
+            return handler(self, request, *args, **kwargs)
+
+        if stored is None and not locked:
+            IDEMPOTENT_REQUESTS.labels(view=view_name, outcome="conflict").inc()
+            response = Response(
+                {"detail": f"A request with this {HEADER} is still in progress"}, status=status.HTTP_409_CONFLICT
+            )
+            response["Retry-After"] = "1"
+            return response
+
+        if stored is not None:
+            if stored["fingerprint"] != fingerprint:
+                IDEMPOTENT_REQUESTS.labels(view=view_name, outcome="mismatch").inc()
+                return Response(
+                    {"detail": f"{HEADER} was already used for a different request"},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            IDEMPOTENT_REQUESTS.labels(view=view_name, outcome="replayed").inc()
+            return _replay(stored)
+
+        try:
+            try:
+                response = handler(self, request, *args, **kwargs)
+            except Exception as exc:
+                # Errors raised as exceptions (a 404, a validation error) are
+                # kept like returned responses; anything else still propagates.
+                response = self.handle_exception(exc)
+            # Stored before the lock is released so a retry can never run the handler again.
+            outcome = "stored" if response.status_code < 500 and _store(cache_key, response, fingerprint) else "failed"
+        finally:
+            try:
+                cache.delete(lock_key)
+            except Exception:
+                logger.warning("Could not release idempotency lock: view=%s", view_name, exc_info=True)
+        IDEMPOTENT_REQUESTS.labels(view=view_name, outcome=outcome).inc()
+        return response
+
+    return wrapper
@@ -0,0 +1,114 @@
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+REQUESTS_SHED = Counter(
+    "http_requests_shed", "Requests rejected with 503 because the worker was overloaded", ["reason"]
+)
+
+# Probes and scrapes must keep answering while the API sheds load. The deep
+# health check is not exempt: it opens a connection to every dependency.
+EXEMPT_PREFIXES = ("/health", "/metrics")
+SHED_PATHS = ("/health/deep",)
+
+
+def exempt(path):
+    return path.startswith(EXEMPT_PREFIXES) and path not in SHED_PATHS
+
+
+def queue_seconds(request, now=None):
+    """Seconds since the proxy stamped ``X-Request-Start``, or None without the header.
+
+    Accepts ``t=<seconds>`` as sent by nginx's ``$msec`` as well as
+    millisecond and microsecond timestamps.
+    """
+    value = request.META.get("HTTP_X_REQUEST_START", "")
+    if value.startswith("t="):
+        value = value[2:]
+    try:
+        started = float(value)
+    except ValueError:
+        return None
+    while started > 1e11:
+        started /= 1000
+    return (now or time.time()) - started
+
+
+class LoadSheddingMiddleware:
+    """Answers 503 with ``Retry-After`` right away when this worker is overloaded.
+
+    A request is shed when it spent more than ``LOAD_SHED_QUEUE_TIMEOUT``
+    seconds waiting for a worker since the proxy received it, which is how
+    saturation shows with sync workers, or when the process already handles
+    ``LOAD_SHED_MAX_IN_FLIGHT`` requests, which covers ASGI workers. Either
+    limit is off when set to 0.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if exempt(request.path):
+            return self.get_response(request)
+        rejection = self._admit(request)
+        if rejection is not None:
+            return rejection
+        try:
+            return self.get_response(request)
+        finally:
+            self._leave()
+
+    async def __acall__(self, request):
+        if exempt(request.path):
+            return await self.get_response(request)
+        rejection = self._admit(request)
+        if rejection is not None:
+            return rejection
+        try:
+            return await self.get_response(request)
+        finally:
+            self._leave()
+
+    def _admit(self, request):
+        queued = queue_seconds(request)
+        if settings.LOAD_SHED_QUEUE_TIMEOUT and queued is not None and queued > settings.LOAD_SHED_QUEUE_TIMEOUT:
+            return self._reject(request, "queue_timeout", queued=round(queued, 3))
+        with self._lock:
+            in_flight = self._in_flight
+            if not settings.LOAD_SHED_MAX_IN_FLIGHT or in_flight < settings.LOAD_SHED_MAX_IN_FLIGHT:
+                self._in_flight += 1
+                return None
+        return self._reject(request, "concurrency", in_flight=in_flight)
+
+    def _leave(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _reject(self, request, reason, **details):
+        REQUESTS_SHED.labels(reason=reason).inc()
+        logger.warning(
+            "Shedding request: reason=%s path=%s %s",
+            reason,
+            request.path,
+            " ".join(f"{key}={value}" for key, value in details.items()),
+        )
+        response = JsonResponse({"detail": "Server is overloaded, retry later"}, status=503)
+        response["Retry-After"] = str(settings.LOAD_SHED_RETRY_AFTER)
+        return response
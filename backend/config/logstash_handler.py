@@ -1,41 +1,152 @@
+import collections
 import json
 import logging
+import os
 import socket
+import threading
 import time
 from datetime import datetime, timezone
 
+from prometheus_client import Counter, Gauge
+
+RECORDS_BUFFERED = Gauge(
+    "logstash_records_buffered", "Log records waiting in the Logstash buffer", multiprocess_mode="livesum"
+)
+RECORDS_SENT = Counter("logstash_records_sent", "Log records delivered to Logstash")
+RECORDS_DROPPED = Counter("logstash_records_dropped", "Log records dropped before reaching Logstash", ["reason"])
+
 
 class TCPJsonHandler(logging.Handler):
-    """Sends JSON log records to Logstash over a persistent TCP connection."""
+    """Sends JSON log records to Logstash over a persistent TCP connection.
+
+    ``emit`` only formats the record and appends it to a bounded in-memory
+    buffer; a background thread ships the buffer in batches. When the buffer
+    is full the oldest record is dropped, so a slow or absent Logstash never
+    blocks the request thread.
+    """
 
-    def __init__(self, host="logstash", port=5000):
+    def __init__(self, host="logstash", port=5000, capacity=10000, batch_size=200, flush_interval=1.0, timeout=3):
         super().__init__()
         self.host = host
         self.port = port
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
         self._sock = None
         self._last_error = 0
+        self._reset()
 
-    def _connect(self):
-        self._sock = socket.create_connection((self.host, self.port), timeout=3)
+    def _reset(self):
+        # Called again in a forked child: the parent's thread does not survive the fork.
+        self._pid = os.getpid()
+        self._buffer = collections.deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._flushing = 0
+        self._closed = False
+        self._thread = None
+
+    def _ensure_worker(self):
+        if self._pid != os.getpid():
+            self._sock = None
+            self._reset()
+        if self._thread is None:
+            with self._cond:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="logstash-shipper", daemon=True)
+                    self._thread.start()
+
+    def format_entry(self, record):
+        entry = {
+            "@timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "message": record.getMessage(),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return (json.dumps(entry) + "\n").encode("utf-8")
 
     def emit(self, record):
+        try:
+            line = self.format_entry(record)
+        except Exception:
+            self.handleError(record)
+            return
+        self._ensure_worker()
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._buffer) >= self.capacity:
+                self._buffer.popleft()
+                RECORDS_DROPPED.labels(reason="overflow").inc()
+            else:
+                RECORDS_BUFFERED.inc()
+            self._buffer.append(line)
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                idle = not self._buffer or (len(self._buffer) < self.batch_size and not self._flushing)
+                if idle and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                RECORDS_BUFFERED.dec(len(batch))
+                self._in_flight = len(batch)
+                done = self._closed and not batch
+            if batch:
+                self._send(batch)
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+            if done:
+                return
+
+    def _send(self, batch):
         # Back off for 30s after a failed connection to avoid log spam
         if self._sock is None and time.time() - self._last_error < 30:
+            RECORDS_DROPPED.labels(reason="unavailable").inc(len(batch))
             return
         try:
             if self._sock is None:
-                self._connect()
-            entry = {
-                "@timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
-                "message": record.getMessage(),
-                "level": record.levelname,
-                "logger": record.name,
-                "module": record.module,
-            }
-            if record.exc_info:
-                entry["exception"] = self.formatException(record.exc_info)
-            self._sock.sendall((json.dumps(entry) + "\n").encode("utf-8"))
-        except Exception:
+                self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            self._sock.sendall(b"".join(batch))
+            RECORDS_SENT.inc(len(batch))
+        except OSError:
+            if self._sock is not None:
+                self._sock.close()
             self._sock = None
             self._last_error = time.time()
-            self.handleError(record)
+            RECORDS_DROPPED.labels(reason="unavailable").inc(len(batch))
+
+    def flush(self, timeout=5.0):
+        if self._thread is None or self._pid != os.getpid():
+            return
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                while self._buffer or self._in_flight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            finally:
+                self._flushing -= 1
+
+    def close(self):
+        # logging.shutdown() runs at interpreter exit, including gunicorn worker exit.
+        if self._thread is not None and self._pid == os.getpid():
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            self._thread.join(self.timeout + self.flush_interval + 1)
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        super().close()
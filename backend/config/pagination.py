@@ -0,0 +1,124 @@
+import base64
+import json
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.urls import replace_query_param
+
+
+class CursorPaginator:
+    """Keyset pagination over an ordered queryset with opaque cursors.
+
+    The cursor stores the ordering values of the last row on the page, so the
+    next page is fetched with an index seek instead of an OFFSET scan.
+    Offset paging with ``skip`` is rejected rather than ignored, so old
+    clients get an error instead of the first page over and over.
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    offset_query_param = "skip"
+    page_size = 20
+    max_page_size = 100
+
+    def __init__(self, ordering=("-created_at", "-id"), page_size=None, max_page_size=None):
+        self.ordering = tuple(ordering)
+        if page_size is not None:
+            self.page_size = page_size
+        if max_page_size is not None:
+            self.max_page_size = max_page_size
+        self.request = None
+        self.next_position = None
+
+    def paginate(self, queryset, request):
+        queryset, limit = self._page_queryset(queryset, request)
+        return self._trim(list(queryset[: limit + 1]), limit)
+
+    async def apaginate(self, queryset, request):
+        queryset, limit = self._page_queryset(queryset, request)
+        return self._trim([row async for row in queryset[: limit + 1]], limit)
+
+    def _page_queryset(self, queryset, request):
+        self.request = request
+        if self.offset_query_param in request.query_params:
+            raise ParseError(f"{self.offset_query_param!r} is not supported; follow the Link header instead")
+        limit = self._get_limit(request)
+        position = self._decode(request.query_params.get(self.cursor_query_param))
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self._seek(position))
+            except (ValidationError, ValueError, TypeError):
+                raise ParseError("Invalid cursor")
+        return queryset, limit
+
+    def _trim(self, rows, limit):
+        self.next_position = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            self.next_position = [self._value(rows[-1], field) for field in self.ordering]
+        return rows
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self._encode(self.next_position))
+
+    def get_headers(self):
+        link = self.get_next_link()
+        if link is None:
+            return {}
+        return {"Link": f'<{link}>; rel="next"'}
+
+    def _get_limit(self, request):
+        raw = request.query_params.get(self.limit_query_param)
+        if raw is None:
+            return self.page_size
+        try:
+            limit = int(raw)
+        except ValueError:
+            raise ParseError("Invalid limit")
+        if limit < 1:
+            raise ParseError("Invalid limit")
+        return min(limit, self.max_page_size)
+
+    def _seek(self, position):
+        # (a, b) after (x, y) in ordering  <=>  a > x OR (a = x AND b > y)
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+
+    @staticmethod
+    def _value(row, field):
+        name = field.lstrip("-")
+        value = row[name] if isinstance(row, dict) else getattr(row, name)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    def _encode(self, position):
+        raw = json.dumps(position, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def _decode(self, cursor):
+        if not cursor:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            position = json.loads(raw)
+        except (ValueError, TypeError):
+            raise ParseError("Invalid cursor")
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise ParseError("Invalid cursor")
+        if not all(isinstance(value, (str, int, float)) for value in position):
+            raise ParseError("Invalid cursor")
+        return position
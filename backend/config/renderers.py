@@ -0,0 +1,38 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed.
+
+    Output is byte-for-byte what JSONRenderer produces with the default
+    COMPACT_JSON/UNICODE_JSON settings; indented (browsable API) rendering and
+    installs without orjson go through the stock renderer.
+    """
+
+    _fallback_encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=self._fallback_encoder.default, option=orjson.OPT_UTC_Z)
+        # Keep the JSONRenderer guarantee that output is a strict JavaScript subset.
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+
+
+class EventStreamRenderer(ORJSONRenderer):
+    """Lets views negotiate ``Accept: text/event-stream``.
+
+    The event stream itself is a ``StreamingHttpResponse`` and skips
+    rendering; only error responses come through here, as JSON.
+    """
+
+    media_type = "text/event-stream"
+    format = "event-stream"
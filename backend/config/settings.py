@@ -28,16 +28,23 @@ INSTALLED_APPS = [
     "apps.projects",
     "apps.likes",
     "apps.matches",
+    "apps.counters",
+    "apps.outbox",
+    "apps.jobs",
+    "apps.events",
 ]
 
 MIDDLEWARE = [
     "django_prometheus.middleware.PrometheusBeforeMiddleware",
+    "config.load_shedding.LoadSheddingMiddleware",
+    "config.db.budget.QueryBudgetMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "config.db.router.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_prometheus.middleware.PrometheusAfterMiddleware",
@@ -63,17 +70,63 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "config.wsgi.application"
 
+# wsgi: gunicorn sync workers; asgi: gunicorn with uvicorn workers (see init.sh).
+SERVER_MODE = os.environ.get("SERVER_MODE", "wsgi")
+# Serve the read endpoints with their async views. Only worth it on ASGI workers:
+# under WSGI every async view is driven through async_to_sync, which costs more
+# CPU per request than the sync view it replaces. Defaults to on for asgi only.
+ASYNC_VIEWS = (os.environ.get("ASYNC_VIEWS") or ("1" if SERVER_MODE == "asgi" else "0")) == "1"
+
 DATABASES = {
     "default": {
-        "ENGINE": "django_prometheus.db.backends.postgresql",
+        "ENGINE": "config.db.backends.postgresql",
         "NAME": os.environ.get("POSTGRES_DB", "project_finder"),
         "USER": os.environ.get("POSTGRES_USER", "postgres"),
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD", "postgres"),
         "HOST": os.environ.get("POSTGRES_SERVER", os.environ.get("POSTGRES_HOST", "db")),
         "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+        # Connections are returned to the pool at the end of each request.
+        "CONN_MAX_AGE": 0,
+        # Seconds libpq waits for a new connection instead of hanging on an unreachable server.
+        "OPTIONS": {"connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", "5"))},
+        "POOL": {
+            "MAX_SIZE": int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+            "TIMEOUT": float(os.environ.get("DB_POOL_TIMEOUT", "5")),
+            "MAX_IDLE": float(os.environ.get("DB_POOL_MAX_IDLE", "300")),
+            "MAX_LIFETIME": float(os.environ.get("DB_POOL_MAX_LIFETIME", "1800")),
+            "CHECK_INTERVAL": float(os.environ.get("DB_POOL_CHECK_INTERVAL", "5")),
+        },
     }
 }
 
+# Read replicas: POSTGRES_REPLICA_HOSTS="replica1:5432,replica2:5432" adds
+# aliases replica_1, replica_2, ... with the primary's credentials.
+for _index, _replica in enumerate(filter(None, os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(",")), 1):
+    _host, _, _port = _replica.strip().partition(":")
+    DATABASES[f"replica_{_index}"] = {
+        **DATABASES["default"],
+        "HOST": _host,
+        "PORT": _port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != "default"]
+REPLICA_MAX_LAG = float(os.environ.get("REPLICA_MAX_LAG", "5"))
+REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get("REPLICA_LAG_CHECK_INTERVAL", "5"))
+REPLICA_READ_YOUR_WRITES_WINDOW = int(os.environ.get("REPLICA_READ_YOUR_WRITES_WINDOW", "10"))
+
+DATABASE_ROUTERS = ["config.db.router.ReplicaRouter"]
+
+# Seconds a request may wait for a worker after the proxy received it before
+# it is shed with a 503; needs the X-Request-Start header. 0 disables.
+LOAD_SHED_QUEUE_TIMEOUT = float(os.environ.get("LOAD_SHED_QUEUE_TIMEOUT", "5"))
+# Concurrent requests per worker process before new ones are shed; 0 disables.
+LOAD_SHED_MAX_IN_FLIGHT = int(os.environ.get("LOAD_SHED_MAX_IN_FLIGHT", "64"))
+LOAD_SHED_RETRY_AFTER = int(os.environ.get("LOAD_SHED_RETRY_AFTER", "1"))
+
+# Requests running more SQL queries than this are logged with a warning.
+SQL_QUERY_BUDGET = int(os.environ.get("SQL_QUERY_BUDGET", "20"))
+
 REDIS_HOST = os.environ.get("REDIS_HOST", "redis")
 REDIS_PORT = os.environ.get("REDIS_PORT", "6379")
 
@@ -87,6 +140,63 @@ CACHES = {
     }
 }
 
+PROJECT_CACHE_TIMEOUT = int(os.environ.get("PROJECT_CACHE_TIMEOUT", "60"))
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("AUTH_USER_CACHE_TIMEOUT", "300"))
+AUTH_USER_LOCAL_CACHE_TIMEOUT = float(os.environ.get("AUTH_USER_LOCAL_CACHE_TIMEOUT", "5"))
+
+# Seconds a response to an Idempotency-Key is replayed for, how long the first
+# request holds the key's lock, and how long a concurrent duplicate waits for it.
+IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.environ.get("IDEMPOTENCY_LOCK_TIMEOUT", "30"))
+IDEMPOTENCY_WAIT = float(os.environ.get("IDEMPOTENCY_WAIT", "5"))
+
+# Rows per like/match counter; more shards spread concurrent increments of a hot counter.
+COUNTER_SHARDS = int(os.environ.get("COUNTER_SHARDS", "8"))
+# How often the compact_counters job folds shards back into one row per counter.
+COUNTER_COMPACT_INTERVAL = int(os.environ.get("COUNTER_COMPACT_INTERVAL", "600"))
+COUNTER_COMPACT_MAX_BATCHES = int(os.environ.get("COUNTER_COMPACT_MAX_BATCHES", "100"))
+
+# Like and match events are written to the outbox table and published to this
+# Redis Stream by `manage.py relay_outbox`.
+OUTBOX_STREAM = os.environ.get("OUTBOX_STREAM", "events")
+OUTBOX_STREAM_MAXLEN = int(os.environ.get("OUTBOX_STREAM_MAXLEN", "100000"))
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", "500"))
+OUTBOX_POLL_INTERVAL = float(os.environ.get("OUTBOX_POLL_INTERVAL", "0.5"))
+OUTBOX_LAG_INTERVAL = float(os.environ.get("OUTBOX_LAG_INTERVAL", "5"))
+# Seconds before a stream entry a consumer received but never acknowledged is redelivered.
+OUTBOX_CLAIM_IDLE = float(os.environ.get("OUTBOX_CLAIM_IDLE", "60"))
+OUTBOX_RELAY_METRICS_PORT = int(os.environ.get("OUTBOX_RELAY_METRICS_PORT", "9101"))
+
+# Background jobs, run by `manage.py run_jobs` from the jobs table.
+JOB_QUEUES = [queue for queue in os.environ.get("JOB_QUEUES", "default").split(",") if queue]
+JOB_CONCURRENCY = int(os.environ.get("JOB_CONCURRENCY", "4"))
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "1"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "5"))
+# Retry n waits about JOB_BACKOFF_BASE * 2**(n-1) seconds, at most JOB_BACKOFF_MAX.
+JOB_BACKOFF_BASE = float(os.environ.get("JOB_BACKOFF_BASE", "5"))
+JOB_BACKOFF_MAX = float(os.environ.get("JOB_BACKOFF_MAX", "3600"))
+# A job running longer than this is assumed to have lost its worker and is retried.
+JOB_TIMEOUT = int(os.environ.get("JOB_TIMEOUT", "600"))
+JOB_HOUSEKEEPING_INTERVAL = float(os.environ.get("JOB_HOUSEKEEPING_INTERVAL", "15"))
+JOB_RETENTION = int(os.environ.get("JOB_RETENTION", str(7 * 86400)))
+JOB_CLEANUP_INTERVAL = int(os.environ.get("JOB_CLEANUP_INTERVAL", "3600"))
+JOB_METRICS_PORT = int(os.environ.get("JOB_METRICS_PORT", "9102"))
+
+# Server-Sent Events at /api/v1/events, served by ASGI workers. `manage.py push_events`
+# reads the outbox stream as consumer group EVENTS_CONSUMER_GROUP and copies each event
+# into a per-user stream, kept EVENTS_RETENTION seconds for Last-Event-ID resume.
+EVENTS_CONSUMER_GROUP = os.environ.get("EVENTS_CONSUMER_GROUP", "sse")
+EVENTS_STREAM_MAXLEN = int(os.environ.get("EVENTS_STREAM_MAXLEN", "200"))
+EVENTS_RETENTION = int(os.environ.get("EVENTS_RETENTION", "86400"))
+# Seconds between keep-alive comments, and before a connection is closed for the
+# client to reconnect (also how long a vanished client can hold a stream open).
+EVENTS_HEARTBEAT = float(os.environ.get("EVENTS_HEARTBEAT", "15"))
+EVENTS_MAX_AGE = float(os.environ.get("EVENTS_MAX_AGE", "300"))
+# Undelivered events a connection may buffer before it is closed.
+EVENTS_QUEUE_SIZE = int(os.environ.get("EVENTS_QUEUE_SIZE", "100"))
+EVENTS_RETRY_MS = int(os.environ.get("EVENTS_RETRY_MS", "3000"))
+EVENTS_METRICS_PORT = int(os.environ.get("EVENTS_METRICS_PORT", "9103"))
+
 AUTH_USER_MODEL = "users.User"
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -112,10 +222,30 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": ("rest_framework_simplejwt.authentication.JWTAuthentication",),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("apps.users.authentication.CachedJWTAuthentication",),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    "DEFAULT_RENDERER_CLASSES": (
+        "config.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    # Token buckets used by config.throttling, "<count>/<period>"; an empty value disables a bucket.
+    "DEFAULT_THROTTLE_RATES": {
+        "login.ip": os.environ.get("THROTTLE_LOGIN_IP", "20/min"),
+        "login.user": os.environ.get("THROTTLE_LOGIN_USER", "10/min"),
+        "login": os.environ.get("THROTTLE_LOGIN", ""),
+        "write.user": os.environ.get("THROTTLE_WRITE_USER", "120/min"),
+        "write.ip": os.environ.get("THROTTLE_WRITE_IP", "600/min"),
+        "write": os.environ.get("THROTTLE_WRITE", ""),
+    },
+    # nginx in front of the API appends the client address to X-Forwarded-For.
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", "1")),
 }
 
+# Addresses or networks of the proxies whose X-Forwarded-For is believed. The API
+# port is also published directly, so a request from anywhere else is identified
+# by its own address and a forged header cannot pick a fresh throttle bucket.
+TRUSTED_PROXIES = [p.strip() for p in os.environ.get("TRUSTED_PROXIES", "").split(",") if p.strip()]
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=int(os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", 60))),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
@@ -150,10 +280,23 @@ CORS_ALLOW_HEADERS = [
     "Accept",
     "Origin",
     "X-Requested-With",
+    "Idempotency-Key",
 ]
+# The frontend reads the next page of a list from the Link header.
+CORS_EXPOSE_HEADERS = ["Link"]
 
 LOGSTASH_HOST = os.environ.get("LOGSTASH_HOST", "logstash")
 LOGSTASH_PORT = int(os.environ.get("LOGSTASH_PORT", "5000"))
+LOGSTASH_BUFFER_SIZE = int(os.environ.get("LOGSTASH_BUFFER_SIZE", "10000"))
+LOGSTASH_BATCH_SIZE = int(os.environ.get("LOGSTASH_BATCH_SIZE", "200"))
+LOGSTASH_FLUSH_INTERVAL = float(os.environ.get("LOGSTASH_FLUSH_INTERVAL", "1.0"))
+
+# Seconds between background dependency probes behind /health; 0 probes only on demand.
+HEALTH_CHECK_INTERVAL = float(os.environ.get("HEALTH_CHECK_INTERVAL", "5"))
+# Bound on each probe: the log sink connect, the Redis sockets and the database statement.
+HEALTH_CHECK_TIMEOUT = float(os.environ.get("HEALTH_CHECK_TIMEOUT", "2"))
+# Sent as X-Health-Token to call /health/deep without a staff login; empty allows staff only.
+HEALTH_TOKEN = os.environ.get("HEALTH_TOKEN", "")
 
 LOGGING = {
     "version": 1,
@@ -173,6 +316,9 @@ LOGGING = {
             "class": "config.logstash_handler.TCPJsonHandler",
             "host": LOGSTASH_HOST,
             "port": LOGSTASH_PORT,
+            "capacity": LOGSTASH_BUFFER_SIZE,
+            "batch_size": LOGSTASH_BATCH_SIZE,
+            "flush_interval": LOGSTASH_FLUSH_INTERVAL,
             "level": "INFO",
         },
     },
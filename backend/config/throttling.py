@@ -0,0 +1,199 @@
+import functools
+import hashlib
+import ipaddress
+import logging
+import threading
+import time
+
+from django.conf import settings
+from prometheus_client import Counter
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_DECISIONS = Counter("throttle_decisions", "Token bucket throttle decisions", ["scope", "decision"])
+
+# Takes one token from every bucket in KEYS, or from none of them if any is
+# empty. ARGV holds a (tokens per second, capacity) pair per key. Returns the
+# seconds until all buckets have a token again, "0" when the request may pass.
+TOKEN_BUCKET_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local tokens = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2 - 1])
+    local capacity = tonumber(ARGV[i * 2])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local available = tonumber(state[1]) or capacity
+    local elapsed = math.max(0, now - (tonumber(state[2]) or now))
+    available = math.min(capacity, available + elapsed * rate)
+    if available < 1 then
+        wait = math.max(wait, (1 - available) / rate)
+    end
+    tokens[i] = available
+end
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2 - 1])
+    local capacity = tonumber(ARGV[i * 2])
+    local left = tokens[i]
+    if wait == 0 then
+        left = left - 1
+    end
+    redis.call('HSET', key, 'tokens', left, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000) + 1000)
+end
+return tostring(wait)
+"""
+
+
+def parse_rate(rate):
+    """``"10/min"`` -> ``(10 / 60, 10)``: refill per second and bucket capacity."""
+    count, period = rate.split("/")
+    seconds = {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+    return int(count) / seconds, int(count)
+
+
+class _LocalBuckets:
+    """In-process buckets for caches other than Redis, e.g. in tests and local runs."""
+
+    def __init__(self):
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def take(self, buckets):
+        now = time.monotonic()
+        with self._lock:
+            available = []
+            wait = 0.0
+            for key, rate, capacity in buckets:
+                tokens, ts = self._state.get(key, (capacity, now))
+                tokens = min(capacity, tokens + (now - ts) * rate)
+                if tokens < 1:
+                    wait = max(wait, (1 - tokens) / rate)
+                available.append(tokens)
+            for (key, rate, capacity), tokens in zip(buckets, available):
+                self._state[key] = (tokens - 1 if wait == 0 else tokens, now)
+            return wait
+
+    def clear(self):
+        with self._lock:
+            self._state.clear()
+
+
+@functools.lru_cache(maxsize=None)
+def _networks(proxies):
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def from_trusted_proxy(remote_addr):
+    """Whether ``remote_addr`` is one of ``TRUSTED_PROXIES``, so its X-Forwarded-For can be believed."""
+    try:
+        address = ipaddress.ip_address(remote_addr)
+    except ValueError:
+        return False
+    return any(address in network for network in _networks(tuple(settings.TRUSTED_PROXIES)))
+
+
+local_buckets = _LocalBuckets()
+_script = None
+
+
+def _redis_script():
+    global _script
+    if _script is None:
+        from django_redis import get_redis_connection
+
+        _script = get_redis_connection("default").register_script(TOKEN_BUCKET_LUA)
+    return _script
+
+
+def take(buckets):
+    """Take a token from each ``(key, rate, capacity)`` bucket in one atomic step.
+
+    Returns 0 when the request may proceed, otherwise the seconds to wait.
+    """
+    try:
+        script = _redis_script()
+    except NotImplementedError:
+        # The default cache is not django-redis.
+        return local_buckets.take(buckets)
+    args = []
+    for _, rate, capacity in buckets:
+        args.extend((rate, capacity))
+    return float(script(keys=[key for key, _, _ in buckets], args=args))
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Token buckets per user, per client IP and per endpoint class (``scope``).
+
+    Rates come from ``DEFAULT_THROTTLE_RATES`` as ``"<scope>.user"``,
+    ``"<scope>.ip"`` and ``"<scope>"`` (shared by all clients); buckets
+    without a rate are skipped. A request has to get a token from every
+    bucket. If Redis is unavailable requests are let through.
+    """
+
+    scope = None
+
+    def get_ident(self, request):
+        remote_addr = request.META.get("REMOTE_ADDR")
+        if not from_trusted_proxy(remote_addr):
+            # Sent straight to the API: X-Forwarded-For is whatever the client made up.
+            return remote_addr
+        return super().get_ident(request)
+
+    def get_user_ident(self, request):
+        user = request.user
+        return str(user.pk) if user and user.is_authenticated else None
+
+    def get_buckets(self, request):
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        idents = (
+            (f"{self.scope}.user", self.get_user_ident(request)),
+            (f"{self.scope}.ip", self.get_ident(request)),
+            (self.scope, "all"),
+        )
+        buckets = []
+        for name, ident in idents:
+            if ident is not None and rates.get(name):
+                buckets.append((f"throttle:{name}:{ident}", *parse_rate(rates[name])))
+        return buckets
+
+    def allow_request(self, request, view):
+        self.wait_time = None
+        buckets = self.get_buckets(request)
+        if not buckets:
+            return True
+        try:
+            wait = take(buckets)
+        except Exception:
+            logger.warning("Throttle check failed, allowing request: scope=%s", self.scope, exc_info=True)
+            THROTTLE_DECISIONS.labels(scope=self.scope, decision="error").inc()
+            return True
+        if wait > 0:
+            self.wait_time = wait
+            THROTTLE_DECISIONS.labels(scope=self.scope, decision="throttled").inc()
+            return False
+        THROTTLE_DECISIONS.labels(scope=self.scope, decision="allowed").inc()
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+
+class LoginThrottle(TokenBucketThrottle):
+    """Limits password checks per client IP and per attacked account."""
+
+    scope = "login"
+
+    def get_user_ident(self, request):
+        identifier = request.data.get("username") if hasattr(request.data, "get") else None
+        if not isinstance(identifier, str) or not identifier.strip():
+            return None
+        # Hashed so that arbitrary client input never ends up in a Redis key.
+        return hashlib.sha1(identifier.strip().lower().encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+class WriteThrottle(TokenBucketThrottle):
+    scope = "write"
@@ -0,0 +1,104 @@
+import importlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from config import health
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_preloaded = False
+_ready = False
+
+
+def _walk(resolver):
+    for pattern in resolver.url_patterns:
+        # Compiles the route regex, which Django otherwise does on first match.
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            _walk(pattern)
+        elif isinstance(pattern, URLPattern):
+            pattern.lookup_str
+
+
+def preload():
+    """Import and initialize everything a first request would.
+
+    Safe to run before forking: it never touches the database. Under
+    gunicorn ``--preload`` the workers inherit the result.
+    """
+    global _preloaded
+    if _preloaded:
+        return
+    started = time.monotonic()
+    resolver = get_resolver()
+    _walk(resolver)
+    resolver.reverse_dict
+
+    from django.contrib.auth.hashers import get_hashers
+    from rest_framework.settings import api_settings
+
+    for name in (
+        "DEFAULT_RENDERER_CLASSES",
+        "DEFAULT_PARSER_CLASSES",
+        "DEFAULT_AUTHENTICATION_CLASSES",
+        "DEFAULT_PERMISSION_CLASSES",
+        "DEFAULT_THROTTLE_CLASSES",
+        "DEFAULT_CONTENT_NEGOTIATION_CLASS",
+    ):
+        getattr(api_settings, name)
+    get_hashers()
+    for module in ("rest_framework_simplejwt.tokens", "rest_framework_simplejwt.state"):
+        importlib.import_module(module)
+    _preloaded = True
+    logger.info("Preloaded application in %.0fms", (time.monotonic() - started) * 1e3)
+
+
+def connect():
+    """Open a connection per database so the pools start warm.
+
+    The primary has to be reachable; replicas are optional because the
+    router falls back to the primary without them.
+    """
+    for alias in settings.DATABASES:
+        connection = connections[alias]
+        try:
+            connection.ensure_connection()
+        except Exception:
+            if alias == DEFAULT_DB_ALIAS:
+                raise
+            logger.warning("Could not open a warmup connection: alias=%s", alias, exc_info=True)
+        finally:
+            # Returns the connection to the pool instead of closing it.
+            if not connection.in_atomic_block:
+                connection.close()
+
+
+def warm_up():
+    """Finish warming this process and mark it ready. Returns readiness."""
+    global _ready
+    if _ready:
+        return True
+    with _lock:
+        if _ready:
+            return True
+        started = time.monotonic()
+        try:
+            preload()
+            connect()
+            health.monitor.start()
+        except Exception:
+            logger.warning("Warmup failed, not ready yet", exc_info=True)
+            return False
+        _ready = True
+    logger.info("Warmup finished in %.0fms", (time.monotonic() - started) * 1e3)
+    return True
+
+
+def is_ready():
+    return _ready
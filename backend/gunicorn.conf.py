@@ -0,0 +1,31 @@
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "4"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+accesslog = "-"
+errorlog = "-"
+
+# Django and the app modules are imported once in the master and shared with
+# every worker through fork, instead of each worker importing them on its own.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+
+def when_ready(server):
+    from config import warmup
+
+    warmup.preload()
+
+
+def post_fork(server, worker):
+    # Connections must not be shared across fork, so each worker opens its own.
+    from config import warmup
+
+    warmup.warm_up()
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
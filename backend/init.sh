@@ -1,30 +1,79 @@
 #!/bin/sh
+# Usage: init.sh [serve|migrate|relay|jobs|events]
+#   migrate  apply migrations and seed data, then exit (one-shot job)
+#   relay    publish outbox events to the Redis Stream (long-running)
+#   jobs     run background jobs from the database queue (long-running)
+#   events   copy outbox events into per-user streams for /api/v1/events (long-running)
+#   serve    start the application server (default); with FAST_START=1 it
+#            assumes the migrate job already ran and starts right away
 
 DB_HOST="${POSTGRES_SERVER:-db}"
 DB_PORT="${POSTGRES_PORT:-5432}"
 
+wait_for_db() {
+  echo "Waiting for PostgreSQL at $DB_HOST:$DB_PORT..."
+  while ! nc -z "$DB_HOST" "$DB_PORT"; do
+    sleep 0.5
+  done
+  echo "PostgreSQL is ready!"
+}
+
+migrate() {
+  echo "Running Django migrations..."
+  python manage.py migrate --noinput || exit 1
+
+  if [ "${SEED_DATA:-1}" = "1" ]; then
+    echo "Seeding test data..."
+    python manage.py seed_data || exit 1
+  fi
+}
+
+case "${1:-serve}" in
+  migrate)
+    wait_for_db
+    migrate
+    exit 0
+    ;;
+  relay)
+    mkdir -p "${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}"
+    exec python manage.py relay_outbox
+    ;;
+  jobs)
+    mkdir -p "${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}"
+    exec python manage.py run_jobs
+    ;;
+  events)
+    mkdir -p "${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}"
+    exec python manage.py push_events
+    ;;
+  serve)
+    ;;
+  *)
+    echo "Unknown command '$1' (expected serve, migrate, relay, jobs or events)" >&2
+    exit 1
+    ;;
+esac
+
 mkdir -p "${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}"
 
-echo "Waiting for PostgreSQL at $DB_HOST:$DB_PORT..."
-while ! nc -z "$DB_HOST" "$DB_PORT"; do
-  sleep 0.5
-done
-echo "PostgreSQL is ready!"
-
-echo "Running Django migrations..."
-python manage.py makemigrations users projects likes matches --noinput
-python manage.py migrate --noinput
-
-echo "Seeding test data..."
-python manage.py seed_data
-
-echo "Collecting static files..."
-python manage.py collectstatic --noinput
-
-echo "Starting application..."
-exec gunicorn config.wsgi:application \
-    --bind 0.0.0.0:8000 \
-    --workers 4 \
-    --timeout 120 \
-    --access-logfile - \
-    --error-logfile -
+if [ "${FAST_START:-0}" != "1" ]; then
+  wait_for_db
+  migrate
+fi
+
+echo "Starting application (${SERVER_MODE:-wsgi})..."
+case "${SERVER_MODE:-wsgi}" in
+  asgi)
+    exec gunicorn config.asgi:application \
+        --config gunicorn.conf.py \
+        --worker-class uvicorn.workers.UvicornWorker
+    ;;
+  wsgi)
+    exec gunicorn config.wsgi:application \
+        --config gunicorn.conf.py
+    ;;
+  *)
+    echo "Unknown SERVER_MODE '$SERVER_MODE' (expected wsgi or asgi)" >&2
+    exit 1
+    ;;
+esac
@@ -6,15 +6,37 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": ":memory:",
-    }
+        # A file-backed test database lets threaded tests use real concurrent
+        # connections instead of SQLite's shared-cache table locks.
+        "TEST": {"NAME": str(BASE_DIR / "test_db.sqlite3")},
+    },
+    # A second connection to the test database; routing tests opt in through
+    # REPLICA_DATABASES so the rest of the suite reads from "default".
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+        "TEST": {"MIRROR": "default"},
+    },
 }
 
+REPLICA_DATABASES = []
+
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
     }
 }
 
+# Row ids are reused after a test rolls back, so user caching is opt-in per test.
+AUTH_USER_CACHE_TIMEOUT = 0
+AUTH_USER_LOCAL_CACHE_TIMEOUT = 0
+
 PASSWORD_HASHERS = [
     "django.contrib.auth.hashers.MD5PasswordHasher",
 ]
+
+# No background prober; tests take health snapshots explicitly.
+HEALTH_CHECK_INTERVAL = 0
+
+# Throttle tests set their own rates.
+REST_FRAMEWORK = {**REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}}
@@ -1,7 +1,18 @@
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from prometheus_client import REGISTRY
 from rest_framework import status
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from apps.users import authentication
+from apps.users import cache as user_cache
 
 User = get_user_model()
 
@@ -171,6 +182,38 @@ class MeTests(TestCase):
         res = self.client.get(URL_ME)
         self.assertNotIn("password", res.json()["user"])
 
+    def test_me_revalidation(self):
+        self.client.force_authenticate(user=self.user)
+        res = self.client.get(URL_ME)
+        self.assertEqual(res.headers["Cache-Control"], "private, no-cache")
+        self.assertIn("Authorization", res.headers["Vary"])
+        etag = res.headers["ETag"]
+        res = self.client.get(URL_ME, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+
+        self.user.full_name = "Renamed"
+        self.user.save()
+        res = self.client.get(URL_ME, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.headers["ETag"], etag)
+
+    def test_me_etag_follows_counters(self):
+        other = User.objects.create_user(email="o@example.com", username="other", password="pass123")
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(URL_ME).headers["ETag"]
+        self.client.force_authenticate(user=other)
+        self.client.post(f"/api/v1/likes/user/{self.user.pk}")
+        self.client.force_authenticate(user=self.user)
+        res = self.client.get(URL_ME, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["user"]["likes_count"], 1)
+
+
+@override_settings(ROOT_URLCONF="tests.urls_async")
+class AsyncMeTests(MeTests):
+    """The same cases against the async view served under ``ASYNC_VIEWS=1``."""
+
 
 class UserListTests(TestCase):
     def setUp(self):
@@ -184,6 +227,105 @@ class UserListTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(len(res.json()), 2)
 
+    def test_list_paginated(self):
+        self.client.force_authenticate(user=self.user)
+        res = self.client.get(URL_USERS, {"limit": 1})
+        self.assertEqual(len(res.json()), 1)
+        next_url = res.headers["Link"].split(";")[0].strip("<>")
+        res_next = self.client.get(next_url)
+        self.assertEqual(len(res_next.json()), 1)
+        self.assertNotEqual(res.json()[0]["id"], res_next.json()[0]["id"])
+
     def test_list_unauthenticated(self):
         res = self.client.get(URL_USERS)
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(AUTH_USER_CACHE_TIMEOUT=300, AUTH_USER_LOCAL_CACHE_TIMEOUT=60)
+class CachedAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear_local()
+        self.addCleanup(user_cache.clear_local)
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="c@example.com", username="cached", password="pass1234")
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def sample(self, result):
+        return REGISTRY.get_sample_value("auth_user_cache_requests_total", {"result": result}) or 0
+
+    def assertNoUserQueries(self, queries):
+        # /me still reads the user's counters; only the users table must be skipped.
+        self.assertEqual([q["sql"] for q in queries.captured_queries if '"users"' in q["sql"]], [])
+
+    def test_repeat_requests_skip_user_query(self):
+        self.client.get(URL_ME)
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(URL_ME)
+        self.assertNoUserQueries(queries)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["user"]["username"], "cached")
+
+    def test_falls_back_to_redis_after_local_expiry(self):
+        self.client.get(URL_ME)
+        user_cache.clear_local()
+        redis_before = self.sample("redis")
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(URL_ME)
+        self.assertNoUserQueries(queries)
+        self.assertEqual(self.sample("redis") - redis_before, 1)
+
+    def test_save_invalidates(self):
+        self.client.get(URL_ME)
+        self.user.full_name = "Renamed"
+        self.user.save()
+        res = self.client.get(URL_ME)
+        self.assertEqual(res.json()["user"]["full_name"], "Renamed")
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(URL_ME)
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(URL_ME)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        self.client.get(URL_ME)
+        self.user.delete()
+        res = self.client.get(URL_ME)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cache_errors_fall_back_to_database(self):
+        with mock.patch.object(user_cache.cache, "get", side_effect=ConnectionError):
+            res = self.client.get(URL_ME)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_password_hash_is_not_cached(self):
+        self.client.get(URL_ME)
+        row = cache.get(user_cache._key(self.user.pk))
+        self.assertNotIn("password", row)
+        self.assertNotIn(self.user.password, row.values())
+
+    def test_saving_a_cached_user_keeps_uncached_columns(self):
+        user = user_cache.get_user(self.user.pk)
+        user.full_name = "Saved"
+        user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.full_name, "Saved")
+        self.assertTrue(self.user.check_password("pass1234"))
+
+    @mock.patch.object(authentication.api_settings, "CHECK_REVOKE_TOKEN", True)
+    def test_password_change_revokes_tokens(self):
+        token = RefreshToken.for_user(self.user).access_token
+        token["hash_password"] = get_md5_hash_password(self.user.password)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual(self.client.get(URL_ME).status_code, status.HTTP_200_OK)
+        self.user.set_password("changed123")
+        self.user.save()
+        self.assertEqual(self.client.get(URL_ME).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_user_is_a_fresh_instance(self):
+        first = user_cache.get_user(self.user.pk)
+        first.full_name = "Changed in memory"
+        self.assertEqual(user_cache.get_user(self.user.pk).full_name, "")
@@ -0,0 +1,118 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.counters import services as counters
+from apps.counters.models import CounterShard
+from apps.likes.models import Like
+from apps.matches.models import Match
+from apps.projects.models import Project
+
+User = get_user_model()
+
+
+def make_user(email, username):
+    return User.objects.create_user(email=email, username=username, password="pass1234")
+
+
+def count(kind, object_id):
+    return counters.counts([kind], [object_id]).get((kind, object_id), 0)
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.alice = make_user("a@example.com", "alice")
+        self.bob = make_user("b@example.com", "bob")
+        self.carol = make_user("c@example.com", "carol")
+        self.project = Project.objects.create(title="Counted", description="d", owner=self.alice)
+
+    def post_as(self, user, url, data=None):
+        self.client.force_authenticate(user=user)
+        return self.client.post(url, data, format="json")
+
+    def test_user_like_increments(self):
+        self.post_as(self.bob, f"/api/v1/likes/user/{self.alice.id}")
+        self.post_as(self.carol, f"/api/v1/likes/user/{self.alice.id}")
+        self.post_as(self.carol, f"/api/v1/likes/user/{self.alice.id}")
+        self.assertEqual(count(counters.USER_LIKES, self.alice.id), 2)
+        self.assertEqual(count(counters.USER_MATCHES, self.alice.id), 0)
+
+    def test_mutual_like_counts_a_match_for_both(self):
+        self.post_as(self.alice, f"/api/v1/likes/user/{self.bob.id}")
+        self.post_as(self.bob, f"/api/v1/likes/user/{self.alice.id}")
+        self.assertEqual(count(counters.USER_MATCHES, self.alice.id), 1)
+        self.assertEqual(count(counters.USER_MATCHES, self.bob.id), 1)
+
+    def test_project_like_increments_once(self):
+        self.post_as(self.bob, f"/api/v1/likes/project/{self.project.id}")
+        self.post_as(self.bob, f"/api/v1/likes/project/{self.project.id}")
+        self.post_as(self.carol, "/api/v1/likes/batch", {"projects": [self.project.id]})
+        self.assertEqual(count(counters.PROJECT_LIKES, self.project.id), 2)
+
+    @override_settings(COUNTER_SHARDS=4)
+    def test_increments_spread_over_shards(self):
+        for _ in range(40):
+            counters.add({(counters.PROJECT_LIKES, self.project.id): 1})
+        shards = CounterShard.objects.filter(kind=counters.PROJECT_LIKES, object_id=self.project.id)
+        self.assertGreater(shards.count(), 1)
+        self.assertEqual(count(counters.PROJECT_LIKES, self.project.id), 40)
+
+    def test_deleting_a_like_decrements(self):
+        self.post_as(self.bob, f"/api/v1/likes/project/{self.project.id}")
+        Like.objects.get(user=self.bob, project=self.project).delete()
+        self.assertEqual(count(counters.PROJECT_LIKES, self.project.id), 0)
+
+    def test_deleting_a_user_cascades(self):
+        self.post_as(self.bob, f"/api/v1/likes/user/{self.alice.id}")
+        self.post_as(self.alice, f"/api/v1/likes/user/{self.bob.id}")
+        self.post_as(self.bob, f"/api/v1/likes/project/{self.project.id}")
+        self.bob.delete()
+        self.assertEqual(count(counters.USER_LIKES, self.alice.id), 0)
+        self.assertEqual(count(counters.USER_MATCHES, self.alice.id), 0)
+        self.assertEqual(count(counters.PROJECT_LIKES, self.project.id), 0)
+        self.assertFalse(CounterShard.objects.filter(object_id=self.bob.id, kind=counters.USER_LIKES).exists())
+
+    def test_status_changes_adjust_matches(self):
+        match = Match.objects.create(user=self.alice, liked_user=self.bob, status=Match.STATUS_PENDING)
+        self.client.force_authenticate(user=self.alice)
+        url = f"/api/v1/matches/{match.id}/status"
+        self.client.put(url, {"status": "accepted"}, format="json")
+        self.client.put(url, {"status": "accepted"}, format="json")
+        self.assertEqual(count(counters.USER_MATCHES, self.alice.id), 1)
+        self.client.put(url, {"status": "rejected"}, format="json")
+        self.assertEqual(count(counters.USER_MATCHES, self.alice.id), 0)
+
+    def test_counts_are_exposed(self):
+        self.post_as(self.bob, f"/api/v1/likes/user/{self.alice.id}")
+        self.post_as(self.bob, f"/api/v1/likes/project/{self.project.id}")
+        self.client.force_authenticate(user=self.alice)
+        me = self.client.get("/api/v1/auth/me").json()["user"]
+        self.assertEqual((me["likes_count"], me["matches_count"]), (1, 0))
+        users = {u["id"]: u for u in self.client.get("/api/v1/users/").json()}
+        self.assertEqual(users[self.alice.id]["likes_count"], 1)
+        self.assertEqual(users[self.carol.id]["likes_count"], 0)
+        self.assertEqual(self.client.get("/api/v1/projects/").json()[0]["likes_count"], 1)
+        self.assertEqual(self.client.get(f"/api/v1/projects/{self.project.id}").json()["likes_count"], 1)
+
+    def test_rebuild_restores_exact_counts(self):
+        Like.objects.create(user=self.bob, liked_user=self.alice)
+        Like.objects.create(user=self.carol, liked_user=self.alice)
+        Like.objects.create(user=self.bob, project=self.project)
+        Match.objects.create(user=self.alice, liked_user=self.bob, status=Match.STATUS_ACCEPTED)
+        Match.objects.create(user=self.alice, liked_user=self.carol, status=Match.STATUS_PENDING)
+        counters.add({(counters.USER_LIKES, self.carol.id): 5})
+
+        out = StringIO()
+        call_command("rebuild_counters", stdout=out)
+
+        self.assertIn("Counters rebuilt", out.getvalue())
+        self.assertEqual(count(counters.USER_LIKES, self.alice.id), 2)
+        self.assertEqual(count(counters.USER_LIKES, self.carol.id), 0)
+        self.assertEqual(count(counters.PROJECT_LIKES, self.project.id), 1)
+        self.assertEqual(count(counters.USER_MATCHES, self.alice.id), 1)
@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Exists, F, OuterRef
+from django.test import TestCase
+
+from apps.counters import services as counters
+from apps.likes.models import Like
+from apps.matches.models import Match
+from apps.projects.models import Project
+from apps.users.models import User
+
+
+def generate(**options):
+    call_command(
+        "generate_dataset", users=200, likes_per_user=5, project_likes_per_user=2, stdout=StringIO(), **options
+    )
+
+
+def snapshot():
+    first = User.objects.order_by("id").values_list("id", flat=True).first()
+    likes = Like.objects.order_by("id").values_list("user_id", "liked_user_id", "project_id", "is_mutual", "created_at")
+    return [
+        (u - first, (liked or first) - first, project, mutual, created) for u, liked, project, mutual, created in likes
+    ]
+
+
+class GenerateDatasetTests(TestCase):
+    def test_generates_consistent_rows(self):
+        generate()
+        self.assertEqual(User.objects.count(), 200)
+        self.assertEqual(Project.objects.count(), 40)
+        self.assertFalse(Like.objects.filter(user=F("liked_user")).exists())
+        mutual = Like.objects.filter(is_mutual=True)
+        self.assertTrue(mutual.exists())
+        self.assertEqual(Match.objects.filter(status=Match.STATUS_ACCEPTED).count(), mutual.count())
+        returned = Like.objects.filter(user=OuterRef("liked_user"), liked_user=OuterRef("user"))
+        self.assertEqual(Like.objects.filter(Exists(returned)).count(), mutual.count())
+        self.assertTrue(Match.objects.filter(status=Match.STATUS_PENDING).exists())
+
+    def test_chunks_do_not_change_the_data(self):
+        generate(batch_size=7)
+        first = snapshot()
+        User.objects.all().delete()
+        generate(batch_size=10_000)
+        self.assertEqual(snapshot(), first)
+
+    def test_users_can_log_in(self):
+        generate(password="secret-pass")
+        self.assertTrue(User.objects.order_by("id").first().check_password("secret-pass"))
+
+    def test_counters_match_rows(self):
+        generate()
+        liked = Like.objects.filter(liked_user__isnull=False).values_list("liked_user_id", flat=True).first()
+        total = counters.counts([counters.USER_LIKES], [liked])[(counters.USER_LIKES, liked)]
+        self.assertEqual(total, Like.objects.filter(liked_user=liked).count())
+
+    def test_same_seed_same_data(self):
+        generate(seed=7)
+        first = snapshot()
+        User.objects.all().delete()
+        generate(seed=7)
+        self.assertEqual(snapshot(), first)
+        User.objects.all().delete()
+        generate(seed=8)
+        self.assertNotEqual(snapshot(), first)
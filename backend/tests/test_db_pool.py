@@ -0,0 +1,223 @@
+import gc
+import threading
+from unittest import mock
+
+import psycopg2
+from django.db import OperationalError, transaction
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+from prometheus_client import REGISTRY
+
+from config.db import pool as pools
+from config.db.backends.postgresql.base import DatabaseWrapper
+from config.db.pool import ConnectionPool, PoolExhausted
+
+
+class FakeConnection:
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.closed = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        if not self.healthy:
+            raise OSError("server closed the connection unexpectedly")
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.opened = []
+
+    def connect(self):
+        conn = FakeConnection()
+        self.opened.append(conn)
+        return conn
+
+    def test_reuses_released_connection(self):
+        pool = ConnectionPool("test", max_size=2)
+        conn = pool.acquire(self.connect)
+        pool.release(conn)
+        self.assertIs(pool.acquire(self.connect), conn)
+        self.assertEqual(len(self.opened), 1)
+
+    def test_release_rolls_back(self):
+        pool = ConnectionPool("test")
+        conn = pool.acquire(self.connect)
+        pool.release(conn)
+        self.assertEqual(conn.rollbacks, 1)
+
+    def test_exhausted_pool_times_out(self):
+        pool = ConnectionPool("exhausted", max_size=1, timeout=0.05)
+        before = sample("db_pool_exhausted_total", alias="exhausted")
+        pool.acquire(self.connect)
+        with self.assertRaises(PoolExhausted):
+            pool.acquire(self.connect)
+        self.assertEqual(sample("db_pool_exhausted_total", alias="exhausted") - before, 1)
+
+    def test_waiter_gets_released_connection(self):
+        pool = ConnectionPool("waiting", max_size=1, timeout=5)
+        conn = pool.acquire(self.connect)
+        timer = threading.Timer(0.05, pool.release, [conn])
+        timer.start()
+        self.assertIs(pool.acquire(self.connect), conn)
+        timer.join()
+        self.assertGreater(sample("db_pool_wait_seconds_sum", alias="waiting"), 0.04)
+
+    def test_unhealthy_idle_connection_is_replaced(self):
+        pool = ConnectionPool("test", check_interval=0)
+        conn = pool.acquire(self.connect)
+        pool.release(conn)
+        conn.healthy = False
+        fresh = pool.acquire(self.connect)
+        self.assertIsNot(fresh, conn)
+        self.assertTrue(conn.closed)
+
+    def test_recently_used_connection_skips_health_check(self):
+        pool = ConnectionPool("test", check_interval=60)
+        conn = pool.acquire(self.connect)
+        pool.release(conn)
+        conn.healthy = False
+        self.assertIs(pool.acquire(self.connect), conn)
+
+    def test_expired_connection_is_closed(self):
+        pool = ConnectionPool("test", max_lifetime=0)
+        conn = pool.acquire(self.connect)
+        pool.release(conn)
+        self.assertTrue(conn.closed)
+        self.assertIsNot(pool.acquire(self.connect), conn)
+
+    def test_broken_connection_frees_its_slot(self):
+        pool = ConnectionPool("test", max_size=1, timeout=0.05)
+        conn = pool.acquire(self.connect)
+        pool.release(conn, discard=True)
+        self.assertTrue(conn.closed)
+        self.assertIsNot(pool.acquire(self.connect), conn)
+
+    def test_failed_connect_frees_its_slot(self):
+        pool = ConnectionPool("test", max_size=1, timeout=0.05)
+
+        def refuse():
+            raise OSError("connection refused")
+
+        with self.assertRaises(OSError):
+            pool.acquire(refuse)
+        pool.acquire(self.connect)
+
+    def test_lost_connection_frees_its_slot(self):
+        pool = ConnectionPool("test", max_size=1, timeout=0.05)
+        pool.acquire(self.connect)
+        self.opened.clear()
+        gc.collect()
+        pool.acquire(self.connect)
+
+    def test_gauges(self):
+        pool = ConnectionPool("gauges", max_size=3)
+        first = pool.acquire(self.connect)
+        pool.acquire(self.connect)
+        pool.release(first)
+        self.assertEqual(sample("db_pool_connections", alias="gauges", state="idle"), 1)
+        self.assertEqual(sample("db_pool_connections", alias="gauges", state="in_use"), 1)
+
+
+def psycopg2_connection():
+    conn = mock.MagicMock(closed=0, autocommit=True)
+    conn.info.server_version = 150000
+    conn.info.parameter_status.return_value = "UTC"
+    return conn
+
+
+def break_connection(conn):
+    cursor = conn.cursor.return_value
+    cursor.__enter__.return_value = cursor
+    cursor.execute.side_effect = psycopg2.OperationalError("server closed the connection unexpectedly")
+
+
+class DatabaseWrapperTests(SimpleTestCase):
+    """The pooled backend driven through Django's own connect/close calls, with psycopg2.connect patched."""
+
+    alias = "pooled"
+
+    def setUp(self):
+        patches = [
+            mock.patch("psycopg2.connect", side_effect=lambda **params: psycopg2_connection()),
+            mock.patch("psycopg2.extras.register_default_jsonb"),
+            # A fresh pool for the alias in every test.
+            mock.patch.dict(pools._pools),
+        ]
+        self.connect = patches[0].start()
+        for patcher in patches[1:]:
+            patcher.start()
+        for patcher in patches:
+            self.addCleanup(patcher.stop)
+
+    def wrapper(self, **pool):
+        config = {"ENGINE": "config.db.backends.postgresql", "NAME": "app", "CONN_MAX_AGE": 0, "POOL": pool}
+        settings_dict = ConnectionHandler({"default": config}).settings["default"]
+        return DatabaseWrapper(settings_dict, alias=self.alias)
+
+    def test_request_cycle_returns_the_connection_to_the_pool(self):
+        wrapper = self.wrapper()
+        wrapper.ensure_connection()
+        conn = wrapper.connection
+        # What close_old_connections() does when a request finishes.
+        wrapper.close_if_unusable_or_obsolete()
+        self.assertIsNone(wrapper.connection)
+        conn.rollback.assert_called_once_with()
+        conn.close.assert_not_called()
+
+        other = self.wrapper()
+        other.ensure_connection()
+        self.assertIs(other.connection, conn)
+        self.assertEqual(self.connect.call_count, 1)
+
+    def test_close_inside_atomic_block_closes_the_connection(self):
+        wrapper = self.wrapper()
+        with mock.patch.object(transaction, "get_connection", return_value=wrapper):
+            with transaction.atomic(using=self.alias):
+                conn = wrapper.connection
+                wrapper.close()
+                # Still referenced by the block, so it must not go back to the pool.
+                self.assertIs(wrapper.connection, conn)
+                conn.close.assert_called_once_with()
+                other = self.wrapper()
+                other.ensure_connection()
+                self.assertIsNot(other.connection, conn)
+        self.assertIsNone(wrapper.connection)
+        self.assertEqual(self.connect.call_count, 2)
+
+    def test_broken_connection_is_discarded(self):
+        before = sample("db_pool_connections_closed_total", alias=self.alias, reason="broken")
+        wrapper = self.wrapper()
+        wrapper.ensure_connection()
+        conn = wrapper.connection
+        break_connection(conn)
+        with self.assertRaises(OperationalError):
+            wrapper.cursor().execute("SELECT 1")
+        self.assertTrue(wrapper.errors_occurred)
+        wrapper.close_if_unusable_or_obsolete()
+        self.assertIsNone(wrapper.connection)
+        conn.close.assert_called_once_with()
+        conn.rollback.assert_not_called()
+        self.assertEqual(sample("db_pool_connections_closed_total", alias=self.alias, reason="broken") - before, 1)
+
+        wrapper.ensure_connection()
+        self.assertIsNot(wrapper.connection, conn)
+        self.assertEqual(self.connect.call_count, 2)
+
+    def test_exhausted_pool_raises_operational_error(self):
+        self.wrapper(MAX_SIZE=1, TIMEOUT=0.05).ensure_connection()
+        with self.assertRaisesMessage(OperationalError, "No database connection available for 'pooled'"):
+            self.wrapper(MAX_SIZE=1, TIMEOUT=0.05).ensure_connection()
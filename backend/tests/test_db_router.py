@@ -0,0 +1,129 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connections
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.functional import SimpleLazyObject
+from rest_framework.test import APIClient
+
+from apps.projects.models import Project
+from config.db import router as db_router
+from config.db.router import ReplicaRouter, ReplicaRoutingMiddleware
+
+User = get_user_model()
+
+
+class _FakeUser:
+    is_authenticated = True
+
+    def __init__(self, pk):
+        self.pk = pk
+
+
+@override_settings(REPLICA_DATABASES=["replica"], REPLICA_LAG_CHECK_INTERVAL=60)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        db_router.monitor.reset()
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        patcher = mock.patch.object(db_router, "measure_lag", return_value=0.0)
+        self.measure_lag = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def route(self, request, before_read=None):
+        seen = []
+
+        def view(request):
+            if before_read:
+                before_read(request)
+            seen.append(self.router.db_for_read(Project))
+            seen.append(self.router.db_for_read(Project))
+            return None
+
+        ReplicaRoutingMiddleware(view)(request)
+        return seen
+
+    def anonymous(self, request):
+        request.user = AnonymousUser()
+
+    def test_get_reads_from_replica(self):
+        self.assertEqual(self.route(self.factory.get("/"), self.anonymous), ["replica", "replica"])
+
+    def test_outside_a_request_uses_default(self):
+        self.assertIsNone(self.router.db_for_read(Project))
+
+    def test_write_request_reads_from_primary(self):
+        self.assertEqual(self.route(self.factory.post("/"), self.anonymous), [None, None])
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_no_replicas_configured(self):
+        self.assertEqual(self.route(self.factory.get("/"), self.anonymous), [None, None])
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        self.measure_lag.return_value = 30.0
+        self.assertEqual(self.route(self.factory.get("/"), self.anonymous), ["default", "default"])
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        self.measure_lag.side_effect = OSError("connection refused")
+        self.assertEqual(self.route(self.factory.get("/"), self.anonymous), ["default", "default"])
+
+    def test_lag_is_checked_once_per_interval(self):
+        for _ in range(3):
+            self.route(self.factory.get("/"), self.anonymous)
+        self.assertEqual(self.measure_lag.call_count, 1)
+
+    def test_write_during_request_switches_to_primary(self):
+        def write_first(request):
+            self.anonymous(request)
+            self.router.db_for_write(Project)
+
+        self.assertEqual(self.route(self.factory.get("/"), write_first), ["default", "default"])
+
+    def test_user_is_pinned_after_writing(self):
+        def authenticate(request):
+            request.user = _FakeUser(7)
+
+        self.route(self.factory.post("/"), authenticate)
+        self.assertEqual(self.route(self.factory.get("/"), authenticate), ["default", "default"])
+        self.assertEqual(self.route(self.factory.get("/"), self.anonymous), ["replica", "replica"])
+
+    def test_lazy_session_user_is_not_evaluated(self):
+        def lazy_user(request):
+            request.user = SimpleLazyObject(mock.Mock(side_effect=AssertionError("evaluated")))
+
+        self.assertEqual(self.route(self.factory.get("/"), lazy_user), ["replica", "replica"])
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica", "projects"))
+        self.assertIsNone(self.router.allow_migrate("default", "projects"))
+
+
+@override_settings(REPLICA_DATABASES=["replica"])
+class ReplicaRoutingIntegrationTests(TransactionTestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+        db_router.monitor.reset()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="r@example.com", username="reader", password="pass1234")
+        self.other = User.objects.create_user(email="o@example.com", username="other", password="pass1234")
+        Project.objects.create(title="Replicated", description="d", owner=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def test_project_list_reads_from_replica(self):
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            res = self.client.get("/api/v1/projects/")
+        self.assertEqual(res.json()[0]["title"], "Replicated")
+        self.assertTrue(any("projects" in q["sql"] for q in replica.captured_queries))
+
+    def test_reads_after_a_like_go_to_primary(self):
+        self.client.post(f"/api/v1/likes/user/{self.other.pk}")
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            res = self.client.get("/api/v1/likes/user/likes")
+        self.assertEqual(len(res.json()), 1)
+        self.assertEqual(replica.captured_queries, [])
@@ -0,0 +1,242 @@
+import asyncio
+import json
+from collections import defaultdict
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase, override_settings
+from redis.exceptions import ResponseError
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.events import hub, services
+from apps.likes.services import like_projects, like_user
+from apps.matches.models import Match
+from apps.outbox.models import OutboxEvent
+from apps.projects.models import Project
+
+User = get_user_model()
+
+
+class FakeRedis:
+    """In-memory stand-in for the stream and pub/sub commands of the event fan-out."""
+
+    def __init__(self):
+        self.streams = defaultdict(list)
+        self.published = []
+        self.channels = set()
+        self.messages = None
+
+    def xadd(self, name, fields, id="*", maxlen=None, approximate=True):
+        entries = self.streams[name]
+        top = services.parse_id(entries[-1][0]) if entries else (0, 0)
+        if id == "*":
+            id = f"{top[0] + 1000}-0"
+        elif services.parse_id(id) <= top:
+            raise ResponseError("The ID specified in XADD is equal or smaller than the target stream top item")
+        entries.append((id, dict(fields)))
+        return id.encode()
+
+    def xrange(self, name, min="-", max="+", count=None):
+        def after_min(entry_id):
+            if min == "-":
+                return True
+            if min.startswith("("):
+                return services.parse_id(entry_id) > services.parse_id(min[1:])
+            return services.parse_id(entry_id) >= services.parse_id(min)
+
+        def before_max(entry_id):
+            return max == "+" or services.parse_id(entry_id) <= services.parse_id(max)
+
+        entries = [entry for entry in self.streams.get(name, []) if after_min(entry[0]) and before_max(entry[0])]
+        return entries[:count] if count else entries
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        pass
+
+    def expire(self, name, seconds):
+        pass
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+        if channel in self.channels:
+            self.messages.put_nowait({"channel": channel, "data": message})
+
+
+class FakeAsyncRedis:
+    def __init__(self, redis):
+        self.sync = redis
+        if redis.messages is None:
+            redis.messages = asyncio.Queue()
+
+    async def xrange(self, name, min="-", max="+", count=None):
+        return self.sync.xrange(name, min, max, count)
+
+    def pubsub(self):
+        return self
+
+    async def subscribe(self, channel):
+        self.sync.channels.add(channel)
+
+    async def unsubscribe(self, channel):
+        self.sync.channels.discard(channel)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=None):
+        try:
+            return await asyncio.wait_for(self.sync.messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+def stored(redis, user):
+    return [(fields["event"], json.loads(fields["data"])) for _, fields in redis.streams[services.user_stream(user.id)]]
+
+
+class FanOutTests(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.user_a = User.objects.create_user(email="a@example.com", username="userA", password="pass1234")
+        self.user_b = User.objects.create_user(email="b@example.com", username="userB", password="pass1234")
+
+    def fan_out(self):
+        for n, event in enumerate(OutboxEvent.objects.order_by("id"), start=1):
+            services.fan_out(self.redis, {"topic": event.topic, "payload": event.payload, "stream_id": f"{n}-0"})
+        OutboxEvent.objects.all().delete()
+
+    def test_like_reaches_the_liked_user(self):
+        like_user(self.user_a.id, self.user_b.id)
+        self.fan_out()
+        [(name, data)] = stored(self.redis, self.user_b)
+        self.assertEqual(name, "like")
+        self.assertEqual(data["user"]["username"], "userA")
+        self.assertNotIn("email", data["user"])
+        self.assertFalse(data["mutual"])
+        self.assertEqual(stored(self.redis, self.user_a), [])
+        self.assertEqual(self.redis.published[0][0], services.channel(self.user_b.id))
+
+    def test_project_like_reaches_the_owner(self):
+        project = Project.objects.create(title="P", description="d", owner=self.user_b)
+        like_projects(self.user_a.id, [project.id])
+        self.fan_out()
+        [(name, data)] = stored(self.redis, self.user_b)
+        self.assertEqual((name, data["project_id"]), ("like", project.id))
+
+    def test_mutual_like_sends_each_user_their_match(self):
+        like_user(self.user_a.id, self.user_b.id)
+        like_user(self.user_b.id, self.user_a.id)
+        self.fan_out()
+        self.assertEqual([name for name, _ in stored(self.redis, self.user_a)], ["like", "match"])
+        self.assertEqual([name for name, _ in stored(self.redis, self.user_b)], ["like", "match"])
+        match = stored(self.redis, self.user_a)[1][1]
+        self.assertEqual(match["user"]["id"], self.user_b.id)
+        self.assertEqual(match["status"], Match.STATUS_ACCEPTED)
+
+    def test_status_change_reaches_both_sides(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user_a)
+        match_id = client.post(f"/api/v1/matches/{self.user_b.id}").json()["id"]
+        client.put(f"/api/v1/matches/{match_id}/status", {"status": Match.STATUS_REJECTED}, format="json")
+        self.fan_out()
+        self.assertEqual([name for name, _ in stored(self.redis, self.user_a)], ["match", "match"])
+        self.assertEqual(stored(self.redis, self.user_a)[1][1]["status"], Match.STATUS_REJECTED)
+        [(name, data)] = stored(self.redis, self.user_b)
+        self.assertEqual(name, "match_status")
+        self.assertEqual(
+            (data["match_id"], data["user"]["id"], data["status"], data["previous_status"]),
+            (match_id, self.user_a.id, Match.STATUS_REJECTED, Match.STATUS_PENDING),
+        )
+
+    def test_redelivered_event_is_skipped(self):
+        self.assertEqual(services.deliver(self.redis, 1, "5-0", "like", {}), "5-0")
+        self.assertIsNone(services.deliver(self.redis, 1, "5-0", "like", {}))
+        self.assertEqual(len(self.redis.published), 1)
+
+    def test_event_retried_after_a_later_one_gets_a_new_id(self):
+        services.deliver(self.redis, 1, "5-0", "like", {})
+        self.assertEqual(services.deliver(self.redis, 1, "4-0", "match", {}), "1005-0")
+
+
+def frames(text):
+    parsed = []
+    for block in text.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":") and ": " in line)
+        if "event" in fields:
+            parsed.append((fields.get("id"), fields["event"], json.loads(fields["data"])))
+    return parsed
+
+
+@override_settings(EVENTS_HEARTBEAT=0.05, EVENTS_MAX_AGE=0.3)
+class EventStreamTests(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.user = User.objects.create_user(email="a@example.com", username="userA", password="pass1234")
+        self.client = AsyncClient()
+        self.auth = {"Authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+        # A fresh hub, bound to the fake on the test's event loop.
+        self.hub = hub.Hub()
+        patches = [
+            mock.patch.object(hub, "hub", self.hub),
+            mock.patch.object(hub, "redis_client", lambda: FakeAsyncRedis(self.redis)),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def read(self, **headers):
+        response = await self.client.get("/api/v1/events", headers={**self.auth, **headers})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        return "".join([chunk.decode() async for chunk in response.streaming_content])
+
+    async def publish_when_subscribed(self, *events):
+        while services.channel(self.user.id) not in self.redis.channels:
+            await asyncio.sleep(0.01)
+        for entry_id, name in events:
+            services.deliver(self.redis, self.user.id, entry_id, name, {"n": entry_id})
+
+    async def test_live_events_are_pushed(self):
+        publisher = asyncio.ensure_future(self.publish_when_subscribed(("1-0", "like"), ("2-0", "match")))
+        text = await self.read()
+        await publisher
+        self.assertTrue(text.startswith("retry: "))
+        self.assertIn(": ping", text)
+        self.assertEqual(frames(text), [("1-0", "like", {"n": "1-0"}), ("2-0", "match", {"n": "2-0"})])
+        self.assertEqual(self.redis.channels, set())
+
+    async def test_resume_replays_missed_events_once(self):
+        for n in (1, 2, 3):
+            services.deliver(self.redis, self.user.id, f"{n}-0", "like", {"n": n})
+        # Announced again, as if published while the backlog was read; it must not be sent twice.
+        self.redis.channels.add(services.channel(self.user.id))
+        self.redis.messages = asyncio.Queue()
+        self.redis.publish(services.channel(self.user.id), json.dumps({"id": "3-0", "event": "like", "data": "{}"}))
+        text = await self.read(**{"Last-Event-ID": "1-0"})
+        self.assertEqual([(entry_id, name) for entry_id, name, _ in frames(text)], [("2-0", "like"), ("3-0", "like")])
+
+    async def test_resume_from_a_trimmed_event_asks_for_a_reload(self):
+        services.deliver(self.redis, self.user.id, "5-0", "like", {"n": 5})
+        text = await self.read(**{"Last-Event-ID": "2-0"})
+        self.assertEqual([(entry_id, name) for entry_id, name, _ in frames(text)], [(None, "reset"), ("5-0", "like")])
+
+    async def test_requires_authentication(self):
+        response = await self.client.get("/api/v1/events")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_not_served_by_wsgi_workers(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        self.assertEqual(client.get("/api/v1/events").status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class SubscriptionTests(TestCase):
+    @override_settings(EVENTS_QUEUE_SIZE=1)
+    def test_slow_client_is_dropped(self):
+        subscription = hub.Subscription(1)
+        subscription.push("a")
+        self.assertFalse(subscription.overflowed)
+        subscription.push("b")
+        self.assertTrue(subscription.overflowed)
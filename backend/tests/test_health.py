@@ -1,8 +1,23 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from config import health, warmup
+
+User = get_user_model()
+
+
+def _fail():
+    raise ConnectionRefusedError("refused")
+
 
+@mock.patch.dict(health.CHECKS, {"log_sink": (lambda: None, False)})
+@mock.patch.object(health.monitor, "_snapshot", None)
 class HealthViewTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -32,6 +47,109 @@ class HealthViewTests(TestCase):
         res = self.client.get("/health")
         self.assertNotEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_health_reports_each_dependency_with_latency(self):
+        checks = self.client.get("/health").json()["checks"]
+        self.assertEqual(set(checks), {"database", "cache", "log_sink"})
+        for check in checks.values():
+            self.assertEqual(check["status"], "up")
+            self.assertGreaterEqual(check["latency_ms"], 0)
+
+    def test_health_serves_the_snapshot_without_probing(self):
+        first = self.client.get("/health").json()
+        with mock.patch.object(health, "probe") as probe, self.assertNumQueries(0):
+            res = self.client.get("/health")
+        probe.assert_not_called()
+        self.assertEqual(res.json(), first)
+
+    def test_stale_snapshot_is_served_unhealthy_without_probing(self):
+        self.client.get("/health")
+        health.monitor._snapshot = dict(health.monitor._snapshot, checked_at=0)
+        with self.settings(HEALTH_CHECK_INTERVAL=5), mock.patch.object(health.monitor, "start"):
+            with mock.patch.object(health, "probe") as probe, self.assertLogs("config.health", "WARNING"):
+                res = self.client.get("/health")
+        probe.assert_not_called()
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual((res.json()["status"], res.json()["stale"], res.json()["checked_at"]), ("unhealthy", True, 0))
+
+    def deep(self, token="probe-token"):
+        with self.settings(HEALTH_TOKEN="probe-token"):
+            return self.client.get("/health/deep", HTTP_X_HEALTH_TOKEN=token)
+
+    def test_deep_health_probes_now(self):
+        self.client.get("/health")
+        with mock.patch.dict(health.CHECKS, {"cache": (_fail, False)}):
+            with self.assertLogs("config.health", "WARNING") as logs:
+                res = self.deep()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        body = res.json()
+        self.assertEqual(body["status"], "degraded")
+        self.assertEqual(body["checks"]["cache"]["status"], "down")
+        # The reason is logged, not returned.
+        self.assertNotIn("error", body["checks"]["cache"])
+        self.assertNotIn("refused", res.content.decode())
+        self.assertIn("ConnectionRefusedError", "\n".join(logs.output))
+        # The deep check also refreshes what /health serves.
+        self.assertEqual(self.client.get("/health").json()["status"], "degraded")
+
+    def test_deep_health_requires_token_or_staff(self):
+        self.assertEqual(self.client.get("/health/deep").status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.deep(token="guess").status_code, status.HTTP_401_UNAUTHORIZED)
+        user = User.objects.create_user(email="u@example.com", username="user", password="pass1234")
+        self.client.force_authenticate(user=user)
+        self.assertEqual(self.client.get("/health/deep").status_code, status.HTTP_403_FORBIDDEN)
+        user.is_staff = True
+        self.assertEqual(self.client.get("/health/deep").status_code, status.HTTP_200_OK)
+
+    def test_database_down_is_unhealthy(self):
+        with mock.patch.dict(health.CHECKS, {"database": (_fail, True)}), self.assertLogs("config.health", "WARNING"):
+            res = self.deep()
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res.json()["status"], "unhealthy")
+        self.assertEqual(res.json()["database"], "disconnected")
+
+
+class HealthMonitorTests(TestCase):
+    def test_prober_thread_refreshes_the_snapshot(self):
+        monitor = health.HealthMonitor()
+        with (
+            self.settings(HEALTH_CHECK_INTERVAL=60),
+            mock.patch.object(health, "probe", return_value={"status": "healthy", "checked_at": 1e12}) as probe,
+            mock.patch.object(health.connections, "close_all"),
+        ):
+            monitor.start()
+            monitor._thread.join(0.1)
+            monitor.stop()
+            monitor._thread.join(1)
+        probe.assert_called()
+        self.assertEqual(monitor._snapshot["status"], "healthy")
+
+
+class ProbeTimeoutTests(TestCase):
+    def test_first_request_waits_for_the_first_probe_only_briefly(self):
+        monitor = health.HealthMonitor()
+        with (
+            self.settings(HEALTH_CHECK_INTERVAL=60, HEALTH_CHECK_TIMEOUT=0.01),
+            mock.patch.object(monitor, "start"),
+            mock.patch.object(health, "probe") as probe,
+            self.assertLogs("config.health", "WARNING"),
+        ):
+            snapshot = monitor.snapshot()
+        probe.assert_not_called()
+        self.assertEqual((snapshot["status"], snapshot["stale"]), ("unhealthy", True))
+
+    def test_redis_probe_uses_socket_timeouts(self):
+        config = {"BACKEND": "django_redis.cache.RedisCache", "LOCATION": "redis://cache:6379/1"}
+        client = mock.Mock()
+        client.get.side_effect = lambda key: client.set.call_args.args[1].encode()
+        health._redis.cache_clear()
+        self.addCleanup(health._redis.cache_clear)
+        with (
+            self.settings(CACHES={"default": config}, HEALTH_CHECK_TIMEOUT=2),
+            mock.patch("redis.Redis.from_url", return_value=client) as from_url,
+        ):
+            health.check_cache()
+        from_url.assert_called_once_with("redis://cache:6379/1", socket_timeout=2, socket_connect_timeout=2)
+
 
 class RootViewTests(TestCase):
     def setUp(self):
@@ -54,3 +172,51 @@ class RootViewTests(TestCase):
     def test_root_no_auth_required(self):
         res = self.client.get("/")
         self.assertNotEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@mock.patch.object(warmup, "_ready", False)
+class ReadinessViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_live_returns_200_before_warmup(self):
+        with mock.patch.object(warmup, "connect", side_effect=RuntimeError("db down")):
+            res = self.client.get("/health/live")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {"status": "alive"})
+
+    def test_ready_warms_up_and_returns_200(self):
+        res = self.client.get("/health/ready")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {"status": "ready"})
+        self.assertTrue(warmup.is_ready())
+
+    def test_ready_returns_503_until_warmup_succeeds(self):
+        with mock.patch.object(warmup, "connect", side_effect=RuntimeError("db down")):
+            res = self.client.get("/health/ready")
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(warmup.is_ready())
+
+        res = self.client.get("/health/ready")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_ready_does_not_warm_up_twice(self):
+        self.client.get("/health/ready")
+        with mock.patch.object(warmup, "connect") as connect:
+            self.client.get("/health/ready")
+        connect.assert_not_called()
+
+    def test_missing_replica_does_not_block_readiness(self):
+        replica = mock.Mock(in_atomic_block=False)
+        replica.ensure_connection.side_effect = RuntimeError("replica down")
+        with mock.patch.dict("django.db.connections._connections.__dict__", {"replica": replica}):
+            with self.assertLogs("config.warmup", "WARNING"):
+                warmup.connect()
+        replica.close.assert_called_once_with()
+
+
+class MigrationTests(TestCase):
+    databases = "__all__"
+
+    def test_committed_migrations_match_models(self):
+        call_command("makemigrations", check=True, dry_run=True, stdout=StringIO())
@@ -0,0 +1,157 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+
+from apps.likes.models import Like
+from apps.matches.models import Match
+from apps.projects.models import Project
+from config import idempotency
+from config.idempotency import idempotent
+
+User = get_user_model()
+
+
+class FlakyView(APIView):
+    """Fails with a 503 the first time it runs."""
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    calls = 0
+
+    @idempotent
+    def post(self, request):
+        FlakyView.calls += 1
+        if FlakyView.calls == 1:
+            return Response({"detail": "unavailable"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response({"ok": True}, status=status.HTTP_201_CREATED)
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        FlakyView.calls = 0
+        self.client = APIClient()
+        self.user_a = User.objects.create_user(email="a@example.com", username="userA", password="pass1234")
+        self.user_b = User.objects.create_user(email="b@example.com", username="userB", password="pass1234")
+        self.client.force_authenticate(user=self.user_a)
+
+    def post(self, path, key="key-1", data=None):
+        return self.client.post(path, data, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retried_match_creation_is_replayed(self):
+        first = self.post(f"/api/v1/matches/{self.user_b.id}")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        with self.assertNumQueries(0):
+            retry = self.post(f"/api/v1/matches/{self.user_b.id}")
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Match.objects.count(), 1)
+
+    def test_requests_without_key_are_not_deduplicated(self):
+        self.client.post(f"/api/v1/matches/{self.user_b.id}")
+        again = self.client.post(f"/api/v1/matches/{self.user_b.id}")
+        # Run again: the match already exists, so it is returned with a 200.
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Idempotent-Replayed", again)
+
+    def test_new_key_runs_the_request_again(self):
+        self.post(f"/api/v1/matches/{self.user_b.id}", key="key-1")
+        again = self.post(f"/api/v1/matches/{self.user_b.id}", key="key-2")
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Idempotent-Replayed", again)
+
+    def test_like_user_and_project_are_replayed(self):
+        project = Project.objects.create(title="P", description="d", owner=self.user_b)
+        for path in (f"/api/v1/likes/user/{self.user_b.id}", f"/api/v1/likes/project/{project.id}"):
+            first = self.post(path)
+            with self.assertNumQueries(0):
+                retry = self.post(path)
+            self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Like.objects.filter(user=self.user_a).count(), 2)
+
+    def test_keys_are_scoped_per_user(self):
+        self.post(f"/api/v1/likes/user/{self.user_b.id}")
+        self.client.force_authenticate(user=self.user_b)
+        res = self.post(f"/api/v1/likes/user/{self.user_a.id}")
+        self.assertFalse(res.has_header("Idempotent-Replayed"))
+        self.assertTrue(Like.objects.filter(user=self.user_b, liked_user=self.user_a).exists())
+
+    def test_key_reused_for_different_body_is_rejected(self):
+        self.post(f"/api/v1/matches/{self.user_b.id}", data={"note": 1})
+        res = self.post(f"/api/v1/matches/{self.user_b.id}", data={"note": 2})
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Match.objects.count(), 1)
+
+    def test_invalid_key_is_rejected(self):
+        res = self.post(f"/api/v1/matches/{self.user_b.id}", key="x" * 256)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Match.objects.count(), 0)
+
+    def test_client_errors_are_replayed(self):
+        first = self.post("/api/v1/matches/999999")
+        self.assertEqual(first.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(first.has_header("Idempotent-Replayed"))
+        retry = self.post("/api/v1/matches/999999")
+        self.assertEqual(retry.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.json(), first.json())
+
+    def test_server_errors_are_not_stored(self):
+        view = FlakyView.as_view()
+        factory = APIRequestFactory()
+        responses = [view(factory.post("/flaky", {}, format="json", HTTP_IDEMPOTENCY_KEY="key-1")) for _ in range(2)]
+        self.assertEqual([res.status_code for res in responses], [503, 201])
+        # The lock was released and nothing stored, so the retry ran the handler again.
+        self.assertFalse(responses[1].has_header("Idempotent-Replayed"))
+        self.assertEqual(FlakyView.calls, 2)
+
+    @override_settings(IDEMPOTENCY_WAIT=0.1)
+    def test_concurrent_duplicate_gets_conflict(self):
+        path = f"/api/v1/matches/{self.user_b.id}"
+        with mock.patch.object(idempotency.cache, "add", return_value=False):
+            res = self.post(path)
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res["Retry-After"], "1")
+        self.assertEqual(Match.objects.count(), 0)
+
+    def test_concurrent_duplicate_waits_for_the_result(self):
+        path = f"/api/v1/matches/{self.user_b.id}"
+        first = self.post(path)
+        stored = cache.get(idempotency._cache_key(first.wsgi_request, "key-1"))
+        # The first lookup misses as if the original request were still running.
+        with (
+            mock.patch.object(idempotency.cache, "get", side_effect=[None, None, stored]),
+            mock.patch.object(idempotency.cache, "add", return_value=False),
+            mock.patch.object(idempotency.time, "sleep"),
+        ):
+            res = self.post(path)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res["Idempotent-Replayed"], "true")
+        self.assertEqual(Match.objects.count(), 1)
+
+    def test_cache_outage_while_waiting_runs_request(self):
+        path = f"/api/v1/matches/{self.user_b.id}"
+        with (
+            mock.patch.object(idempotency.cache, "get", side_effect=[None, ConnectionError("redis down")]),
+            mock.patch.object(idempotency.cache, "add", return_value=False),
+            mock.patch.object(idempotency.time, "sleep"),
+            self.assertLogs("config.idempotency", "WARNING"),
+        ):
+            res = self.post(path)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Match.objects.count(), 1)
+
+    def test_cache_outage_runs_request(self):
+        with mock.patch.object(idempotency.cache, "get", side_effect=ConnectionError("redis down")):
+            with self.assertLogs("config.idempotency", "WARNING"):
+                res = self.post(f"/api/v1/matches/{self.user_b.id}")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Match.objects.count(), 1)
@@ -0,0 +1,198 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError, transaction
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.counters import services as counters
+from apps.counters.models import CounterShard
+from apps.jobs import services
+from apps.jobs.models import Job
+from apps.jobs.worker import Worker
+
+calls = []
+
+
+@services.job()
+def record(value):
+    calls.append(value)
+
+
+@services.job(queue="other")
+def record_other(value):
+    calls.append(value)
+
+
+@services.job(max_attempts=2)
+def explode():
+    raise ValueError("boom")
+
+
+@services.job(every=60)
+def tick():
+    calls.append("tick")
+
+
+@override_settings(JOB_BACKOFF_BASE=10, JOB_BACKOFF_MAX=60, JOB_TIMEOUT=30)
+class JobTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def run_next(self, queues=("default",)):
+        entry = services.claim(list(queues), "test")
+        return entry, entry and services.run(entry)
+
+    def test_delayed_job_runs_once(self):
+        record.delay(value=1)
+        entry, outcome = self.run_next()
+        self.assertEqual(outcome, "succeeded")
+        self.assertEqual(calls, [1])
+        entry.refresh_from_db()
+        self.assertEqual((entry.status, entry.attempts), (Job.STATUS_SUCCEEDED, 1))
+        self.assertIsNotNone(entry.finished_at)
+        self.assertEqual(self.run_next(), (None, None))
+
+    def test_enqueue_rolls_back_with_transaction(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            record.delay(value=1)
+            raise RuntimeError
+        self.assertFalse(Job.objects.exists())
+
+    def test_scheduled_job_waits_until_due(self):
+        entry = record.schedule(120, value=1)
+        self.assertEqual(self.run_next(), (None, None))
+        Job.objects.filter(pk=entry.pk).update(run_at=timezone.now())
+        self.assertEqual(self.run_next()[1], "succeeded")
+
+    def test_queues_are_separate(self):
+        record_other.delay(value=1)
+        self.assertEqual(self.run_next(), (None, None))
+        self.assertEqual(self.run_next(queues=["other"])[1], "succeeded")
+
+    def test_failure_is_retried_with_backoff_then_fails(self):
+        entry = explode.delay()
+        before = timezone.now()
+        with self.assertLogs("apps.jobs.services", "WARNING"):
+            self.assertEqual(self.run_next()[1], "retried")
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, Job.STATUS_PENDING)
+        self.assertIn("ValueError: boom", entry.last_error)
+        # First retry waits between half and all of JOB_BACKOFF_BASE.
+        self.assertGreaterEqual(entry.run_at, before + timedelta(seconds=5))
+        self.assertLessEqual(entry.run_at, timezone.now() + timedelta(seconds=10))
+
+        Job.objects.filter(pk=entry.pk).update(run_at=timezone.now())
+        with self.assertLogs("apps.jobs.services", "WARNING"):
+            self.assertEqual(self.run_next()[1], "failed")
+        entry.refresh_from_db()
+        self.assertEqual((entry.status, entry.attempts), (Job.STATUS_FAILED, 2))
+
+    def test_backoff_is_exponential_and_capped(self):
+        with mock.patch.object(services.random, "uniform", return_value=1.0):
+            self.assertEqual([services.backoff(n) for n in (1, 2, 3, 4, 5)], [10, 20, 40, 60, 60])
+
+    def test_unknown_job_fails_without_retry(self):
+        services.enqueue("tests.missing", max_attempts=5)
+        with self.assertLogs("apps.jobs.services", "WARNING"):
+            self.assertEqual(self.run_next()[1], "failed")
+
+    def test_dedupe_key_allows_one_active_job(self):
+        self.assertIsNotNone(services.enqueue(record.name, {"value": 1}, dedupe_key="k"))
+        self.assertIsNone(services.enqueue(record.name, {"value": 2}, dedupe_key="k"))
+        self.run_next()
+        self.assertIsNotNone(services.enqueue(record.name, {"value": 3}, dedupe_key="k"))
+
+    def test_periodic_job_schedules_its_next_run(self):
+        services.schedule_periodic(["default"])
+        services.schedule_periodic(["default"])
+        self.assertEqual(Job.objects.filter(name=tick.name).count(), 1)
+        entry, _ = self.run_next()
+        self.assertEqual(calls, ["tick"])
+        following = Job.objects.get(name=tick.name, status=Job.STATUS_PENDING)
+        self.assertEqual(following.run_at, entry.run_at + timedelta(seconds=60))
+
+    def test_stale_running_jobs_are_requeued(self):
+        fresh = record.delay(value=1)
+        stale = record.delay(value=2)
+        exhausted = record.delay(value=3)
+        long_ago = timezone.now() - timedelta(seconds=60)
+        Job.objects.filter(pk=fresh.pk).update(status=Job.STATUS_RUNNING, locked_at=timezone.now(), attempts=1)
+        Job.objects.filter(pk=stale.pk).update(status=Job.STATUS_RUNNING, locked_at=long_ago, attempts=1)
+        Job.objects.filter(pk=exhausted.pk).update(status=Job.STATUS_RUNNING, locked_at=long_ago, attempts=5)
+        with self.assertLogs("apps.jobs.services", "WARNING"):
+            self.assertEqual(services.requeue_stale(), 2)
+        statuses = dict(Job.objects.values_list("id", "status"))
+        self.assertEqual(statuses[fresh.pk], Job.STATUS_RUNNING)
+        self.assertEqual(statuses[stale.pk], Job.STATUS_PENDING)
+        self.assertEqual(statuses[exhausted.pk], Job.STATUS_FAILED)
+
+    def test_queue_metrics(self):
+        record.delay(value=1)
+        Job.objects.update(run_at=timezone.now() - timedelta(seconds=30))
+        record.schedule(600, value=2)
+        services.update_metrics(["default", "other"])
+        self.assertEqual(services.JOBS_DUE.labels(queue="default")._value.get(), 1)
+        self.assertGreaterEqual(services.JOB_QUEUE_LATENCY.labels(queue="default")._value.get(), 30)
+        self.assertEqual(services.JOBS_DUE.labels(queue="other")._value.get(), 0)
+
+    def test_cleanup_deletes_old_finished_jobs(self):
+        record.delay(value=1)
+        self.run_next()
+        pending = record.delay(value=2)
+        self.assertEqual(services.cleanup(older_than=3600), 0)
+        Job.objects.filter(status=Job.STATUS_SUCCEEDED).update(finished_at=timezone.now() - timedelta(days=30))
+        self.assertEqual(services.cleanup(older_than=3600), 1)
+        self.assertEqual(list(Job.objects.values_list("id", flat=True)), [pending.pk])
+
+    def test_worker_burst_runs_due_jobs(self):
+        for value in range(3):
+            record.delay(value=value)
+        Worker(["default"]).run(burst=True)
+        # Housekeeping also scheduled the periodic job, which is due right away.
+        self.assertEqual(calls, [0, 1, 2, "tick"])
+        self.assertFalse(Job.objects.filter(status=Job.STATUS_PENDING, run_at__lte=timezone.now()).exists())
+
+    def test_worker_survives_a_failed_status_update(self):
+        first = record.delay(value=1)
+        record.delay(value=2)
+        real_update = QuerySet.update
+        failed = []
+
+        def update(queryset, **fields):
+            if fields.get("status") == Job.STATUS_SUCCEEDED and not failed:
+                failed.append(fields)
+                raise DatabaseError("connection lost")
+            return real_update(queryset, **fields)
+
+        with mock.patch.object(QuerySet, "update", autospec=True, side_effect=update):
+            with self.assertLogs("apps.jobs.worker", "WARNING"):
+                Worker(["default"]).run(burst=True)
+        # The thread kept going; the job whose outcome was lost waits for requeue_stale().
+        self.assertEqual(calls, [1, 2, "tick"])
+        first.refresh_from_db()
+        self.assertEqual(first.status, Job.STATUS_RUNNING)
+        self.assertTrue(Job.objects.filter(kwargs={"value": 2}, status=Job.STATUS_SUCCEEDED).exists())
+
+    def test_run_jobs_command_burst(self):
+        record.delay(value="cli")
+        call_command("run_jobs", burst=True, queues="default", stdout=StringIO())
+        self.assertIn("cli", calls)
+
+
+class CompactCountersTests(TestCase):
+    def test_compaction_keeps_totals(self):
+        for shard in range(4):
+            counters.add({(counters.PROJECT_LIKES, 1): 2, (counters.USER_LIKES, 7): 1}, shard=shard)
+        # Shards 1..3 of one counter, then of the other.
+        self.assertEqual(counters.compact(limit=1), 3)
+        self.assertEqual(counters.compact(), 3)
+        self.assertEqual(counters.compact(), 0)
+        self.assertEqual(set(CounterShard.objects.values_list("shard", flat=True)), {0})
+        self.assertEqual(
+            counters.counts([counters.PROJECT_LIKES, counters.USER_LIKES], [1, 7]),
+            {(counters.PROJECT_LIKES, 1): 8, (counters.USER_LIKES, 7): 4},
+        )
@@ -1,5 +1,8 @@
+import threading
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
 from rest_framework import status
 from rest_framework.test import APIClient
 
@@ -90,6 +93,72 @@ class LikeUserTests(TestCase):
 
         self.assertFalse(Match.objects.filter(user=self.user_a, liked_user=self.user_b).exists())
 
+    def test_mutual_like_keeps_existing_match_status(self):
+        Match.objects.create(user=self.user_a, liked_user=self.user_b, status=Match.STATUS_PENDING)
+        Like.objects.create(user=self.user_b, liked_user=self.user_a)
+        self.client.force_authenticate(user=self.user_a)
+        self.client.post(self.url(self.user_b.id))
+
+        self.assertEqual(Match.objects.get(user=self.user_a, liked_user=self.user_b).status, Match.STATUS_PENDING)
+        self.assertEqual(Match.objects.get(user=self.user_b, liked_user=self.user_a).status, Match.STATUS_ACCEPTED)
+
+    def test_duplicate_like_rejected_by_database(self):
+        Like.objects.create(user=self.user_a, liked_user=self.user_b)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Like.objects.create(user=self.user_a, liked_user=self.user_b)
+
+    def test_query_count_one_sided_like(self):
+        self.client.force_authenticate(user=self.user_a)
+        # exists check, savepoint, pair lock, pair lookup, insert, counter upsert, outbox insert, release
+        with self.assertNumQueries(8):
+            self.client.post(self.url(self.user_b.id))
+
+    def test_query_count_mutual_like(self):
+        Like.objects.create(user=self.user_b, liked_user=self.user_a)
+        self.client.force_authenticate(user=self.user_a)
+        # ... plus flag update, match lookup and match insert
+        with self.assertNumQueries(11):
+            self.client.post(self.url(self.user_b.id))
+
+
+class ConcurrentLikeTests(TransactionTestCase):
+    def test_concurrent_reciprocal_likes_create_one_mutual_pair(self):
+        user_a = make_user("a@example.com", "userA")
+        user_b = make_user("b@example.com", "userB")
+        barrier = threading.Barrier(4)
+        errors = []
+        # Initialise the prometheus middleware metrics before the threads race on them.
+        APIClient().get("/")
+
+        def like(user, target):
+            client = APIClient()
+            client.force_authenticate(user=user)
+            try:
+                barrier.wait()
+                res = client.post(f"/api/v1/likes/user/{target.id}")
+                if res.status_code != status.HTTP_200_OK:
+                    errors.append(res.status_code)
+            except Exception as exc:  # noqa: BLE001
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=like, args=pair)
+            for pair in [(user_a, user_b), (user_b, user_a), (user_a, user_b), (user_b, user_a)]
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(Like.objects.filter(user=user_a, liked_user=user_b).count(), 1)
+        self.assertEqual(Like.objects.filter(user=user_b, liked_user=user_a).count(), 1)
+        self.assertEqual(Like.objects.filter(is_mutual=True).count(), 2)
+        self.assertEqual(Match.objects.filter(user=user_a, liked_user=user_b).count(), 1)
+        self.assertEqual(Match.objects.filter(user=user_b, liked_user=user_a).count(), 1)
+
 
 class UserLikesListTests(TestCase):
     def setUp(self):
@@ -124,11 +193,25 @@ class UserLikesListTests(TestCase):
         res = self.client.get("/api/v1/likes/user/likes")
         self.assertEqual(len(res.json()), 2)
 
+    def test_paginated_newest_first(self):
+        self.client.force_authenticate(user=self.user_a)
+        res = self.client.get("/api/v1/likes/user/likes", {"limit": 1})
+        self.assertEqual([item["user"]["id"] for item in res.json()], [self.user_c.id])
+        next_url = res.headers["Link"].split(";")[0].strip("<>")
+        res_next = self.client.get(next_url)
+        self.assertEqual([item["user"]["id"] for item in res_next.json()], [self.user_b.id])
+        self.assertNotIn("Link", res_next.headers)
+
     def test_unauthenticated(self):
         res = self.client.get("/api/v1/likes/user/likes")
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+@override_settings(ROOT_URLCONF="tests.urls_async")
+class AsyncUserLikesListTests(UserLikesListTests):
+    """The same cases against the async view served under ``ASYNC_VIEWS=1``."""
+
+
 class UserLikedByTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -155,6 +238,11 @@ class UserLikedByTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+@override_settings(ROOT_URLCONF="tests.urls_async")
+class AsyncUserLikedByTests(UserLikedByTests):
+    """The same cases against the async view served under ``ASYNC_VIEWS=1``."""
+
+
 class LikeProjectTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -216,3 +304,79 @@ class LikeMatchesTests(TestCase):
     def test_unauthenticated(self):
         res = self.client.get("/api/v1/likes/matches")
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(ROOT_URLCONF="tests.urls_async")
+class AsyncLikeMatchesTests(LikeMatchesTests):
+    """The same cases against the async view served under ``ASYNC_VIEWS=1``."""
+
+
+class LikeBatchTests(TestCase):
+    url = "/api/v1/likes/batch"
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user_a = make_user("a@example.com", "userA")
+        self.user_b = make_user("b@example.com", "userB")
+        self.user_c = make_user("c@example.com", "userC")
+        self.project = Project.objects.create(title="P", description="D", owner=self.user_c)
+
+    def test_batch_likes_users_and_projects(self):
+        self.client.force_authenticate(user=self.user_a)
+        res = self.client.post(
+            self.url, {"users": [self.user_b.id, self.user_c.id], "projects": [self.project.id]}, format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.json()["results"],
+            [
+                {"type": "user", "id": self.user_b.id, "status": "created", "match": False},
+                {"type": "user", "id": self.user_c.id, "status": "created", "match": False},
+                {"type": "project", "id": self.project.id, "status": "created"},
+            ],
+        )
+        self.assertEqual(Like.objects.filter(user=self.user_a).count(), 3)
+
+    def test_batch_resolves_mutual_matches(self):
+        Like.objects.create(user=self.user_b, liked_user=self.user_a)
+        Like.objects.create(user=self.user_c, liked_user=self.user_a)
+        self.client.force_authenticate(user=self.user_a)
+        res = self.client.post(self.url, {"users": [self.user_b.id, self.user_c.id]}, format="json")
+
+        self.assertTrue(all(item["match"] for item in res.json()["results"]))
+        self.assertEqual(Like.objects.filter(is_mutual=True).count(), 4)
+        self.assertEqual(Match.objects.filter(status=Match.STATUS_ACCEPTED).count(), 4)
+
+    def test_batch_reports_existing_missing_and_self(self):
+        Like.objects.create(user=self.user_a, liked_user=self.user_b)
+        self.client.force_authenticate(user=self.user_a)
+        res = self.client.post(
+            self.url, {"users": [self.user_b.id, self.user_a.id, 9999], "projects": [9999]}, format="json"
+        )
+        statuses = [item["status"] for item in res.json()["results"]]
+        self.assertEqual(statuses, ["exists", "invalid", "not_found", "not_found"])
+        self.assertEqual(Like.objects.filter(user=self.user_a).count(), 1)
+
+    def test_batch_query_count_is_constant(self):
+        others = [make_user(f"x{i}@example.com", f"userx{i}") for i in range(10)]
+        for other in others[:5]:
+            Like.objects.create(user=other, liked_user=self.user_a)
+        self.client.force_authenticate(user=self.user_a)
+        # user lookup, savepoint, pair lock, pair lookup, like insert, mutual update,
+        # match lookup, match insert, counter upsert, outbox insert, release
+        with self.assertNumQueries(11):
+            self.client.post(self.url, {"users": [o.id for o in others]}, format="json")
+
+    def test_batch_empty_rejected(self):
+        self.client.force_authenticate(user=self.user_a)
+        res = self.client.post(self.url, {"users": [], "projects": []}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_too_large_rejected(self):
+        self.client.force_authenticate(user=self.user_a)
+        res = self.client.post(self.url, {"users": list(range(1, 102))}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_unauthenticated(self):
+        res = self.client.post(self.url, {"users": [self.user_b.id]}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,120 @@
+import json
+import logging
+import socket
+import socketserver
+import threading
+import time
+
+from django.test import SimpleTestCase
+from prometheus_client import REGISTRY
+
+from config.logstash_handler import TCPJsonHandler
+
+
+class _LineCollector(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            self.server.lines.append(json.loads(line))
+
+
+class _LogstashStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _LineCollector)
+        self.lines = []
+
+    def wait_for(self, count, timeout=5):
+        deadline = time.monotonic() + timeout
+        while len(self.lines) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return [line["message"] for line in self.lines]
+
+
+def make_record(message, level=logging.INFO):
+    return logging.LogRecord("apps.likes.views", level, __file__, 1, message, None, None)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TCPJsonHandlerTests(SimpleTestCase):
+    def setUp(self):
+        self.server = _LogstashStandIn()
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.port = self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_ships_records_in_batches(self):
+        handler = TCPJsonHandler("127.0.0.1", self.port, batch_size=3, flush_interval=60)
+        sent_before = sample("logstash_records_sent_total")
+        for i in range(3):
+            handler.emit(make_record(f"record {i}"))
+        self.assertEqual(self.server.wait_for(3), ["record 0", "record 1", "record 2"])
+        self.assertEqual(sample("logstash_records_sent_total") - sent_before, 3)
+        handler.close()
+
+    def test_flush_interval_ships_partial_batch(self):
+        handler = TCPJsonHandler("127.0.0.1", self.port, batch_size=100, flush_interval=0.05)
+        handler.emit(make_record("lonely"))
+        self.assertEqual(self.server.wait_for(1), ["lonely"])
+        handler.close()
+
+    def test_entry_format(self):
+        handler = TCPJsonHandler("127.0.0.1", self.port, batch_size=1)
+        handler.emit(make_record("hello %s"))
+        self.server.wait_for(1)
+        entry = self.server.lines[0]
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["logger"], "apps.likes.views")
+        self.assertIn("@timestamp", entry)
+        handler.close()
+
+    def test_close_flushes_buffer(self):
+        handler = TCPJsonHandler("127.0.0.1", self.port, batch_size=100, flush_interval=60)
+        for i in range(5):
+            handler.emit(make_record(f"record {i}"))
+        handler.close()
+        self.assertEqual(len(self.server.wait_for(5)), 5)
+
+    def test_overflow_drops_oldest(self):
+        handler = TCPJsonHandler("127.0.0.1", self.port, capacity=3, batch_size=100, flush_interval=60)
+        dropped_before = sample("logstash_records_dropped_total", reason="overflow")
+        for i in range(5):
+            handler.emit(make_record(f"record {i}"))
+        handler.close()
+        self.assertEqual(self.server.wait_for(3), ["record 2", "record 3", "record 4"])
+        self.assertEqual(sample("logstash_records_dropped_total", reason="overflow") - dropped_before, 2)
+
+    def test_buffered_gauge_follows_the_buffer(self):
+        handler = TCPJsonHandler("127.0.0.1", self.port, capacity=3, batch_size=100, flush_interval=60)
+        buffered_before = sample("logstash_records_buffered")
+        for i in range(5):
+            handler.emit(make_record(f"record {i}"))
+        self.assertEqual(sample("logstash_records_buffered") - buffered_before, 3)
+        handler.flush()
+        self.server.wait_for(3)
+        self.assertEqual(sample("logstash_records_buffered"), buffered_before)
+        handler.close()
+
+    def test_emit_does_not_block_when_logstash_is_down(self):
+        handler = TCPJsonHandler("127.0.0.1", free_port(), batch_size=1, flush_interval=0.01)
+        dropped_before = sample("logstash_records_dropped_total", reason="unavailable")
+        started = time.monotonic()
+        for i in range(100):
+            handler.emit(make_record(f"record {i}"))
+        self.assertLess(time.monotonic() - started, 0.5)
+        handler.flush()
+        self.assertEqual(sample("logstash_records_dropped_total", reason="unavailable") - dropped_before, 100)
+        handler.close()
@@ -1,10 +1,14 @@
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from apps.likes.models import Like
+from apps.likes.services import like_user
 from apps.matches.models import Match
+from apps.projects.models import Project
 
 User = get_user_model()
 
@@ -40,18 +44,42 @@ class MatchListTests(TestCase):
         items_with_user = [item for item in res.json() if "user" in item]
         self.assertEqual(len(items_with_user), 2)
 
-    def test_deduplication_same_user(self):
-        Match.objects.create(user=self.user_a, liked_user=self.user_b, status=Match.STATUS_PENDING)
+    def test_one_match_per_counterpart(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Match.objects.create(user=self.user_a, liked_user=self.user_b, status=Match.STATUS_PENDING)
+        project = Project.objects.create(title="P", description="d", owner=self.user_b)
+        Match.objects.create(user=self.user_a, project=project)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Match.objects.create(user=self.user_a, project=project)
+
+    def test_pages_are_a_plain_seek(self):
         self.client.force_authenticate(user=self.user_a)
-        res = self.client.get("/api/v1/matches/")
-        user_ids = [item["user"]["id"] for item in res.json() if "user" in item]
-        self.assertEqual(len(user_ids), len(set(user_ids)))
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get("/api/v1/matches/", {"limit": 1})
+            self.client.get(first.headers["Link"].split(";")[0].strip("<>"))
+        for query in queries.captured_queries:
+            self.assertNotIn("SELECT", query["sql"].upper()[1:])
+
+    def test_filter_by_status(self):
+        self.client.force_authenticate(user=self.user_a)
+        res = self.client.get("/api/v1/matches/", {"status": "accepted"})
+        self.assertEqual([item["user"]["id"] for item in res.json()], [self.user_b.id])
+
+    def test_filter_by_invalid_status(self):
+        self.client.force_authenticate(user=self.user_a)
+        res = self.client.get("/api/v1/matches/", {"status": "nope"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_unauthenticated(self):
         res = self.client.get("/api/v1/matches/")
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+@override_settings(ROOT_URLCONF="tests.urls_async")
+class AsyncMatchListTests(MatchListTests):
+    """The same cases against the async view served under ``ASYNC_VIEWS=1``."""
+
+
 class PotentialMatchesTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -89,11 +117,53 @@ class PotentialMatchesTests(TestCase):
         self.assertIn(self.user_c.id, ids)
         self.assertIn(self.user_d.id, ids)
 
+    def test_ordered_newest_first(self):
+        self.client.force_authenticate(user=self.user_a)
+        res = self.client.get("/api/v1/matches/potential")
+        ids = [u["id"] for u in res.json()]
+        self.assertEqual(ids, [self.user_d.id, self.user_c.id, self.user_b.id])
+
+    def test_cursor_pagination_walks_all_pages(self):
+        Like.objects.create(user=self.user_a, liked_user=self.user_c)
+        for i in range(5):
+            make_user(f"extra{i}@example.com", f"extra{i}")
+        self.client.force_authenticate(user=self.user_a)
+
+        seen = []
+        url = "/api/v1/matches/potential?limit=2"
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(res.json()), 2)
+            seen.extend(u["id"] for u in res.json())
+            link = res.headers.get("Link")
+            url = link.split(";")[0].strip("<>") if link else None
+
+        expected = User.objects.exclude(pk__in=[self.user_a.pk, self.user_c.pk]).count()
+        self.assertEqual(len(seen), expected)
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertNotIn(self.user_c.id, seen)
+
+    def test_last_page_has_no_next_link(self):
+        self.client.force_authenticate(user=self.user_a)
+        res = self.client.get("/api/v1/matches/potential")
+        self.assertNotIn("Link", res.headers)
+
+    def test_invalid_cursor(self):
+        self.client.force_authenticate(user=self.user_a)
+        res = self.client.get("/api/v1/matches/potential", {"cursor": "not-a-cursor"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_unauthenticated(self):
         res = self.client.get("/api/v1/matches/potential")
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+@override_settings(ROOT_URLCONF="tests.urls_async")
+class AsyncPotentialMatchesTests(PotentialMatchesTests):
+    """The same cases against the async view served under ``ASYNC_VIEWS=1``."""
+
+
 class CreateMatchTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -138,6 +208,22 @@ class CreateMatchTests(TestCase):
         self.assertTrue(own_like.is_mutual)
         self.assertTrue(reverse_like.is_mutual)
 
+    def test_repeated_create_returns_the_existing_match(self):
+        self.client.force_authenticate(user=self.user_a)
+        first = self.client.post(self.url(self.user_b.id)).json()
+        res = self.client.post(self.url(self.user_b.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["id"], first["id"])
+        self.assertEqual(Match.objects.filter(user=self.user_a, liked_user=self.user_b).count(), 1)
+
+    def test_create_after_mutual_like_returns_its_match(self):
+        like_user(self.user_a.id, self.user_b.id)
+        like_user(self.user_b.id, self.user_a.id)
+        self.client.force_authenticate(user=self.user_a)
+        res = self.client.post(self.url(self.user_b.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["status"], Match.STATUS_ACCEPTED)
+
     def test_create_match_no_mutual_without_reverse_like(self):
         self.client.force_authenticate(user=self.user_a)
         self.client.post(self.url(self.user_b.id))
@@ -0,0 +1,57 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+# The schema init.sh used to create with makemigrations at boot.
+BASELINE = [
+    ("users", "0001_initial"),
+    ("projects", "0002_initial"),
+    ("likes", "0002_initial"),
+    ("matches", "0002_initial"),
+    ("counters", None),
+]
+
+
+class UpgradeFromBaselineTests(TransactionTestCase):
+    def setUp(self):
+        self.executor = MigrationExecutor(connection)
+        self.executor.migrate(BASELINE)
+        self.executor.loader.build_graph()
+        self.addCleanup(self.migrate_to_latest)
+
+    def migrate_to_latest(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_existing_rows_survive_the_upgrade(self):
+        apps = self.executor.loader.project_state([target for target in BASELINE if target[1]]).apps
+        User = apps.get_model("users", "User")
+        Like = apps.get_model("likes", "Like")
+        Match = apps.get_model("matches", "Match")
+        Project = apps.get_model("projects", "Project")
+        a = User.objects.create(email="a@example.com", username="a", password="x")
+        b = User.objects.create(email="b@example.com", username="b", password="x")
+        project = Project.objects.create(title="P", description="d", owner=b)
+        # Duplicates the old get_or_create could leave behind under concurrency.
+        first = Like.objects.create(user=a, liked_user=b)
+        Like.objects.create(user=a, liked_user=b)
+        Like.objects.create(user=a, project=project)
+        Like.objects.create(user=a, project=project)
+        Match.objects.create(user=a, liked_user=b, status="accepted")
+        newest = Match.objects.create(user=a, liked_user=b, status="accepted")
+
+        self.migrate_to_latest()
+
+        from apps.counters import services as counters
+        from apps.likes.models import Like
+        from apps.matches.models import Match
+
+        self.assertEqual(Like.objects.filter(liked_user=b.id).get().id, first.id)
+        self.assertEqual(Match.objects.filter(user=a.id).get().id, newest.id)
+        self.assertEqual(Like.objects.filter(project=project.id).count(), 1)
+        self.assertEqual(
+            counters.counts(
+                [counters.USER_LIKES, counters.USER_MATCHES, counters.PROJECT_LIKES], [a.id, b.id, project.id]
+            ),
+            {(counters.USER_LIKES, b.id): 1, (counters.USER_MATCHES, a.id): 1, (counters.PROJECT_LIKES, project.id): 1},
+        )
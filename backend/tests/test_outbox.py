@@ -0,0 +1,168 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.likes.services import like_user
+from apps.matches.models import Match
+from apps.outbox import services
+from apps.outbox.models import OutboxEvent
+
+User = get_user_model()
+
+
+class FakeStreams:
+    """In-memory stand-in for the Redis stream commands the outbox uses."""
+
+    def __init__(self):
+        self.entries = []
+        self.groups = {}
+        self.fail = False
+
+    def pipeline(self, transaction=True):
+        streams = self
+        queued = []
+
+        class Pipeline:
+            def xadd(self, name, fields, **kwargs):
+                queued.append((name, fields))
+
+            def execute(self):
+                if streams.fail:
+                    raise ConnectionError("redis down")
+                for name, fields in queued:
+                    streams.xadd(name, fields)
+
+        return Pipeline()
+
+    def xadd(self, name, fields, **kwargs):
+        entry_id = f"{len(self.entries) + 1}-0"
+        self.entries.append((entry_id, {key: str(value) for key, value in fields.items()}))
+        return entry_id
+
+    def xgroup_create(self, name, group, id="0", mkstream=False):
+        if group in self.groups:
+            raise Exception("BUSYGROUP Consumer Group name already exists")
+        self.groups[group] = {"delivered": 0, "pending": {}}
+
+    def xautoclaim(self, name, group, consumer, min_idle_time, count):
+        pending = self.groups[group]["pending"]
+        claimed = [entry for entry in self.entries if entry[0] in pending][:count] if min_idle_time == 0 else []
+        return ["0-0", claimed, []]
+
+    def xreadgroup(self, group, consumer, streams, count, block):
+        state = self.groups[group]
+        start = state["delivered"]
+        new = self.entries[start:][:count]
+        state["delivered"] += len(new)
+        for entry_id, _ in new:
+            state["pending"][entry_id] = consumer
+        return [["events", new]] if new else []
+
+    def xack(self, name, group, entry_id):
+        self.groups[group]["pending"].pop(entry_id, None)
+
+    def xinfo_groups(self, name):
+        return [
+            {"name": group, "lag": len(self.entries) - state["delivered"], "pending": len(state["pending"])}
+            for group, state in self.groups.items()
+        ]
+
+
+class OutboxWriteTests(TestCase):
+    def setUp(self):
+        self.user_a = User.objects.create_user(email="a@example.com", username="userA", password="pass1234")
+        self.user_b = User.objects.create_user(email="b@example.com", username="userB", password="pass1234")
+
+    def topics(self):
+        return list(OutboxEvent.objects.order_by("id").values_list("topic", flat=True))
+
+    def test_like_and_mutual_match_are_recorded(self):
+        like_user(self.user_b.id, self.user_a.id)
+        like_user(self.user_a.id, self.user_b.id)
+        self.assertEqual(self.topics(), ["like.created", "like.created", "match.created", "match.created"])
+        mutual_like = OutboxEvent.objects.filter(topic="like.created").order_by("id").last()
+        self.assertEqual(
+            mutual_like.payload, {"user_id": self.user_a.id, "liked_user_id": self.user_b.id, "mutual": True}
+        )
+
+    def test_repeated_like_records_nothing(self):
+        like_user(self.user_a.id, self.user_b.id)
+        like_user(self.user_a.id, self.user_b.id)
+        self.assertEqual(self.topics(), ["like.created"])
+
+    def test_events_roll_back_with_the_change(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            like_user(self.user_a.id, self.user_b.id)
+            raise RuntimeError
+        self.assertEqual(self.topics(), [])
+
+    def test_match_creation_and_status_change_are_recorded(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user_a)
+        match_id = client.post(f"/api/v1/matches/{self.user_b.id}").json()["id"]
+        client.put(f"/api/v1/matches/{match_id}/status", {"status": Match.STATUS_ACCEPTED}, format="json")
+        # Setting the same status again is not a change.
+        client.put(f"/api/v1/matches/{match_id}/status", {"status": Match.STATUS_ACCEPTED}, format="json")
+        self.assertEqual(self.topics(), ["match.created", "match.status_changed"])
+        changed = OutboxEvent.objects.get(topic="match.status_changed")
+        self.assertEqual(changed.payload["previous_status"], Match.STATUS_PENDING)
+        self.assertEqual(changed.payload["status"], Match.STATUS_ACCEPTED)
+
+
+@override_settings(OUTBOX_STREAM="events", OUTBOX_BATCH_SIZE=2, OUTBOX_CLAIM_IDLE=0)
+class RelayTests(TestCase):
+    def setUp(self):
+        self.redis = FakeStreams()
+        for i in range(3):
+            services.emit("like.created", {"n": i})
+
+    def test_batches_are_published_in_order_and_removed(self):
+        self.assertEqual(services.relay_batch(self.redis), 2)
+        self.assertEqual(services.relay_batch(self.redis), 1)
+        self.assertEqual(services.relay_batch(self.redis), 0)
+        self.assertEqual([fields["payload"] for _, fields in self.redis.entries], ['{"n": 0}', '{"n": 1}', '{"n": 2}'])
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_failed_publish_keeps_events(self):
+        self.redis.fail = True
+        with self.assertRaises(ConnectionError):
+            services.relay_batch(self.redis)
+        self.assertEqual(OutboxEvent.objects.count(), 3)
+
+    def test_consumer_group_receives_and_acknowledges(self):
+        services.relay_batch(self.redis)
+        received = []
+        self.assertEqual(services.consume(self.redis, "notifications", "worker-1", received.append), 2)
+        self.assertEqual([event["payload"] for event in received], [{"n": 0}, {"n": 1}])
+        self.assertEqual(received[0]["topic"], "like.created")
+        self.assertEqual(received[0]["stream_id"], "1-0")
+        self.assertEqual(self.redis.groups["notifications"]["pending"], {})
+
+    def test_failed_handler_is_redelivered(self):
+        services.relay_batch(self.redis)
+        with self.assertRaises(ValueError):
+            services.consume(self.redis, "notifications", "worker-1", mock.Mock(side_effect=ValueError))
+        received = []
+        services.consume(self.redis, "notifications", "worker-2", received.append)
+        self.assertEqual([event["payload"] for event in received], [{"n": 0}, {"n": 1}])
+
+    def test_lag_gauges(self):
+        services.relay_batch(self.redis)
+        services.ensure_group(self.redis, "analytics")
+        services.update_lag(self.redis)
+        self.assertEqual(services.OUTBOX_PENDING._value.get(), 1)
+        self.assertGreaterEqual(services.OUTBOX_OLDEST._value.get(), 0)
+        self.assertEqual(services.STREAM_GROUP_LAG.labels(group="analytics")._value.get(), 2)
+        self.assertEqual(services.STREAM_GROUP_PENDING.labels(group="analytics")._value.get(), 0)
+
+    def test_relay_command_once(self):
+        out = StringIO()
+        with mock.patch.object(services, "redis_client", return_value=self.redis):
+            call_command("relay_outbox", once=True, stdout=out)
+        self.assertIn("Published 3 events", out.getvalue())
+        self.assertEqual(len(self.redis.entries), 3)
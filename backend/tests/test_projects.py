@@ -1,9 +1,23 @@
+import time
+from unittest import skipUnless
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.urls import resolve
+from django.utils.http import http_date
+from prometheus_client import REGISTRY
 from rest_framework import status
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
 
+from apps.projects.cache import CACHE_INVALIDATIONS
 from apps.projects.models import Project
+from apps.projects.search import prefix_tsquery
+from apps.projects.views import AsyncProjectListCreateView, ProjectListCreateView
+from config.async_views import pick_view
 
 User = get_user_model()
 
@@ -63,10 +77,32 @@ class ProjectListTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(len(res.json()), 1)
 
-    def test_list_pagination_skip(self):
-        res_all = self.client.get(URL_PROJECTS)
-        res_skip = self.client.get(URL_PROJECTS, {"skip": 1})
-        self.assertEqual(len(res_skip.json()), len(res_all.json()) - 1)
+    def test_list_pagination_next_link(self):
+        res = self.client.get(URL_PROJECTS, {"limit": 1})
+        self.assertIn('rel="next"', res.headers["Link"])
+        next_url = res.headers["Link"].split(";")[0].strip("<>")
+        res_next = self.client.get(next_url)
+        self.assertEqual(res_next.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res_next.json()), 1)
+        self.assertNotEqual(res_next.json()[0]["id"], res.json()[0]["id"])
+        self.assertNotIn("Link", res_next.headers)
+
+    def test_list_pagination_keeps_search(self):
+        make_project(self.owner, title="Alpha Two", description="More algorithms")
+        res = self.client.get(URL_PROJECTS, {"search": "Alpha", "limit": 1})
+        next_url = res.headers["Link"].split(";")[0].strip("<>")
+        res_next = self.client.get(next_url)
+        titles = [p["title"] for p in res.json() + res_next.json()]
+        self.assertEqual(sorted(titles), ["Alpha Project", "Alpha Two"])
+
+    def test_list_pagination_rejects_skip(self):
+        res = self.client.get(URL_PROJECTS, {"skip": 20})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("skip", res.json()["detail"])
+
+    def test_list_pagination_invalid_limit(self):
+        res = self.client.get(URL_PROJECTS, {"limit": "abc"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_list_ordered_by_newest_first(self):
         from datetime import timedelta
@@ -79,6 +115,171 @@ class ProjectListTests(TestCase):
         self.assertEqual(items[0]["title"], "Beta System")
 
 
+class ProjectSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = make_user()
+        make_project(self.owner, title="Django REST backend", description="Build an API with Django")
+        make_project(self.owner, title="Mobile app", description="Flutter client for the backend")
+
+    def test_invalid_search_mode(self):
+        res = self.client.get(URL_PROJECTS, {"search": "django", "search_mode": "regex"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("detail", res.json())
+
+    def test_search_mode_without_search_is_ignored(self):
+        res = self.client.get(URL_PROJECTS, {"search_mode": "regex"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.json()), 2)
+
+    @skipUnless(connection.vendor == "postgresql", "full-text search requires PostgreSQL")
+    def test_ranks_title_matches_first(self):
+        res = self.client.get(URL_PROJECTS, {"search": "backend"})
+        titles = [p["title"] for p in res.json()]
+        self.assertEqual(titles, ["Django REST backend", "Mobile app"])
+
+    @skipUnless(connection.vendor == "postgresql", "full-text search requires PostgreSQL")
+    def test_prefix_search(self):
+        res = self.client.get(URL_PROJECTS, {"search": "flutt", "search_mode": "prefix"})
+        self.assertEqual([p["title"] for p in res.json()], ["Mobile app"])
+
+    @skipUnless(connection.vendor == "postgresql", "full-text search requires PostgreSQL")
+    def test_phrase_search(self):
+        res = self.client.get(URL_PROJECTS, {"search": "api with django", "search_mode": "phrase"})
+        self.assertEqual([p["title"] for p in res.json()], ["Django REST backend"])
+
+    @skipUnless(connection.vendor == "postgresql", "full-text search requires PostgreSQL")
+    def test_search_vector_follows_updates(self):
+        project = Project.objects.get(title="Mobile app")
+        project.description = "Kotlin client"
+        project.save()
+        res = self.client.get(URL_PROJECTS, {"search": "kotlin"})
+        self.assertEqual([p["id"] for p in res.json()], [project.id])
+
+
+class PrefixQueryTests(SimpleTestCase):
+    def test_terms_become_prefix_matches(self):
+        self.assertEqual(prefix_tsquery("dja rest"), "dja:* & rest:*")
+
+    def test_strips_tsquery_operators(self):
+        self.assertEqual(prefix_tsquery("a & b | !c:*"), "a:* & b:* & c:*")
+
+    def test_empty(self):
+        self.assertEqual(prefix_tsquery("  & "), "")
+
+
+class ProjectCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.owner = make_user()
+        self.project = make_project(self.owner, title="Cached")
+
+    def detail_url(self):
+        return f"/api/v1/projects/{self.project.pk}"
+
+    def cache_requests(self, endpoint, result):
+        return REGISTRY.get_sample_value("project_cache_requests_total", {"endpoint": endpoint, "result": result}) or 0
+
+    def test_list_hit_skips_database(self):
+        first = self.client.get(URL_PROJECTS)
+        with self.assertNumQueries(0):
+            second = self.client.get(URL_PROJECTS)
+        self.assertEqual(first.json(), second.json())
+
+    def test_detail_hit_skips_database(self):
+        self.client.get(self.detail_url())
+        with self.assertNumQueries(0):
+            res = self.client.get(self.detail_url())
+        self.assertEqual(res.json()["title"], "Cached")
+
+    def test_list_key_covers_query_params(self):
+        make_project(self.owner, title="Other")
+        self.client.get(URL_PROJECTS)
+        res = self.client.get(URL_PROJECTS, {"limit": 1})
+        self.assertEqual(len(res.json()), 1)
+        self.assertIn("Link", res.headers)
+
+    def test_cached_link_matches_the_request(self):
+        make_project(self.owner, title="Other")
+        plain = self.client.get(URL_PROJECTS, {"limit": 1})
+        secure = self.client.get(URL_PROJECTS, {"limit": 1}, secure=True)
+        extra = self.client.get(URL_PROJECTS, {"limit": 1, "utm": "x"})
+        self.assertTrue(plain.headers["Link"].startswith("<http://"))
+        self.assertTrue(secure.headers["Link"].startswith("<https://"))
+        self.assertIn("utm=x", extra.headers["Link"])
+        # Parameter order alone does not make a new entry.
+        with self.assertNumQueries(0):
+            self.client.get(f"{URL_PROJECTS}?utm=x&limit=1")
+
+    def test_project_update_invalidates(self):
+        self.client.get(self.detail_url())
+        self.client.force_authenticate(user=self.owner)
+        self.client.put(self.detail_url(), {"title": "Renamed"}, format="json")
+        self.assertEqual(self.client.get(self.detail_url()).json()["title"], "Renamed")
+        self.assertEqual(self.client.get(URL_PROJECTS).json()[0]["title"], "Renamed")
+
+    def test_project_create_invalidates_list(self):
+        self.client.get(URL_PROJECTS)
+        make_project(self.owner, title="Fresh")
+        self.assertEqual(len(self.client.get(URL_PROJECTS).json()), 2)
+
+    def test_project_delete_invalidates(self):
+        self.client.get(self.detail_url())
+        self.project.delete()
+        self.assertEqual(self.client.get(self.detail_url()).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_owner_update_invalidates(self):
+        self.client.get(URL_PROJECTS)
+        self.owner.full_name = "New Name"
+        self.owner.save()
+        self.assertEqual(self.client.get(URL_PROJECTS).json()[0]["owner"]["full_name"], "New Name")
+
+    def test_unrelated_user_saves_keep_the_cache(self):
+        invalidations = CACHE_INVALIDATIONS.labels(reason="owner_saved")
+        before = invalidations._value.get()
+        self.client.get(URL_PROJECTS)
+        # A session login (the admin) writes only last_login.
+        update_last_login(None, self.owner)
+        other = make_user(email="other@example.com", username="other")
+        other.full_name = "Not an owner"
+        other.save()
+        with self.assertNumQueries(0):
+            self.client.get(URL_PROJECTS)
+        self.assertEqual(invalidations._value.get(), before)
+
+    def test_detail_revalidation(self):
+        res = self.client.get(self.detail_url())
+        self.assertEqual(res.headers["Cache-Control"], "no-cache")
+        self.assertNotIn("Last-Modified", res.headers)
+        with self.assertNumQueries(0):
+            res = self.client.get(self.detail_url(), HTTP_IF_NONE_MATCH=res.headers["ETag"])
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+
+    def test_if_modified_since_alone_gets_the_body(self):
+        # A new like moves no timestamp, so a date validator cannot be trusted.
+        stamp = http_date(time.time() + 60)
+        res = self.client.get(self.detail_url(), HTTP_IF_MODIFIED_SINCE=stamp)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_revalidation(self):
+        etag = self.client.get(URL_PROJECTS).headers["ETag"]
+        self.assertEqual(self.client.get(URL_PROJECTS, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.client.force_authenticate(user=self.owner)
+        self.client.put(self.detail_url(), {"title": "Renamed"}, format="json")
+        res = self.client.get(URL_PROJECTS, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.headers["ETag"], etag)
+
+    def test_hit_and_miss_metrics(self):
+        hits, misses = self.cache_requests("detail", "hit"), self.cache_requests("detail", "miss")
+        self.client.get(self.detail_url())
+        self.client.get(self.detail_url())
+        self.assertEqual(self.cache_requests("detail", "miss") - misses, 1)
+        self.assertEqual(self.cache_requests("detail", "hit") - hits, 1)
+
+
 class ProjectCreateTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -166,6 +367,59 @@ class ProjectDetailTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
 
 
+@override_settings(ROOT_URLCONF="tests.urls_async")
+class AsyncProjectViewTests(TestCase):
+    """Drives the async views through Django's ASGI handler, as uvicorn workers with ``ASYNC_VIEWS=1`` do."""
+
+    def setUp(self):
+        self.client = AsyncClient()
+        self.owner = make_user()
+        self.project = make_project(self.owner)
+        self.auth = {"Authorization": f"Bearer {RefreshToken.for_user(self.owner).access_token}"}
+
+    async def test_list(self):
+        res = await self.client.get(URL_PROJECTS, {"limit": 1})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()[0]["owner"]["id"], self.owner.id)
+
+    async def test_detail(self):
+        res = await self.client.get(f"/api/v1/projects/{self.project.pk}")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["title"], "Test Project")
+
+    async def test_detail_not_found(self):
+        res = await self.client.get("/api/v1/projects/9999")
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_invalid_cursor(self):
+        res = await self.client.get(URL_PROJECTS, {"cursor": "!!"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_sync_handler_on_async_view(self):
+        res = await self.client.post(
+            URL_PROJECTS,
+            {"title": "Async", "description": "Created"},
+            content_type="application/json",
+            headers=self.auth,
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(await Project.objects.filter(title="Async").aexists())
+
+    async def test_post_requires_auth(self):
+        res = await self.client.post(URL_PROJECTS, {"title": "Async"}, content_type="application/json")
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PickViewTests(SimpleTestCase):
+    def test_sync_views_unless_async_views_enabled(self):
+        # WSGI workers drive async views through async_to_sync, which costs more than it saves.
+        self.assertIs(resolve(URL_PROJECTS).func.view_class, ProjectListCreateView)
+        with override_settings(ASYNC_VIEWS=True):
+            self.assertIs(pick_view(ProjectListCreateView, AsyncProjectListCreateView), AsyncProjectListCreateView)
+        with override_settings(ASYNC_VIEWS=False):
+            self.assertIs(pick_view(ProjectListCreateView, AsyncProjectListCreateView), ProjectListCreateView)
+
+
 class ProjectUpdateTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+from apps.projects.models import Project
+from config.db import budget
+
+User = get_user_model()
+
+VIEW = "apps.projects.views.ProjectDetailView"
+
+
+def sample(name, view=VIEW):
+    return REGISTRY.get_sample_value(name, {"view": view}) or 0
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="q@example.com", username="queries", password="pass1234")
+        self.project = Project.objects.create(title="Budget", description="d", owner=self.user)
+        self.url = f"/api/v1/projects/{self.project.id}"
+
+    def test_records_queries_per_view(self):
+        count_before = sample("db_request_queries_count")
+        sum_before = sample("db_request_queries_sum")
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+        self.assertEqual(sample("db_request_queries_count") - count_before, 1)
+        self.assertEqual(sample("db_request_queries_sum") - sum_before, 2)
+        self.assertGreater(sample("db_request_seconds_sum"), 0)
+
+    def test_server_timing_header(self):
+        res = self.client.get(self.url)
+        self.assertRegex(res.headers["Server-Timing"], r'^db;dur=[\d.]+;desc="2 queries"$')
+
+    def test_repeated_sql_counts_as_duplicate(self):
+        budget.install(connection)
+        stats = budget.QueryStats()
+        token = budget._stats.set(stats)
+        try:
+            for pk in (1, 2, 3):
+                Project.objects.filter(pk=pk).exists()
+            User.objects.exists()
+        finally:
+            budget._stats.reset(token)
+        self.assertEqual((stats.count, stats.duplicates), (4, 2))
+
+    def test_unresolved_paths_use_a_fixed_label(self):
+        before = sample("db_request_queries_count", "<unresolved>")
+        self.client.get("/no/such/path")
+        self.assertEqual(sample("db_request_queries_count", "<unresolved>") - before, 1)
+
+    def test_named_routes_use_the_url_name(self):
+        before = sample("db_request_queries_count", "admin:login")
+        self.client.get("/admin/login/")
+        self.assertEqual(sample("db_request_queries_count", "admin:login") - before, 1)
+
+    @override_settings(SQL_QUERY_BUDGET=1)
+    def test_over_budget_logs_warning(self):
+        with self.assertLogs("config.db.budget", level="WARNING") as logs:
+            self.client.get(self.url)
+        self.assertIn("view=apps.projects.views.ProjectDetailView", logs.output[0])
+        self.assertIn("queries=2", logs.output[0])
+
+    def test_within_budget_is_quiet(self):
+        with self.assertNoLogs("config.db.budget", level="WARNING"):
+            self.client.get(self.url)
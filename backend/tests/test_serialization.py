@@ -0,0 +1,89 @@
+import datetime
+import uuid
+from unittest import skipIf
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from rest_framework.renderers import JSONRenderer
+
+from apps.likes.models import Like
+from apps.likes.serializers import LIKED_USER_ROWS
+from apps.projects.models import Project
+from apps.projects.serializers import PROJECT_WITH_OWNER_ROWS, ProjectWithOwnerSerializer
+from apps.users.serializers import USER_ROWS, UserSerializer
+from config import renderers
+from config.renderers import ORJSONRenderer
+
+User = get_user_model()
+
+
+class RowSerializerTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email="o@example.com", username="owner", password="pass1234", full_name="Zo\u00eb \u2028 Owner", bio=None
+        )
+        Project.objects.create(title="Plain", description="d", owner=self.owner)
+        Project.objects.create(title="Empty", description="d", requirements="", owner=self.owner)
+        Project.objects.create(title="List", description="d", requirements='["python", "sql"]', owner=self.owner)
+        Project.objects.create(title="Text", description="d", requirements="python, sql", owner=self.owner)
+        Project.objects.create(title="Object", description="d", requirements='{"a": 1}', owner=self.owner)
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_projects_match_model_serializer(self):
+        projects = Project.objects.select_related("owner").order_by("id")
+        rows = Project.objects.values(*PROJECT_WITH_OWNER_ROWS.columns).order_by("id")
+        expected = self.render(ProjectWithOwnerSerializer(projects, many=True).data)
+        self.assertEqual(self.render(PROJECT_WITH_OWNER_ROWS.many(rows)), expected)
+
+    def test_users_match_model_serializer(self):
+        expected = self.render(UserSerializer(User.objects.order_by("id"), many=True).data)
+        rows = User.objects.values(*USER_ROWS.columns).order_by("id")
+        self.assertEqual(self.render(USER_ROWS.many(rows)), expected)
+
+    def test_nested_relation_from_instance(self):
+        other = User.objects.create_user(email="x@example.com", username="other", password="pass1234")
+        like = Like.objects.create(user=self.owner, liked_user=other)
+        row = Like.objects.values(*LIKED_USER_ROWS.columns).get(pk=like.pk)
+        self.assertEqual(LIKED_USER_ROWS.to_dict(row), LIKED_USER_ROWS.from_instance(like))
+        self.assertEqual(LIKED_USER_ROWS.to_dict(row)["user"]["username"], "other")
+
+    def test_missing_relation_is_none(self):
+        project = Project.objects.first()
+        like = Like.objects.create(user=self.owner, project=project)
+        row = Like.objects.values(*LIKED_USER_ROWS.columns).get(pk=like.pk)
+        self.assertIsNone(LIKED_USER_ROWS.to_dict(row)["user"])
+
+
+@skipIf(renderers.orjson is None, "orjson is not installed")
+class ORJSONRendererTests(SimpleTestCase):
+    def test_matches_json_renderer(self):
+        data = [
+            {
+                "id": 1,
+                "text": 'Zo\u00eb \u2028\u2029 </script> "quoted" \\ \n',
+                "none": None,
+                "flag": True,
+                "float": 0.1,
+                "at": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+                "whole": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+                "nested": {"list": [1, "two", [3]]},
+            }
+        ]
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_falls_back_for_unsupported_types(self):
+        data = {"uuid": uuid.UUID(int=1), "date": datetime.date(2024, 5, 1), "set": {1}}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indented_output_uses_json_renderer(self):
+        data = {"a": [1, 2]}
+        context = {"indent": 4}
+        self.assertEqual(
+            ORJSONRenderer().render(data, renderer_context=context),
+            JSONRenderer().render(data, renderer_context=context),
+        )
+
+    def test_none_renders_empty_body(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
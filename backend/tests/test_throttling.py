@@ -0,0 +1,213 @@
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from config import throttling
+from config.load_shedding import LoadSheddingMiddleware, queue_seconds
+
+User = get_user_model()
+
+LOGIN_URL = "/api/v1/auth/login"
+
+
+def rates(**values):
+    throttle_rates = {key.replace("_", "."): value for key, value in values.items()}
+    return override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": throttle_rates})
+
+
+class ThrottleTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        throttling.local_buckets.clear()
+        self.addCleanup(throttling.local_buckets.clear)
+
+
+class LoginThrottleTests(ThrottleTestCase):
+    def setUp(self):
+        super().setUp()
+        User.objects.create_user(email="a@example.com", username="userA", password="pass1234")
+
+    def login(self, username="a@example.com", ip="10.0.0.1", **extra):
+        return self.client.post(
+            LOGIN_URL, {"username": username, "password": "wrong"}, format="json", REMOTE_ADDR=ip, **extra
+        )
+
+    @rates(login_ip="3/min")
+    def test_ip_is_throttled_after_burst(self):
+        for i in range(3):
+            self.assertEqual(self.login(username=f"user{i}").status_code, status.HTTP_401_UNAUTHORIZED)
+        res = self.login(username="other")
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["Retry-After"], "20")
+        # Another client is unaffected.
+        self.assertEqual(self.login(ip="10.0.0.2").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @rates(login_user="2/min")
+    def test_account_is_throttled_across_ips(self):
+        self.login(ip="10.0.0.1")
+        self.login(username=" A@Example.com", ip="10.0.0.2")
+        self.assertEqual(self.login(ip="10.0.0.3").status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.login(username="userA", ip="10.0.0.3").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @rates(login_ip="2/min")
+    @override_settings(TRUSTED_PROXIES=["172.28.0.10"])
+    def test_forged_forwarded_for_does_not_get_a_fresh_bucket(self):
+        for n in range(2):
+            self.login(username=f"user{n}", HTTP_X_FORWARDED_FOR=f"203.0.113.{n}")
+        res = self.login(username="user9", HTTP_X_FORWARDED_FOR="203.0.113.9")
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @rates(login_ip="1/min")
+    @override_settings(TRUSTED_PROXIES=["172.28.0.0/24"])
+    def test_forwarded_for_from_trusted_proxy_identifies_the_client(self):
+        for client_ip in ("203.0.113.1", "203.0.113.2"):
+            res = self.login(username=client_ip, ip="172.28.0.10", HTTP_X_FORWARDED_FOR=f"10.9.9.9, {client_ip}")
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        res = self.login(username="x", ip="172.28.0.10", HTTP_X_FORWARDED_FOR="203.0.113.1")
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @rates(login_ip="1/min")
+    def test_throttled_login_skips_password_check(self):
+        self.login()
+        with mock.patch.object(User, "check_password") as check_password:
+            self.assertEqual(self.login().status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        check_password.assert_not_called()
+
+    @rates(login_ip="2/min")
+    def test_decisions_are_counted(self):
+        allowed = throttling.THROTTLE_DECISIONS.labels(scope="login", decision="allowed")
+        throttled = throttling.THROTTLE_DECISIONS.labels(scope="login", decision="throttled")
+        allowed_before, throttled_before = allowed._value.get(), throttled._value.get()
+        for _ in range(3):
+            self.login()
+        self.assertEqual(allowed._value.get() - allowed_before, 2)
+        self.assertEqual(throttled._value.get() - throttled_before, 1)
+
+    @rates(login_ip="1/min")
+    def test_backend_failure_lets_requests_through(self):
+        with mock.patch.object(throttling, "take", side_effect=ConnectionError("redis down")):
+            with self.assertLogs("config.throttling", "WARNING"):
+                for _ in range(3):
+                    self.assertEqual(self.login().status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class WriteThrottleTests(ThrottleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user_a = User.objects.create_user(email="a@example.com", username="userA", password="pass1234")
+        self.user_b = User.objects.create_user(email="b@example.com", username="userB", password="pass1234")
+        self.user_c = User.objects.create_user(email="c@example.com", username="userC", password="pass1234")
+
+    @rates(write_user="1/min")
+    def test_user_is_throttled_per_endpoint_class(self):
+        self.client.force_authenticate(user=self.user_a)
+        self.assertEqual(self.client.post(f"/api/v1/likes/user/{self.user_b.id}").status_code, status.HTTP_200_OK)
+        # Likes and matches share the "write" bucket.
+        res = self.client.post(f"/api/v1/matches/{self.user_c.id}")
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res)
+
+        self.client.force_authenticate(user=self.user_b)
+        self.assertEqual(self.client.post(f"/api/v1/likes/user/{self.user_a.id}").status_code, status.HTTP_200_OK)
+
+    @rates(write="2/min")
+    def test_endpoint_class_bucket_is_shared_by_all_clients(self):
+        for user, target in ((self.user_a, self.user_b), (self.user_b, self.user_c)):
+            self.client.force_authenticate(user=user)
+            self.assertEqual(self.client.post(f"/api/v1/likes/user/{target.id}").status_code, status.HTTP_200_OK)
+        self.client.force_authenticate(user=self.user_c)
+        res = self.client.post(f"/api/v1/likes/user/{self.user_a.id}")
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @rates(write_user="1/min")
+    def test_reads_are_not_throttled(self):
+        self.client.force_authenticate(user=self.user_a)
+        for _ in range(3):
+            self.assertEqual(self.client.get("/api/v1/matches/").status_code, status.HTTP_200_OK)
+
+
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        self.buckets = throttling._LocalBuckets()
+
+    def test_parse_rate(self):
+        self.assertEqual(throttling.parse_rate("10/min"), (10 / 60, 10))
+        self.assertEqual(throttling.parse_rate("5/s"), (5, 5))
+
+    def test_bucket_refills_over_time(self):
+        bucket = [("k", 1.0, 2)]
+        with mock.patch.object(throttling.time, "monotonic", return_value=100.0):
+            self.assertEqual(self.buckets.take(bucket), 0)
+            self.assertEqual(self.buckets.take(bucket), 0)
+            self.assertAlmostEqual(self.buckets.take(bucket), 1.0)
+        with mock.patch.object(throttling.time, "monotonic", return_value=100.5):
+            self.assertAlmostEqual(self.buckets.take(bucket), 0.5)
+        with mock.patch.object(throttling.time, "monotonic", return_value=101.0):
+            self.assertEqual(self.buckets.take(bucket), 0)
+
+    def test_tokens_are_taken_from_all_buckets_or_none(self):
+        self.buckets.take([("empty", 1.0, 1)])
+        self.assertGreater(self.buckets.take([("full", 1.0, 1), ("empty", 1.0, 1)]), 0)
+        # "full" kept its token because "empty" refused the request.
+        self.assertEqual(self.buckets.take([("full", 1.0, 1)]), 0)
+
+    def test_redis_takes_all_buckets_in_one_script_call(self):
+        script = mock.Mock(return_value=b"0.25")
+        with mock.patch.object(throttling, "_redis_script", return_value=script):
+            wait = throttling.take([("a", 0.5, 10), ("b", 2.0, 4)])
+        self.assertEqual(wait, 0.25)
+        script.assert_called_once_with(keys=["a", "b"], args=[0.5, 10, 2.0, 4])
+
+
+@override_settings(LOAD_SHED_QUEUE_TIMEOUT=5, LOAD_SHED_MAX_IN_FLIGHT=1, LOAD_SHED_RETRY_AFTER=2)
+class LoadSheddingTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_queue_seconds_formats(self):
+        now = 1_700_000_010.0
+        for header in ("t=1700000000.000", "1700000000000", "t=1700000000000000"):
+            request = self.factory.get("/", HTTP_X_REQUEST_START=header)
+            self.assertAlmostEqual(queue_seconds(request, now=now), 10.0)
+        self.assertIsNone(queue_seconds(self.factory.get("/")))
+        self.assertIsNone(queue_seconds(self.factory.get("/", HTTP_X_REQUEST_START="garbage")))
+
+    def test_request_that_queued_too_long_is_shed(self):
+        view = mock.Mock()
+        middleware = LoadSheddingMiddleware(view)
+        response = middleware(self.factory.get("/api/v1/projects/", HTTP_X_REQUEST_START=f"t={time.time() - 6:.3f}"))
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "2")
+        view.assert_not_called()
+
+    def test_fresh_request_passes(self):
+        middleware = LoadSheddingMiddleware(lambda request: "ok")
+        request = self.factory.get("/api/v1/projects/", HTTP_X_REQUEST_START=f"t={time.time():.3f}")
+        self.assertEqual(middleware(request), "ok")
+
+    def test_in_flight_limit(self):
+        responses = []
+
+        def view(request):
+            # A second request arriving while this one runs.
+            responses.append(middleware(self.factory.get("/api/v1/projects/")))
+            return "ok"
+
+        middleware = LoadSheddingMiddleware(view)
+        self.assertEqual(middleware(self.factory.get("/api/v1/likes/user/1")), "ok")
+        self.assertEqual(responses[0].status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        # The slot is released once the request finished.
+        self.assertEqual(middleware._in_flight, 0)
+
+    def test_health_and_metrics_are_never_shed(self):
+        middleware = LoadSheddingMiddleware(lambda request: "ok")
+        stale = f"t={time.time() - 60:.3f}"
+        for path in ("/health/ready", "/metrics"):
+            self.assertEqual(middleware(self.factory.get(path, HTTP_X_REQUEST_START=stale)), "ok")
+        response = middleware(self.factory.get("/health/deep", HTTP_X_REQUEST_START=stale))
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -0,0 +1,20 @@
+"""Root URL conf with the read endpoints routed to their async views, as under ``ASYNC_VIEWS=1``."""
+
+from django.urls import include, path
+
+from apps.likes.views import AsyncLikeMatchesView, AsyncUserLikedByView, AsyncUserLikesView
+from apps.matches.views import AsyncMatchListView, AsyncPotentialMatchesView
+from apps.projects.views import AsyncProjectDetailView, AsyncProjectListCreateView
+from apps.users.views import AsyncMeView
+
+urlpatterns = [
+    path("api/v1/auth/me", AsyncMeView.as_view()),
+    path("api/v1/projects/", AsyncProjectListCreateView.as_view()),
+    path("api/v1/projects/<int:project_id>", AsyncProjectDetailView.as_view()),
+    path("api/v1/likes/user/likes", AsyncUserLikesView.as_view()),
+    path("api/v1/likes/user/liked-by", AsyncUserLikedByView.as_view()),
+    path("api/v1/likes/matches", AsyncLikeMatchesView.as_view()),
+    path("api/v1/matches/", AsyncMatchListView.as_view()),
+    path("api/v1/matches/potential", AsyncPotentialMatchesView.as_view()),
+    path("", include("config.urls")),
+]
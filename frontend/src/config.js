@@ -22,6 +22,7 @@ export const API_ENDPOINTS = {
         LIST: `${API_URL}/api/v1/matches/`,
         POTENTIAL: `${API_URL}/api/v1/matches/potential`,
     },
+    EVENTS: `${API_URL}/api/v1/events`,
 };
 
 export default API_ENDPOINTS; 
\ No newline at end of file
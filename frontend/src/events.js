@@ -0,0 +1,76 @@
+import API_ENDPOINTS from './config';
+
+// Reads the /api/v1/events Server-Sent Events stream with fetch, because
+// EventSource cannot send the Authorization header. Reconnects with the id of
+// the last event received, so events sent while disconnected are replayed.
+// Returns a function that closes the stream.
+export const subscribeToEvents = (handlers, { onUnavailable } = {}) => {
+  let lastEventId = null;
+  let retry = 3000;
+  let stopped = false;
+  let controller = null;
+
+  const dispatch = (block) => {
+    let event = 'message';
+    let id = null;
+    const data = [];
+    block.split('\n').forEach((line) => {
+      if (!line || line.startsWith(':')) return;
+      const index = line.indexOf(':');
+      const field = index === -1 ? line : line.slice(0, index);
+      let value = index === -1 ? '' : line.slice(index + 1);
+      if (value.startsWith(' ')) value = value.slice(1);
+      if (field === 'event') event = value;
+      else if (field === 'data') data.push(value);
+      else if (field === 'id') id = value;
+      else if (field === 'retry' && /^\d+$/.test(value)) retry = Number(value);
+    });
+    if (id !== null) lastEventId = id;
+    if (data.length && handlers[event]) handlers[event](JSON.parse(data.join('\n')));
+  };
+
+  const connect = async () => {
+    while (!stopped) {
+      controller = new AbortController();
+      try {
+        const headers = {
+          Authorization: `Bearer ${localStorage.getItem('token')}`,
+          Accept: 'text/event-stream',
+        };
+        if (lastEventId) headers['Last-Event-ID'] = lastEventId;
+        const response = await fetch(API_ENDPOINTS.EVENTS, { headers, signal: controller.signal });
+        if (response.status === 401 || response.status === 404 || response.status === 503) {
+          // Logged out, or no ASGI workers serve the stream: stop trying.
+          if (onUnavailable) onUnavailable();
+          return;
+        }
+        if (response.ok) {
+          const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+          let buffer = '';
+          for (;;) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += value.replace(/\r\n?/g, '\n');
+            let end = buffer.indexOf('\n\n');
+            while (end !== -1) {
+              dispatch(buffer.slice(0, end));
+              buffer = buffer.slice(end + 2);
+              end = buffer.indexOf('\n\n');
+            }
+          }
+        }
+      } catch (err) {
+        if (stopped) return;
+      }
+      await new Promise((resolve) => setTimeout(resolve, retry));
+    }
+  };
+
+  connect();
+  return () => {
+    stopped = true;
+    if (controller) controller.abort();
+  };
+};
+
+export default subscribeToEvents;
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import {
   Container,
   Typography,
@@ -12,47 +12,113 @@ import {
   CircularProgress,
   Avatar,
   IconButton,
+  Snackbar,
 } from '@mui/material';
 import { Favorite, Close } from '@mui/icons-material';
 import axios from 'axios';
 import API_ENDPOINTS from '../config';
+import { subscribeToEvents } from '../events';
+import { nextPage } from '../pagination';
+
+const displayName = (user) => (user && (user.full_name || user.username)) || 'Someone';
+
+// Fetch the next page of candidates once this many or fewer are left in the deck.
+const DECK_LOW_WATER = 5;
+
+// Appends a page to a list, skipping items it already holds.
+const appendPage = (current, page) => {
+  const seen = new Set(current.map((item) => item.id));
+  return [...current, ...page.filter((item) => !seen.has(item.id))];
+};
 
 const Matches = () => {
   const [potentialMatches, setPotentialMatches] = useState([]);
-  const [currentMatch, setCurrentMatch] = useState(null);
   const [matches, setMatches] = useState([]);
+  const [matchesNext, setMatchesNext] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const [notice, setNotice] = useState('');
+  const live = useRef(true);
+  const potentialNext = useRef(null);
+  const loadingPotential = useRef(false);
+  const matchesEnd = useRef(null);
+  const currentMatch = potentialMatches[0] || null;
 
   useEffect(() => {
     fetchPotentialMatches();
     fetchMatches();
+    // New matches, likes and status changes are pushed instead of refetched.
+    return subscribeToEvents(
+      {
+        match: upsertMatch,
+        like: (like) => setNotice(`${displayName(like.user)} liked ${like.project_id ? 'your project' : 'you'}`),
+        match_status: (change) => setNotice(`${displayName(change.user)} changed your match to ${change.status}`),
+        // Events were missed while disconnected.
+        reset: () => fetchMatches(),
+      },
+      {
+        onUnavailable: () => {
+          live.current = false;
+        },
+      }
+    );
   }, []);
 
-  const fetchPotentialMatches = async () => {
+  // Keep the deck topped up from the next page of candidates.
+  useEffect(() => {
+    if (!loading && potentialMatches.length <= DECK_LOW_WATER && potentialNext.current) {
+      fetchPotentialMatches(potentialNext.current);
+    }
+  }, [loading, potentialMatches.length]);
+
+  // Load the next page of matches when the end of the list scrolls into view.
+  useEffect(() => {
+    if (!matchesNext || !matchesEnd.current) return undefined;
+    const observer = new IntersectionObserver((entries) => {
+      if (entries[0].isIntersecting) {
+        observer.disconnect();
+        fetchMatches(matchesNext);
+      }
+    });
+    observer.observe(matchesEnd.current);
+    return () => observer.disconnect();
+  }, [loading, matchesNext]);
+
+  const upsertMatch = (match) => {
+    setMatches((current) =>
+      current.some((m) => m.id === match.id)
+        ? current.map((m) => (m.id === match.id ? match : m))
+        : [match, ...current]
+    );
+  };
+
+  const fetchPotentialMatches = async (url = API_ENDPOINTS.MATCHES.POTENTIAL) => {
+    if (loadingPotential.current) return;
+    loadingPotential.current = true;
     try {
       const token = localStorage.getItem('token');
-      const response = await axios.get(API_ENDPOINTS.MATCHES.POTENTIAL, {
+      const response = await axios.get(url, {
         headers: { Authorization: `Bearer ${token}` },
       });
-      setPotentialMatches(response.data);
-      if (response.data.length > 0) {
-        setCurrentMatch(response.data[0]);
-      }
+      potentialNext.current = nextPage(response);
+      setPotentialMatches((current) => appendPage(current, response.data));
     } catch (err) {
       setError('Failed to fetch potential matches');
     } finally {
+      loadingPotential.current = false;
       setLoading(false);
     }
   };
 
-  const fetchMatches = async () => {
+  const fetchMatches = async (url = API_ENDPOINTS.MATCHES.LIST) => {
+    const firstPage = url === API_ENDPOINTS.MATCHES.LIST;
     try {
       const token = localStorage.getItem('token');
-      const response = await axios.get(API_ENDPOINTS.MATCHES.LIST, {
+      const response = await axios.get(url, {
         headers: { Authorization: `Bearer ${token}` },
       });
-      setMatches(response.data);
+      setMatches((current) => (firstPage ? response.data : appendPage(current, response.data)));
+      setMatchesNext(nextPage(response));
     } catch (err) {
       setError('Failed to fetch matches');
     }
@@ -71,13 +137,11 @@ const Matches = () => {
         }
       );
       // Remove current match and show next one
-      setPotentialMatches(potentialMatches.slice(1));
-      if (potentialMatches.length > 1) {
-        setCurrentMatch(potentialMatches[1]);
-      } else {
-        setCurrentMatch(null);
+      setPotentialMatches((current) => current.slice(1));
+      // A mutual match arrives on the event stream; reload only without it.
+      if (!live.current) {
+        fetchMatches();
       }
-      fetchMatches();
     } catch (err) {
       setError('Failed to like user');
     }
@@ -85,12 +149,7 @@ const Matches = () => {
 
   const handleDislike = () => {
     // Remove current match and show next one
-    setPotentialMatches(potentialMatches.slice(1));
-    if (potentialMatches.length > 1) {
-      setCurrentMatch(potentialMatches[1]);
-    } else {
-      setCurrentMatch(null);
-    }
+    setPotentialMatches((current) => current.slice(1));
   };
 
   const renderSkills = (skills) => {
@@ -296,8 +355,16 @@ const Matches = () => {
           ) : (
             matches.map(renderMatch)
           )}
+          <div ref={matchesEnd} />
         </Grid>
       </Grid>
+
+      <Snackbar
+        open={Boolean(notice)}
+        autoHideDuration={4000}
+        onClose={() => setNotice('')}
+        message={notice}
+      />
     </Container>
   );
 };
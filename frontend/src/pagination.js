@@ -0,0 +1,14 @@
+// List endpoints are cursor-paginated: the URL of the following page comes in
+// a `Link: <url>; rel="next"` header, which is absent on the last page.
+// Returns that URL, or null.
+export const nextPage = (response) => {
+  const header = response.headers.link;
+  if (!header) return null;
+  const next = header
+    .split(',')
+    .map((part) => part.match(/<([^>]*)>\s*;\s*rel="?next"?/))
+    .find(Boolean);
+  return next ? next[1] : null;
+};
+
+export default nextPage;